@@ -0,0 +1 @@
+"""Performance benchmarks for dnasim (run with ``python -m benchmarks.bench``)."""
@@ -0,0 +1,251 @@
+"""Benchmark the dnasim hot paths and compare results against a baseline.
+
+Usage:
+    python -m benchmarks.bench                        # quick suite, print table
+    python -m benchmarks.bench --suite full -o results.json
+    python -m benchmarks.bench --baseline benchmarks/baseline.json
+
+Each case is timed (best of ``--repeat`` runs) and then run once more
+under ``tracemalloc`` to record peak memory. Results are written as JSON;
+with ``--baseline`` every case is compared to the matching baseline case
+and the exit status is 1 if any case is slower than ``--threshold``.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import dnasim
+from dnasim import mutate
+from dnasim.sequences import CODING_SEQUENCES, PROMOTER_SEQUENCES
+
+KB = 1_000
+MB = 1_000_000
+
+SOURCES = ('coding', 'promoter', 'synthetic')
+
+
+class Case(NamedTuple):
+    """One benchmark: ``setup()`` builds the inputs, ``run(inputs)`` is timed."""
+    name: str
+    params: Dict
+    setup: Callable[[], object]
+    run: Callable[[object], object]
+    bases: int
+    variants: int = 0
+
+
+def make_sequence(length: int, source: str = 'synthetic') -> str:
+    """Return a sequence of ``length`` bases.
+
+    'coding' and 'promoter' tile the bundled ``CODING_SEQUENCES`` /
+    ``PROMOTER_SEQUENCES``; 'synthetic' draws uniform random bases from a
+    fixed seed.
+    """
+    if source == 'synthetic':
+        return ''.join(random.Random(length).choices('ACGT', k=length))
+    pool = CODING_SEQUENCES if source == 'coding' else PROMOTER_SEQUENCES
+    unit = ''.join(pool.values())
+    return (unit * (length // len(unit) + 1))[:length]
+
+
+def _mutate_case(length: int, rate: float, n_variants: int, engine: str, source: str) -> Case:
+    def setup():
+        return make_sequence(length, source)
+
+    def run(sequence):
+        return mutate(sequence, rate, n_variants, engine=engine, sparse=True, seed=0)
+
+    params = dict(length=length, rate=rate, variants=n_variants, engine=engine, source=source)
+    return Case('mutate', params, setup, run, length * n_variants, n_variants)
+
+
+def _repeats_case(length: int, source: str) -> Case:
+    from dnasim.validator import find_repetitive_regions
+    return Case('find_repetitive_regions', dict(length=length, source=source),
+                lambda: make_sequence(length, source), find_repetitive_regions, length)
+
+
+def _motifs_case(length: int, source: str) -> Case:
+    from dnasim.validator import find_motifs
+    return Case('find_motifs', dict(length=length, source=source),
+                lambda: make_sequence(length, source),
+                lambda sequence: find_motifs(sequence, include_catalog=True, both_strands=True), length)
+
+
+def _variants(length: int, rate: float, n_variants: int, source: str):
+    sequence = make_sequence(length, source)
+    return sequence, mutate(sequence, rate, n_variants, engine='skip', sparse=True, seed=0)
+
+
+def _analysis_case(length: int, rate: float, n_variants: int, source: str) -> Case:
+    from dnasim.analysis import analyze_mutations
+    return Case('analyze_mutations', dict(length=length, rate=rate, variants=n_variants, source=source),
+                lambda: _variants(length, rate, n_variants, source),
+                lambda inputs: analyze_mutations(*inputs), length * n_variants, n_variants)
+
+
+def _spectrum_case(length: int, rate: float, n_variants: int, source: str) -> Case:
+    from dnasim.analysis import mutation_spectrum
+    return Case('mutation_spectrum', dict(length=length, rate=rate, variants=n_variants, source=source),
+                lambda: _variants(length, rate, n_variants, source),
+                lambda inputs: mutation_spectrum(*inputs), length * n_variants, n_variants)
+
+
+def _export_case(fmt: str, length: int, rate: float, n_variants: int, source: str) -> Case:
+    from dnasim import export
+
+    def run(inputs):
+        sequence, variants = inputs
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'out.' + fmt)
+            if fmt == 'fasta':
+                export.export_fasta([str(v) for v in variants], path)
+            elif fmt == 'vcf':
+                export.export_vcf(sequence, variants, path)
+            else:
+                export.export_mutations(sequence, variants, path)
+
+    return Case(f'export_{fmt}', dict(length=length, rate=rate, variants=n_variants, source=source),
+                lambda: _variants(length, rate, n_variants, source), run,
+                length * n_variants, n_variants)
+
+
+def _startup_case(statement: str) -> Case:
+    """Time a fresh interpreter running ``statement`` (e.g. importing the CLI)."""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(dnasim.__file__))))
+
+    def run(_):
+        subprocess.run([sys.executable, '-c', statement], env=env, check=True)
+
+    return Case('startup', dict(statement=statement), lambda: None, run, 0)
+
+
+def build_suite(suite: str) -> List[Case]:
+    """Return the cases of the 'quick' or 'full' suite."""
+    full = suite == 'full'
+    cases = [_startup_case('pass'), _startup_case('import dnasim.cli')]
+    for source in SOURCES:
+        cases.append(_mutate_case(1 * KB, 0.01, 100, 'python', source))
+    for length in (100, 10 * KB, 100 * KB) + ((1 * MB, 10 * MB) if full else ()):
+        for rate in (1e-2, 1e-4, 1e-6):
+            if length * rate < 0.1:
+                continue  # too few mutated draws for 10 unique variants
+            for engine in ('numpy', 'skip'):
+                if engine == 'numpy' and length > 1 * MB:
+                    continue  # dense draws at this size are measured at 1 Mb
+                cases.append(_mutate_case(length, rate, 10, engine, 'synthetic'))
+    for n_variants in (100, 1000) + ((10_000,) if full else ()):
+        cases.append(_mutate_case(10 * KB, 1e-3, n_variants, 'skip', 'coding'))
+    for length in (10 * KB, 100 * KB) + ((1 * MB,) if full else ()):
+        cases.append(_repeats_case(length, 'synthetic'))
+    for length in (100 * KB,) + ((10 * MB,) if full else ()):
+        for source in ('promoter', 'synthetic'):
+            cases.append(_motifs_case(length, source))
+    for length in (10 * KB,) + ((1 * MB,) if full else ()):
+        cases.append(_analysis_case(length, 1e-3, 100, 'coding'))
+        cases.append(_spectrum_case(length, 1e-3, 100, 'coding'))
+        for fmt in ('fasta', 'csv', 'json', 'vcf'):
+            cases.append(_export_case(fmt, length, 1e-3, 100, 'coding'))
+    return cases
+
+
+def run_case(case: Case, repeat: int = 3, memory: bool = True) -> Dict:
+    """Time ``case`` and measure its peak traced memory."""
+    inputs = case.setup()
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(inputs)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    result = {'name': case.name, 'params': case.params, 'seconds': seconds,
+              'bases_per_s': case.bases / seconds if seconds else None}
+    if case.variants:
+        result['variants_per_s'] = case.variants / seconds if seconds else None
+    if memory:
+        tracemalloc.start()
+        try:
+            case.run(inputs)
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / MB
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def case_key(result: Dict) -> str:
+    """Stable identifier of a case, used to match results with the baseline."""
+    params = ','.join(f'{key}={value}' for key, value in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[Dict]:
+    """Compare results with baseline results of the same cases.
+
+    Returns:
+        One entry per shared case with the time ratio (current / baseline)
+        and whether it exceeds ``1 + threshold``
+    """
+    reference = {case_key(result): result for result in baseline}
+    rows = []
+    for result in results:
+        base = reference.get(case_key(result))
+        if base is None or not base['seconds']:
+            continue
+        ratio = result['seconds'] / base['seconds']
+        rows.append({'case': case_key(result), 'baseline_s': base['seconds'],
+                     'current_s': result['seconds'], 'ratio': ratio,
+                     'regression': ratio > 1 + threshold})
+    return rows
+
+
+def environment() -> Dict:
+    import numpy
+    return {'python': platform.python_version(), 'numpy': numpy.__version__,
+            'platform': platform.platform(), 'processor': platform.processor(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark dnasim hot paths')
+    parser.add_argument('--suite', choices=('quick', 'full'), default='quick',
+                        help='quick: up to 100 kb; full: up to 10 Mb (default: quick)')
+    parser.add_argument('-k', '--filter', help='Only run cases whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case (default: 3)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the peak memory run')
+    parser.add_argument('-o', '--output', help='Write results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown before a case counts as a regression (default: 0.25)')
+    args = parser.parse_args(args)
+
+    cases = [case for case in build_suite(args.suite) if not args.filter or args.filter in case.name]
+    results = []
+    for case in cases:
+        result = run_case(case, args.repeat, memory=not args.no_memory)
+        results.append(result)
+        peak = f"{result['peak_mb']:9.1f} MB" if 'peak_mb' in result else ''
+        print(f"{case_key(result):80s} {result['seconds']:10.4f} s {result['bases_per_s']:12.3g} bases/s {peak}")
+
+    report = {'suite': args.suite, 'environment': environment(), 'results': results}
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['comparison'] = compare(results, json.load(f)['results'], args.threshold)
+        for row in report['comparison']:
+            flag = '  REGRESSION' if row['regression'] else ''
+            print(f"{row['case']:80s} x{row['ratio']:.2f}{flag}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(row['regression'] for row in report.get('comparison', ())) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,6 @@
 """DNA mutation simulation package."""
 
-from .core import mutate
+from .core import mutate, iter_mutations, mutate_chunked
+from .variant import Variant
 
 __version__ = "0.1.0"
\ No newline at end of file
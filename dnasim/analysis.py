@@ -1,9 +1,16 @@
-import matplotlib.pyplot as plt
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, Optional, Union
 from collections import defaultdict
+from .variant import Variant, iter_substitutions
+from . import profiling
 
-def analyze_mutations(original: str, variants: List[str]) -> Dict:
-    """Analyze mutation patterns across variants."""
+@profiling.instrument('analysis')
+def analyze_mutations(original: str, variants: Iterable[Union[str, Variant]]) -> Dict:
+    """Analyze mutation patterns across variants.
+
+    ``variants`` is consumed once, so it may be a lazy ``iter_mutations``
+    stream. ``Variant`` objects contribute their recorded substitutions
+    directly; plain strings are diffed against ``original``.
+    """
     stats = {
         'mutation_counts': [],
         'positions': defaultdict(int),
@@ -12,32 +19,180 @@ def analyze_mutations(original: str, variants: List[str]) -> Dict:
     
     for variant in variants:
         mutations = 0
-        for pos, (orig, mut) in enumerate(zip(original, variant)):
-            if orig != mut:
-                mutations += 1
-                stats['positions'][pos] += 1
-                stats['substitutions'][f'{orig}->{mut}'] += 1
+        for pos, orig, mut in iter_substitutions(original, variant):
+            mutations += 1
+            stats['positions'][pos] += 1
+            stats['substitutions'][f'{orig}->{mut}'] += 1
         stats['mutation_counts'].append(mutations)
-    
+
+    prof = profiling.active()
+    if prof is not None:
+        n_variants = len(stats['mutation_counts'])
+        prof.record('analysis', calls=0, variants=n_variants, bases=n_variants * len(original))
     return stats
 
-def plot_mutation_patterns(original: str, variants: List[str], output_file: str = None):
-    """Generate visualization of mutation patterns."""
-    stats = analyze_mutations(original, variants)
-    
-    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(15, 5))
+# Reference/replacement code pairs (A=0, C=1, G=2, T=3) that are transitions
+TRANSITIONS = ((0, 2), (2, 0), (1, 3), (3, 1))
+
+# Upper bound on the number of bases compared per stacked block
+SPECTRUM_BLOCK = 1 << 24
+
+
+class MutationSpectrum:
+    """Array-backed mutation statistics across variants.
+
+    Attributes:
+        position_counts: Number of variants mutated at each position
+        substitutions: 4x4 counts of reference base (rows) to replacement
+            base (columns), in ACGT order
+        mutation_counts: Number of substitutions in each variant
+    """
+
+    def __init__(self, position_counts, substitutions, mutation_counts):
+        self.position_counts = position_counts
+        self.substitutions = substitutions
+        self.mutation_counts = mutation_counts
+
+    @property
+    def transitions(self) -> int:
+        return int(sum(self.substitutions[i, j] for i, j in TRANSITIONS))
+
+    @property
+    def transversions(self) -> int:
+        return int(self.substitutions.sum()) - self.transitions
+
+    @property
+    def ts_tv_ratio(self) -> float:
+        """Transition/transversion ratio (inf without transversions, nan without substitutions)."""
+        if self.transversions:
+            return self.transitions / self.transversions
+        return float('inf') if self.transitions else float('nan')
+
+    def to_stats(self) -> Dict:
+        """Statistics in the dict layout returned by ``analyze_mutations``."""
+        from .engine import BASES
+        positions = self.position_counts.nonzero()[0]
+        return {
+            'mutation_counts': self.mutation_counts.tolist(),
+            'positions': defaultdict(int, zip(positions.tolist(), self.position_counts[positions].tolist())),
+            'substitutions': defaultdict(int, {f'{BASES[i]}->{BASES[j]}': int(self.substitutions[i, j])
+                                               for i, j in zip(*self.substitutions.nonzero())})
+        }
+
+
+@profiling.instrument('analysis.spectrum')
+def mutation_spectrum(original: str, variants) -> MutationSpectrum:
+    """Compute mutation statistics with bulk array comparisons.
+
+    Args:
+        original: Reference DNA sequence
+        variants: An ``(n_variants, length)`` uint8 matrix of base codes
+            (A=0, C=1, G=2, T=3, as from ``engine.mutate_batch``), or an
+            iterable of variant strings and ``Variant`` objects. Strings
+            are stacked into matrix blocks and compared against the
+            reference at once; ``Variant`` objects contribute their
+            substitution arrays directly.
+
+    Returns:
+        MutationSpectrum
+    """
+    import numpy as np
+    from .engine import encode_sequence
+
+    if not isinstance(original, str):
+        original = str(original)
+    reference = encode_sequence(original.upper())
+    length = len(reference)
+    block = max(1, SPECTRUM_BLOCK // max(length, 1))
+    position_counts = np.zeros(length, dtype=np.int64)
+    substitutions = np.zeros(16, dtype=np.int64)
+    counts = []
+
+    def add_matrix(matrix):
+        diff = matrix != reference
+        rows, cols = np.nonzero(diff)
+        substitutions[:] += np.bincount(reference[cols] * 4 + matrix[rows, cols], minlength=16)
+        position_counts[:] += diff.sum(axis=0)
+        counts.append(diff.sum(axis=1))
+
+    def add_strings(strings):
+        if any(len(string) != length for string in strings):
+            raise ValueError("Variants must have the same length as the original sequence")
+        add_matrix(encode_sequence(''.join(strings).upper()).reshape(len(strings), length))
+
+    def add_variants(variants):
+        positions = np.frombuffer(b''.join(v.positions.tobytes() for v in variants), dtype=np.int64)
+        alts = encode_sequence(b''.join(v.alts for v in variants).decode('ascii'))
+        substitutions[:] += np.bincount(reference[positions] * 4 + alts, minlength=16)
+        position_counts[:] += np.bincount(positions, minlength=length)
+        counts.append(np.array([len(v.positions) for v in variants], dtype=np.int64))
+
+    if isinstance(variants, np.ndarray):
+        if variants.ndim != 2 or variants.shape[1] != length:
+            raise ValueError("Variant matrix must have shape (n_variants, len(original))")
+        for start in range(0, len(variants), block):
+            add_matrix(variants[start:start + block])
+    else:
+        # Consecutive variants of the same kind are batched, keeping input order
+        pending, sparse = [], False
+        for variant in variants:
+            is_sparse = isinstance(variant, Variant) and (variant.reference is original
+                                                          or variant.reference == original)
+            if pending and (is_sparse != sparse or len(pending) >= block):
+                (add_variants if sparse else add_strings)(pending)
+                pending = []
+            pending.append(variant if is_sparse else str(variant))
+            sparse = is_sparse
+        if pending:
+            (add_variants if sparse else add_strings)(pending)
+
+    mutation_counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+    return MutationSpectrum(position_counts, substitutions.reshape(4, 4), mutation_counts)
+
+@profiling.instrument('plot')
+def plot_mutation_patterns(original: str, variants: Iterable[Union[str, Variant]], output_file: str = None,
+                           bins: Optional[int] = None):
+    """Generate visualization of mutation patterns.
+
+    Mutation positions are drawn as one bar per mutated position while
+    they fit the axes' pixel width; longer sequences are binned to that
+    width (or to ``bins``) and drawn as a single step plot, so rendering
+    time does not grow with sequence length. Figures with an
+    ``output_file`` are rendered on the Agg backend; without one the
+    figure is shown, unless no display is available.
+
+    Args:
+        original: Reference DNA sequence
+        variants: Variant strings or ``Variant`` objects
+        output_file: Image path (default: show the figure)
+        bins: Number of position bins (default: the axes' pixel width)
+    """
+    from .plotting import bin_series, finish, is_headless, new_figure, pixel_width
+    spectrum = mutation_spectrum(original, variants)
+    stats = spectrum.to_stats()
+
+    interactive = not output_file and not is_headless()
+    fig = new_figure((15, 5), interactive)
+    ax1, ax2, ax3 = fig.subplots(1, 3)
     
     # Plot 1: Mutation counts histogram
-    ax1.hist(stats['mutation_counts'], bins='auto')
+    ax1.hist(spectrum.mutation_counts, bins='auto', histtype='stepfilled')
     ax1.set_title('Distribution of Mutations')
     ax1.set_xlabel('Number of Mutations')
     ax1.set_ylabel('Frequency')
     
     # Plot 2: Position-wise mutation frequency
-    positions = list(stats['positions'].keys())
-    frequencies = list(stats['positions'].values())
-    ax2.bar(positions, frequencies)
-    ax2.set_title('Mutation Positions')
+    counts = spectrum.position_counts
+    n_bins = bins or pixel_width(ax2)
+    if bins is None and len(counts) <= n_bins:
+        positions = list(stats['positions'].keys())
+        frequencies = list(stats['positions'].values())
+        ax2.bar(positions, frequencies)
+        ax2.set_title('Mutation Positions')
+    else:
+        edges, binned = bin_series(counts, n_bins)
+        ax2.fill_between(edges, list(binned) + [binned[-1]] if len(binned) else [0], step='post')
+        ax2.set_title(f'Mutation Positions ({len(counts) / max(len(binned), 1):.0f} bp bins)')
     ax2.set_xlabel('Sequence Position')
     ax2.set_ylabel('Mutation Frequency')
     
@@ -48,11 +203,6 @@ def plot_mutation_patterns(original: str, variants: List[str], output_file: str
     ax3.set_title('Substitution Types')
     ax3.set_xlabel('Substitution')
     ax3.set_ylabel('Count')
-    plt.xticks(rotation=45)
-    
-    plt.tight_layout()
-    if output_file:
-        plt.savefig(output_file)
-    else:
-        plt.show()
-    plt.close()
\ No newline at end of file
+    ax3.tick_params(axis='x', labelrotation=45)
+
+    finish(fig, output_file, interactive)
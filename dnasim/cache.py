@@ -0,0 +1,220 @@
+"""Opt-in content-addressed cache for quality-check results.
+
+Results are keyed by a BLAKE2 digest of the input sequence plus the
+function and its parameters, so identical sequences hit the cache whatever
+object they arrive in. Values are stored pickled: an in-process LRU keeps
+up to ``max_bytes`` of them, and an optional directory tier shares them
+between processes and runs. Caching is off unless a ``caching()`` block is
+active (or ``enable()`` was called), and cached functions then check a
+single module global per call.
+
+Example:
+    >>> from dnasim import cache
+    >>> from dnasim.validator import check_sequence_quality
+    >>> with cache.caching(directory=".dnasim-cache"):
+    ...     check_sequence_quality(sequence)  # computed
+    ...     check_sequence_quality(sequence)  # from memory
+
+Only point ``directory`` at a location you trust: entries are unpickled
+when read. Keys include the package version and ``CACHE_SCHEMA``; bump the
+latter whenever a cached function's output changes without a release (new
+default motifs, a different repeat cap, ...), so stale entries on disk are
+never returned.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from . import profiling
+
+DEFAULT_MAX_BYTES = 64 << 20
+# Bump when the output of a cached function changes
+CACHE_SCHEMA = 1
+
+_current = None
+_MISSING = object()
+
+
+def sequence_digest(sequence) -> str:
+    """Hex BLAKE2b digest of a sequence (string or ``SequenceView``)."""
+    if not isinstance(sequence, str):
+        sequence = str(sequence)
+    return hashlib.blake2b(sequence.encode(), digest_size=16).hexdigest()
+
+
+def _freeze(value) -> str:
+    """Stable text form of a parameter value for use in a key."""
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{k!r}:{_freeze(v)}' for k, v in sorted(value.items())) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(_freeze(v) for v in value) + ']'
+    return repr(value)
+
+
+class ResultCache:
+    """Two-tier store of pickled results.
+
+    Args:
+        max_bytes: Size of the in-process LRU tier in (pickled) bytes;
+            least recently used entries are evicted beyond it
+            (default: 64 MiB)
+        directory: Directory of the shared on-disk tier (default: none)
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, directory: Optional[str] = None):
+        if max_bytes < 0:
+            raise ValueError("Cache size must not be negative")
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        from . import __version__
+        # Results of other versions or schemas never match
+        self._namespace = f'{__version__}/{CACHE_SCHEMA}'
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, name: str, sequence, *params) -> str:
+        """Cache key of ``name`` applied to ``sequence`` with ``params``."""
+        text = '\0'.join([self._namespace, name, sequence_digest(sequence)] + [_freeze(p) for p in params])
+        return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a fresh copy of the value stored under ``key``."""
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        elif self.directory:
+            data = self._read(key)
+            if data is not None:
+                self._remember(key, data)
+        if data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(data)
+
+    def put(self, key: str, value: Any):
+        """Store ``value`` under ``key`` in both tiers."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, data)
+        if self.directory:
+            self._write(key, data)
+
+    def clear(self):
+        """Drop every entry of the in-process tier and the directory tier."""
+        self._entries.clear()
+        self.size = 0
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith('.pickle'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.pickle')
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write(self, key: str, data: bytes):
+        # Write then rename, so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def active() -> Optional[ResultCache]:
+    """Return the cache in use, or None when caching is disabled."""
+    return _current
+
+
+def enable(max_bytes: int = DEFAULT_MAX_BYTES, directory: Optional[str] = None) -> ResultCache:
+    """Turn caching on for the rest of the process and return the cache."""
+    global _current
+    _current = ResultCache(max_bytes, directory)
+    return _current
+
+
+def disable():
+    """Turn caching off."""
+    global _current
+    _current = None
+
+
+@contextmanager
+def caching(max_bytes: int = DEFAULT_MAX_BYTES, directory: Optional[str] = None) -> Iterator[ResultCache]:
+    """Cache results of the cached functions called within the block.
+
+    Blocks may be nested; the innermost one is used.
+    """
+    global _current
+    previous, _current = _current, ResultCache(max_bytes, directory)
+    try:
+        yield _current
+    finally:
+        _current = previous
+
+
+def cached(name: str) -> Callable:
+    """Decorator caching a function of a sequence (its first argument).
+
+    The remaining arguments, with defaults applied, become part of the key.
+    Exceptions are not cached. Cache lookups are recorded as hits and
+    misses of the ``cache`` stage when profiling.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store = _current
+            if store is None:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            sequence, *params = bound.arguments.values()
+            key = store.key(name, sequence, *params)
+            result = store.get(key, _MISSING)
+            prof = profiling.active()
+            if prof is not None:
+                prof.record('cache', calls=0, hits=int(result is not _MISSING),
+                            misses=int(result is _MISSING))
+            if result is _MISSING:
+                result = func(*args, **kwargs)
+                store.put(key, result)
+            return result
+        return wrapper
+    return decorator
+
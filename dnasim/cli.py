@@ -1,12 +1,19 @@
 import argparse
 import sys
+from contextlib import nullcontext
 from typing import List
 from . import mutate
-from .analysis import plot_mutation_patterns
+from .core import ENGINES, mutate_chunked
+from .rng import SeedLike
+from . import profiling
 
 def parse_args(args: List[str] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description='DNA Mutation Simulator')
-    parser.add_argument('sequence', help='Input DNA sequence')
+    parser.add_argument('sequence', nargs='?', help='Input DNA sequence')
+    parser.add_argument('--reference',
+                      help='Read the sequence from a FASTA (.fa, or bgzipped and indexed .fa.gz) or 2-bit reference file')
+    parser.add_argument('--region',
+                      help='Reference region as name[:start-end] (default: first record)')
     parser.add_argument('-r', '--rate', type=float, default=0.01,
                       help='Mutation rate (default: 0.01)')
     parser.add_argument('-n', '--variants', type=int, default=1,
@@ -15,35 +22,154 @@ def parse_args(args: List[str] = None) -> argparse.Namespace:
                       help='Generate mutation pattern visualization')
     parser.add_argument('-o', '--output', help='Output file for visualization')
     parser.add_argument('-b', '--batch', action='store_true',
-                      help='Process sequence in batches of 100 bases')
+                      help='Mutate long sequences chunk by chunk (see --chunk-size)')
+    parser.add_argument('--chunk-size', type=int, default=100_000,
+                      help='Bases per chunk in batch mode (default: 100000)')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                      help='Number of worker processes (default: 1)')
+    parser.add_argument('-s', '--seed', type=int,
+                      help='Random seed for reproducible output')
+    parser.add_argument('-e', '--engine', choices=ENGINES, default='python',
+                      help='Mutation engine (default: python)')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='PATH',
+                      help='Print a per-stage timing breakdown to stderr, or write it as JSON to PATH')
     
+    parsed = parser.parse_args(args)
+    if (parsed.sequence is None) == (parsed.reference is None):
+        parser.error('provide either a sequence or --reference')
+    return parsed
+
+def load_sequence(args: argparse.Namespace):
+    """Return the input sequence, or a view of the --reference region.
+
+    Reference regions are validated chunk by chunk over the mapped file,
+    so a region containing assembly gaps (N) is rejected by name before
+    anything is decoded in full.
+    """
+    if args.reference is None:
+        return args.sequence
+    from .reference import open_reference
+    from .utils import validate_sequence
+    reference = open_reference(args.reference)
+    if not len(reference):
+        reference.close()
+        raise ValueError(f"No records found in {args.reference}")
+    try:
+        view = reference.fetch(args.region or reference.names[0])
+        validate_sequence(view)
+    except (KeyError, ValueError):
+        reference.close()
+        raise
+    return view
+
+def process_batch(sequence: str, rate: float, n_variants: int, seed: SeedLike = None,
+                  engine: str = 'python', chunk_size: int = 100_000, workers: int = 1) -> List[str]:
+    """Process long sequences in chunks.
+
+    Returns ``n_variants`` full-length variants; see ``mutate_chunked``.
+    """
+    return mutate_chunked(sequence, rate, n_variants, chunk_size=chunk_size, engine=engine,
+                          seed=seed, workers=workers)
+
+def parse_sweep_args(args: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='dnasim sweep',
+                                     description='Run a sequences x rates x replicates parameter sweep')
+    parser.add_argument('spec', help='JSON sweep spec (see dnasim.sweep)')
+    parser.add_argument('-o', '--output-dir', required=True,
+                      help='Directory for the checkpoint, summaries and per-cell outputs')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                      help='Number of worker processes (default: 1)')
+    parser.add_argument('--resume', action='store_true',
+                      help='Continue an interrupted sweep in --output-dir')
     return parser.parse_args(args)
 
-def process_batch(sequence: str, rate: float, n_variants: int) -> List[str]:
-    """Process long sequences in batches."""
-    batch_size = 100
-    results = []
-    
-    for i in range(0, len(sequence), batch_size):
-        batch = sequence[i:i + batch_size]
-        variants = mutate(batch, rate, n_variants)
-        results.extend(variants)
-    
-    return results
+def sweep_main(args: List[str] = None):
+    """Run ``dnasim sweep``, printing one summary line per finished cell."""
+    from .sweep import run_sweep
+    args = parse_sweep_args(args)
+    try:
+        for summary in run_sweep(args.spec, args.output_dir, workers=args.workers, resume=args.resume):
+            print(f"cell {summary['cell']}: {summary['sequence']} rate={summary['rate']} "
+                  f"replicate={summary['replicate']} mean_mutations={summary['mean_mutations']:.2f} "
+                  f"({summary['seconds']:.2f} s)")
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def parse_serve_args(args: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='dnasim serve',
+                                     description='Serve generation, QC and export jobs over HTTP')
+    parser.add_argument('--host', default='127.0.0.1',
+                      help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('-p', '--port', type=int, default=8765,
+                      help='TCP port (default: 8765)')
+    parser.add_argument('--unix', metavar='PATH',
+                      help='Also listen on a Unix socket')
+    parser.add_argument('--no-tcp', action='store_true',
+                      help='Listen only on the --unix socket')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                      help='Number of worker processes (default: 1)')
+    parser.add_argument('--batch-window', type=float, default=5.0, metavar='MS',
+                      help='Milliseconds to collect concurrent small requests into a batch (default: 5)')
+    parser.add_argument('--cache-dir',
+                      help='Share a QC result cache between workers in this directory')
+    parser.add_argument('--reference-dir', metavar='DIR',
+                      help='Let requests use {"reference": path} sources for files in DIR')
+    parsed = parser.parse_args(args)
+    if parsed.no_tcp and not parsed.unix:
+        parser.error('--no-tcp requires --unix')
+    return parsed
+
+def serve_main(args: List[str] = None):
+    """Run ``dnasim serve`` until interrupted."""
+    from .server import serve
+    args = parse_serve_args(args)
+    host = None if args.no_tcp else args.host
+    where = ' and '.join(filter(None, [host and f'http://{host}:{args.port}', args.unix]))
+    print(f"dnasim serving on {where}", file=sys.stderr)
+    try:
+        serve(host, args.port, args.unix, workers=args.workers,
+              batch_window=args.batch_window / 1000, cache_dir=args.cache_dir,
+              reference_dir=args.reference_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 def main(args: List[str] = None):
+    args = sys.argv[1:] if args is None else args
+    if args and args[0] == 'sweep':
+        return sweep_main(args[1:])
+    if args and args[0] == 'serve':
+        return serve_main(args[1:])
     args = parse_args(args)
+    with profiling.profile() if args.profile else nullcontext() as prof:
+        run(args)
+    if prof is not None:
+        if args.profile == '-':
+            print(prof.report(), file=sys.stderr)
+        else:
+            prof.dump(args.profile)
+
+def run(args: argparse.Namespace):
+    try:
+        args.sequence = load_sequence(args)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     
-    # Validate sequence
-    if not set(args.sequence.upper()).issubset({'A', 'T', 'G', 'C'}):
+    # Validate sequence (reference regions were validated when loaded)
+    if isinstance(args.sequence, str) and not set(args.sequence.upper()).issubset({'A', 'T', 'G', 'C'}):
         print("Error: Sequence must only contain A, T, G, C nucleotides", file=sys.stderr)
         sys.exit(1)
         
     # Generate mutations
-    if args.batch and len(args.sequence) > 100:
-        variants = process_batch(args.sequence, args.rate, args.variants)
+    if args.batch:
+        variants = process_batch(args.sequence, args.rate, args.variants, seed=args.seed,
+                                 engine=args.engine, chunk_size=args.chunk_size,
+                                 workers=args.workers)
     else:
-        variants = mutate(args.sequence, args.rate, args.variants)
+        variants = mutate(args.sequence, args.rate, args.variants, engine=args.engine,
+                          seed=args.seed, workers=args.workers)
     
     # Print results
     print(f"\nOriginal: {args.sequence}")
@@ -52,6 +178,8 @@ def main(args: List[str] = None):
     
     # Generate visualization if requested
     if args.visualize:
+        # Plotting pulls in NumPy and matplotlib, so it is only imported when asked for
+        from .analysis import plot_mutation_patterns
         plot_mutation_patterns(args.sequence, variants, args.output)
         if args.output:
             print(f"\nVisualization saved to {args.output}")
@@ -0,0 +1,126 @@
+"""Context-dependent mutation models compiled into per-position lookup tables.
+
+A ``ContextModel`` is built once per sequence and holds, for every
+position, a rate multiplier and the index of the substitution matrix to
+draw replacement bases from. The engines reuse it for every variant, so
+richer context models cost no more per variant than a flat rate.
+"""
+from typing import Dict, Optional
+import numpy as np
+from .engine import C, G, BASES, encode_sequence, substitution_matrix, substitution_cdf
+from .motifs import expand_motif
+from .mutation_models import CPG_MUTATION_RATE, UV_MUTATION_PATTERNS, UV_MUTATION_RATE
+
+# Matrix indices in ContextModel.matrices
+DEFAULT_MATRIX = 0
+UV_MATRIX = 1
+
+# Largest supported signature context (4**11 table entries)
+MAX_CONTEXT = 11
+
+
+class ContextModel:
+    """Per-position rate multipliers and substitution matrix indices.
+
+    Attributes:
+        codes: uint8 base codes of the sequence
+        multipliers: Rate multiplier of each position
+        matrix_index: Index into ``matrices`` for each position
+        matrices: ``(k, 4, 4)`` row-normalized substitution matrices
+    """
+
+    def __init__(self, codes: np.ndarray, multipliers: np.ndarray,
+                 matrix_index: np.ndarray, matrices: np.ndarray):
+        self.codes = codes
+        self.multipliers = multipliers
+        self.matrix_index = matrix_index
+        self.matrices = matrices
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def rates(self, base_rate: float) -> np.ndarray:
+        """Per-position mutation rates for a base rate, clipped to 1."""
+        return np.minimum(self.multipliers * float(base_rate), 1.0)
+
+    def cdfs(self) -> np.ndarray:
+        """Cumulative distributions of ``matrices``, shape ``(k, 4, 4)``."""
+        return substitution_cdf(self.matrices)
+
+    def slice(self, start: int, stop: int) -> 'ContextModel':
+        """Model restricted to positions ``[start, stop)``, context kept."""
+        return ContextModel(self.codes[start:stop], self.multipliers[start:stop],
+                            self.matrix_index[start:stop], self.matrices)
+
+
+def compile_context_model(sequence: str, signatures: Optional[Dict[str, float]] = None,
+                          cpg: bool = True, uv: bool = False) -> ContextModel:
+    """Compile a sequence's mutation context into lookup arrays.
+
+    Args:
+        sequence: DNA sequence
+        signatures: Mapping of odd-length context (tri-, penta-nucleotide,
+            ...; IUPAC codes allowed) centred on the mutated base to a rate
+            multiplier, e.g. ``{'TCW': 5.0}``. Multipliers of overlapping
+            signatures multiply.
+        cpg: Scale the rate of the C in CpG by ``CPG_MUTATION_RATE``
+            (default: True, as in ``get_contextual_mutation_rate``)
+        uv: Apply ``UV_MUTATION_PATTERNS``: bases of CC/CT/TC doublets
+            that UV damage converts mutate ``UV_MUTATION_RATE`` times
+            faster and only towards the pattern's target base (default: False)
+
+    Returns:
+        ContextModel
+    """
+    codes = encode_sequence(sequence.upper())
+    n = len(codes)
+    multipliers = np.ones(n)
+    matrix_index = np.zeros(n, dtype=np.uint8)
+    matrices = [substitution_matrix()]
+
+    if cpg and n > 1:
+        multipliers[:-1][(codes[:-1] == C) & (codes[1:] == G)] *= CPG_MUTATION_RATE
+
+    for k, table in _signature_tables(signatures or {}).items():
+        if n < k:
+            continue
+        index = np.zeros(n - k + 1, dtype=np.int64)
+        for j in range(k):
+            index = index * 4 + codes[j:n - k + 1 + j]
+        multipliers[k // 2:n - k // 2] *= table[index]
+
+    if uv and n > 1:
+        uv_matrix = substitution_matrix()
+        uv_site = np.zeros(n, dtype=bool)
+        for pattern, target in UV_MUTATION_PATTERNS.items():
+            first, second = (BASES.index(base) for base in pattern)
+            doublet = (codes[:-1] == first) & (codes[1:] == second)
+            for offset, (base, to_base) in enumerate(zip(pattern, target)):
+                if base != to_base:
+                    uv_site[offset:n - 1 + offset] |= doublet
+                    row = np.zeros(4)
+                    row[BASES.index(to_base)] = 1.0
+                    uv_matrix[BASES.index(base)] = row
+        multipliers[uv_site] *= UV_MUTATION_RATE
+        matrix_index[uv_site] = UV_MATRIX
+        matrices.append(uv_matrix)
+
+    return ContextModel(codes, multipliers, matrix_index, np.array(matrices))
+
+
+def _signature_tables(signatures: Dict[str, float]) -> Dict[int, np.ndarray]:
+    """Build one multiplier table per context length, indexed by base-4 k-mer code."""
+    tables = {}
+    for context, multiplier in signatures.items():
+        k = len(context)
+        if k % 2 == 0 or k > MAX_CONTEXT:
+            raise ValueError(f"Signature '{context}' must have odd length of at most {MAX_CONTEXT}")
+        if multiplier < 0:
+            raise ValueError(f"Signature '{context}' has a negative rate multiplier")
+        table = tables.setdefault(k, np.ones(4 ** k))
+        for kmer in expand_motif(context):
+            index = 0
+            for base in kmer:
+                index = index * 4 + BASES.index(base)
+            table[index] *= multiplier
+    return tables
@@ -1,9 +1,22 @@
+import math
 import random
-from typing import List
+import time
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterator, List, Tuple, Union
 from .utils import validate_sequence, validate_rate
-from .mutation_models import get_mutation_probability, get_contextual_mutation_rate
+from .mutation_models import get_mutation_probability
+from .variant import Variant
+from .dedup import FingerprintIndex
+from .rng import SeedLike, resolve_seed, derive_seed
+from . import profiling
 
-def mutate(sequence: str, rate: float = 0.01, n_variants: int = 1) -> List[str]:
+ENGINES = ('python', 'numpy', 'skip')
+
+@profiling.instrument('mutate')
+def mutate(sequence: str, rate: float = 0.01, n_variants: int = 1,
+           engine: str = 'python', sparse: bool = False, seed: SeedLike = None,
+           workers: int = 1, model=None) -> Union[List[str], List[Variant]]:
     """
     Generate mutated DNA sequences using real biological mutation models.
 
@@ -11,18 +24,102 @@ def mutate(sequence: str, rate: float = 0.01, n_variants: int = 1) -> List[str]:
         sequence: Input DNA sequence (string of A, T, G, C)
         rate: Mutation rate per base (default: 0.01)
         n_variants: Number of variant sequences to generate (default: 1)
+        engine: Mutation engine, 'python' (per-base loop), 'numpy'
+            (vectorized, for long sequences) or 'skip' (draws only the
+            mutated sites, for low rates) (default: 'python')
+        sparse: Return ``Variant`` objects holding only the substituted
+            sites instead of full strings (default: False)
+        seed: Integer seed, ``random.Random`` or ``numpy.random.Generator``
+            for reproducible output; the result for a given seed does not
+            depend on ``workers``. None draws fresh OS entropy (default: None)
+        workers: Number of worker processes (default: 1)
+        model: Precompiled ``dnasim.context.ContextModel`` for ``sequence``
+            (e.g. with mutational signatures or UV damage); the default is
+            the CpG-aware model of ``get_contextual_mutation_rate``
 
     Returns:
-        List[str]: List of mutated DNA sequences
+        List[str]: List of mutated DNA sequences, or List[Variant] if sparse
 
     Examples:
         >>> sequences = mutate("ATCG", rate=0.5, n_variants=3)
         >>> print(sequences)  # ['ATTG', 'AGCG', 'ATCC']
     """
+    return list(iter_mutations(sequence, rate, n_variants, engine=engine, sparse=sparse,
+                               seed=seed, workers=workers, model=model))
+
+def iter_mutations(sequence: str, rate: float = 0.01, n_variants: int = 1,
+                   chunk_size: int = 1000, engine: str = 'python',
+                   sparse: bool = False, seed: SeedLike = None,
+                   workers: int = 1, model=None) -> Iterator[Union[str, Variant]]:
+    """
+    Lazily generate unique mutated DNA sequences.
+
+    Variants are drawn ``chunk_size`` at a time and yielded one by one, so
+    only the current chunks and the fingerprint index stay in memory.
+    Each chunk draws from its own random stream derived from ``seed`` and
+    the chunk number, and chunks are deduplicated in order, so the output
+    for a given seed is the same for any number of ``workers``.
+    Arguments are validated immediately; a ``ValueError`` is raised during
+    iteration if the unique-variant budget runs out.
+
+    Args:
+        sequence: Input DNA sequence (string of A, T, G, C, or a reference
+            ``SequenceView``)
+        rate: Mutation rate per base (default: 0.01)
+        n_variants: Number of variant sequences to generate (default: 1)
+        chunk_size: Number of candidate variants drawn per batch (default: 1000)
+        engine: Mutation engine, 'python', 'numpy' or 'skip' (default: 'python')
+        sparse: Yield ``Variant`` objects instead of strings (default: False)
+        seed: Integer seed, ``random.Random`` or ``numpy.random.Generator``
+            (default: None)
+        workers: Number of worker processes (default: 1)
+        model: Precompiled ``ContextModel`` for ``sequence`` (default: None)
+
+    Returns:
+        Iterator over mutated DNA sequences (or ``Variant`` objects)
+    """
     if not sequence:
-        return []
+        return iter([])
+
+    sequence = _validate(sequence, rate, n_variants, engine, workers, model)
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive")
+
+    seed = resolve_seed(seed)
+    _check_feasible(sequence, rate, n_variants, n_variants * 100, engine, model)
+    if workers > 1:
+        from .parallel import parallel_chunks
+        def chunks(tasks):
+            return parallel_chunks(sequence, rate, engine, tasks, workers, model)
+    else:
+        draw = _make_sampler(sequence, rate, engine, model)
+        def chunks(tasks):
+            return (draw(count, chunk_seed) for chunk_seed, count in tasks)
+    return _iter_unique(chunks, len(sequence), n_variants, chunk_size, sparse, seed)
+
+def _iter_unique(chunks: Callable, length: int, n_variants: int, chunk_size: int,
+                 sparse: bool, seed: int) -> Iterator[Union[str, Variant]]:
+    """Lay out the seeded chunk tasks and deduplicate the chunks drawn for them.
+
+    ``chunks(tasks)`` turns an iterator of ``(seed, count)`` tasks into an
+    iterator of variant lists; arguments must already be validated.
+    """
+    max_attempts = n_variants * 100
+    # Chunk layout depends only on n_variants and chunk_size, never on workers
+    chunk_size = min(chunk_size, n_variants)
+    tasks = ((derive_seed(seed, index), min(chunk_size, max_attempts - start))
+             for index, start in enumerate(range(0, max_attempts, chunk_size)))
+    return _generate_unique(chunks(tasks), n_variants, sparse, length)
 
-    if not validate_sequence(sequence):
+def _validate(sequence: str, rate: float, n_variants: int, engine: str, workers: int,
+              model=None) -> str:
+    """Validate generation arguments and return the uppercased sequence."""
+    if not isinstance(sequence, str):
+        # Reference views (dnasim.reference.SequenceView) are checked chunk
+        # by chunk over the mapping, then decoded once for sampling
+        validate_sequence(sequence)
+        sequence = str(sequence)
+    elif not validate_sequence(sequence):
         raise ValueError("Sequence must only contain A, T, G, C nucleotides")
 
     if not validate_rate(rate):
@@ -31,30 +128,301 @@ def mutate(sequence: str, rate: float = 0.01, n_variants: int = 1) -> List[str]:
     if n_variants < 1:
         raise ValueError("Number of variants must be positive")
 
-    sequence = sequence.upper()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+
+    if workers < 1:
+        raise ValueError("Number of workers must be positive")
+
+    if model is not None and len(model) != len(sequence):
+        raise ValueError(f"Context model covers {len(model)} bases but the sequence has {len(sequence)}")
+
+    return sequence.upper()
+
+def _generate_unique(chunks: Iterator[List[Variant]], n_variants: int,
+                     sparse: bool, length: int = 0) -> Iterator[Union[str, Variant]]:
+    """Yield unique variants from successive chunks until ``n_variants`` are produced."""
+    seen = FingerprintIndex()
+    produced = duplicates = 0
+    prof = profiling.active()
+    if prof is not None:
+        chunks = profiling.timed(chunks, 'mutate.draw', prof)
+
+    try:
+        for chunk in chunks:
+            for variant in chunk:
+                if seen.add(variant.fingerprint()):
+                    produced += 1
+                    yield variant if sparse else str(variant)
+                    if produced == n_variants:
+                        chunks.close()
+                        return
+                else:
+                    duplicates += 1
+    finally:
+        if prof is not None:
+            attempts = produced + duplicates
+            prof.record('mutate.dedup', calls=0, attempts=attempts, duplicates=duplicates,
+                        bases=attempts * length)
+
+    raise ValueError(f"Could not generate {n_variants} unique variants. Try increasing mutation rate.")
+
+def _check_feasible(sequence: str, rate: float, n_variants: int, max_attempts: int, engine: str,
+                    model=None):
+    """Raise early when ``n_variants`` unique variants are out of reach.
+
+    Fails if the sequence admits fewer distinct variants than requested, or
+    if the attempt budget is expected to produce far fewer mutated draws
+    than needed (each draw is unmutated with probability prod(1 - r_i)).
+    Rates come from the compiled model or the vectorized ``site_rates``
+    whatever the engine, so the check stays cheap next to a draw.
+    """
+    if n_variants == 1:
+        return  # the unmutated sequence is always a valid outcome
+    import numpy as np
+    if model is not None:
+        rates = model.rates(rate)
+        certain = int(np.count_nonzero(rates >= 1))
+        possible = int(np.count_nonzero((rates > 0) & (rates < 1)))
+        log_unmutated = float(np.log1p(-rates[rates < 1]).sum())
+    else:
+        from .engine import BLOCK_SIZE, encode_sequence, site_rates
+        certain = possible = 0
+        log_unmutated = 0.0
+        # Work in blocks (overlapping by one base for CpG context) to bound memory
+        for start in range(0, len(sequence), BLOCK_SIZE):
+            rates = site_rates(encode_sequence(sequence[start:start + BLOCK_SIZE + 1]), rate)
+            rates = rates[:BLOCK_SIZE]
+            certain += int(np.count_nonzero(rates >= 1))
+            possible += int(np.count_nonzero((rates > 0) & (rates < 1)))
+            log_unmutated += float(np.log1p(-rates[rates < 1]).sum())
+    # Each uncertain site has 4 outcomes, each certain site 3
+    log_capacity = possible * math.log(4) + certain * math.log(3)
+    if log_capacity < math.log(n_variants):
+        capacity = 4 ** possible * 3 ** certain
+        raise ValueError(f"Could not generate {n_variants} unique variants: "
+                         f"at most {capacity} distinct variants exist at this rate. Try increasing mutation rate.")
+
+    if certain:
+        return
+    expected = max_attempts * -math.expm1(log_unmutated)
+    if 1 + expected + 10 * math.sqrt(expected) + 10 < n_variants:
+        raise ValueError(f"Could not generate {n_variants} unique variants: only about "
+                         f"{expected:.0f} mutated draws are expected. Try increasing mutation rate.")
+
+def _make_sampler(sequence: str, rate: float, engine: str,
+                  model=None) -> Callable[[int, int], List[Variant]]:
+    """Return a ``draw(count, seed)`` function for the chosen engine."""
+    if engine in ('numpy', 'skip'):
+        return _numpy_sampler(sequence, rate, model, skip=engine == 'skip')
+    if model is not None:
+        return _python_model_sampler(sequence, rate, model)
+    return _python_sampler(sequence, rate)
+
+def _python_sampler(sequence: str, rate: float) -> Callable[[int, int], List[Variant]]:
+    """Return a function drawing variants with the per-base reference loop.
+
+    The default context model is compiled once, so the loop only looks up
+    each site's rate and the replacement weights of its base.
+    """
+    from .context import compile_context_model
+
     bases = 'ATGC'
-    variants = set()
+    rates = compile_context_model(sequence).rates(rate).tolist()
+    # Replacement bases and empirical weights of every original base
+    choices = {}
+    for original in set(sequence):
+        probs = [get_mutation_probability(original, b) for b in bases if b != original]
+        total = sum(probs)
+        if total > 0:
+            choices[original] = ([b for b in bases if b != original], [p/total for p in probs])
+
+    def draw(count: int, seed: int) -> List[Variant]:
+        rng = random.Random(seed)
+        candidates = []
+        for _ in range(count):
+            positions = array('q')
+            alts = bytearray()
+            for i, original in enumerate(sequence):
+                if rng.random() < rates[i]:
+                    choice = choices.get(original)
+                    if choice is not None:
+                        positions.append(i)
+                        alts.append(ord(rng.choices(choice[0], weights=choice[1])[0]))
+            candidates.append(Variant(sequence, positions, bytes(alts)))
+        return candidates
+
+    return draw
+
+def _python_model_sampler(sequence: str, rate: float, model) -> Callable[[int, int], List[Variant]]:
+    """Return a per-base loop drawing from a compiled ``ContextModel``."""
+    bases = 'ACGT'
+    rates = model.rates(rate).tolist()
+    matrix_index = model.matrix_index.tolist()
+    # Replacement bases and weights for every (matrix, original base) pair
+    choices = [[([b for j, b in enumerate(bases) if row[j] > 0], [p for p in row if p > 0])
+                for row in matrix.tolist()] for matrix in model.matrices]
+
+    def draw(count: int, seed: int) -> List[Variant]:
+        rng = random.Random(seed)
+        candidates = []
+        for _ in range(count):
+            positions = array('q')
+            alts = bytearray()
+            for i, original in enumerate(sequence):
+                if rng.random() < rates[i]:
+                    targets, weights = choices[matrix_index[i]][bases.index(original)]
+                    positions.append(i)
+                    alts.append(ord(rng.choices(targets, weights=weights)[0]))
+            candidates.append(Variant(sequence, positions, bytes(alts)))
+        return candidates
+
+    return draw
+
+def _numpy_sampler(sequence: str, rate: float, model=None,
+                   skip: bool = False) -> Callable[[int, int], List[Variant]]:
+    """Return a function drawing variants with the vectorized engine.
+
+    The sequence's context model is compiled once (unless given) and its
+    rate and substitution tables reused for every batch. With ``skip``,
+    sites are grouped into rate classes once and each batch draws only the
+    mutated sites (``engine.draw_sparse_mutations``).
+    """
+    import numpy as np
+    from .engine import BASES, draw_mutations, draw_sparse_mutations, rate_classes
+    from .context import compile_context_model
+
+    if model is None:
+        model = compile_context_model(sequence)
+    codes = model.codes
+    rates = model.rates(rate)
+    cdf = model.cdfs()
+    matrix_index = model.matrix_index if len(model.matrices) > 1 else None
+    if matrix_index is None:
+        cdf = cdf[0]
+    base_bytes = np.frombuffer(BASES.encode('ascii'), dtype=np.uint8)
+    classes = rate_classes(rates) if skip else None
+
+    def draw(count: int, seed: int) -> List[Variant]:
+        rng = np.random.default_rng(seed)
+        if skip:
+            rows, positions, alts = draw_sparse_mutations(codes, classes, cdf, count, rng, matrix_index)
+        else:
+            rows, positions, alts = draw_mutations(codes, rates, cdf, count, rng, matrix_index)
+        alt_bases = base_bytes[alts]
+        bounds = np.searchsorted(rows, np.arange(count + 1))
+        candidates = []
+        for row in range(count):
+            start, stop = bounds[row], bounds[row + 1]
+            row_positions = array('q')
+            row_positions.frombytes(positions[start:stop].astype(np.int64).tobytes())
+            candidates.append(Variant(sequence, row_positions, alt_bases[start:stop].tobytes()))
+        return candidates
+
+    return draw
+
+@profiling.instrument('mutate')
+def mutate_chunked(sequence: str, rate: float = 0.01, n_variants: int = 1,
+                   chunk_size: int = 1_000_000, engine: str = 'numpy', sparse: bool = False,
+                   seed: SeedLike = None, workers: int = 1, model=None) -> Union[List[str], List[Variant]]:
+    """
+    Generate full-length variants of a long sequence chunk by chunk.
+
+    The sequence is validated once and split into ``chunk_size``-base
+    chunks. Each chunk is mutated for all variants at once, reading one
+    extra base past its end so CpG sites spanning a chunk boundary keep
+    their context, and the per-chunk substitutions are stitched into
+    whole variants. Workers receive only their chunk, so memory per worker
+    is bounded by the chunk size. Duplicate variants are redrawn in further
+    rounds. The output for a given seed does not depend on ``workers``.
+
+    Args:
+        sequence: Input DNA sequence (string or reference ``SequenceView``)
+        rate: Mutation rate per base (default: 0.01)
+        n_variants: Number of variant sequences to generate (default: 1)
+        chunk_size: Bases per chunk (default: 1,000,000)
+        engine: Mutation engine, 'python', 'numpy' or 'skip' (default: 'numpy')
+        sparse: Return ``Variant`` objects instead of strings (default: False)
+        seed: Integer seed, ``random.Random`` or ``numpy.random.Generator``
+            (default: None)
+        workers: Number of worker processes (default: 1)
+        model: Precompiled ``ContextModel`` for ``sequence``; each worker
+            receives only its chunk's slice of the tables (default: None)
+
+    Returns:
+        List[str]: List of mutated DNA sequences, or List[Variant] if sparse
+    """
+    if not sequence:
+        return []
+
+    sequence = _validate(sequence, rate, n_variants, engine, workers, model)
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive")
+
+    seed = resolve_seed(seed)
     max_attempts = n_variants * 100
-    attempts = 0
+    _check_feasible(sequence, rate, n_variants, max_attempts, engine, model)
 
+    variants = []
+    seen = FingerprintIndex()
+    attempts = 0
+    round_index = 0
+    prof = profiling.active()
     while len(variants) < n_variants and attempts < max_attempts:
-        mutated = list(sequence)
-        for i in range(len(mutated)):
-            context_rate = get_contextual_mutation_rate(sequence, i, rate)
-            if random.random() < context_rate:
-                original = mutated[i]
-                # Choose mutation based on empirical probabilities
-                probs = [get_mutation_probability(original, b) for b in bases if b != original]
-                total = sum(probs)
-                if total > 0:
-                    choices = [b for b in bases if b != original]
-                    weights = [p/total for p in probs]
-                    mutated[i] = random.choices(choices, weights=weights)[0]
-        variant = ''.join(mutated)
-        variants.add(variant)
-        attempts += 1
-        
+        count = min(n_variants - len(variants), max_attempts - attempts)
+        round_seed = derive_seed(seed, round_index)
+        start = time.perf_counter() if prof is not None else 0.0
+        drawn = _draw_chunked(sequence, rate, engine, count, round_seed, chunk_size, workers, model)
+        if prof is not None:
+            prof.record('mutate.draw', time.perf_counter() - start)
+        for positions, alts in drawn:
+            variant = Variant(sequence, positions, bytes(alts))
+            if len(variants) < n_variants and seen.add(variant.fingerprint()):
+                variants.append(variant)
+        attempts += count
+        round_index += 1
+    if prof is not None:
+        prof.record('mutate.dedup', calls=0, attempts=attempts, duplicates=attempts - len(variants),
+                    bases=attempts * len(sequence))
+
     if len(variants) < n_variants:
         raise ValueError(f"Could not generate {n_variants} unique variants. Try increasing mutation rate.")
-        
-    return list(variants)[:n_variants]
\ No newline at end of file
+
+    if sparse:
+        return variants
+    return [str(variant) for variant in variants]
+
+def _draw_chunked(sequence: str, rate: float, engine: str, count: int, seed: int,
+                  chunk_size: int, workers: int, model=None) -> List[Tuple[array, bytearray]]:
+    """Draw ``count`` variants chunk by chunk and stitch their substitutions."""
+    tasks = ((sequence[start:start + chunk_size + 1], start, min(chunk_size, len(sequence) - start),
+              rate, engine, count, derive_seed(seed, index),
+              None if model is None else model.slice(start, start + chunk_size + 1))
+             for index, start in enumerate(range(0, len(sequence), chunk_size)))
+    if workers > 1:
+        from .parallel import ordered_map
+        results = ordered_map(_draw_window, tasks, workers)
+    else:
+        results = map(_draw_window, tasks)
+
+    stitched = [(array('q'), bytearray()) for _ in range(count)]
+    for chunk in results:
+        for (positions, alts), (position_bytes, chunk_alts) in zip(stitched, chunk):
+            positions.frombytes(position_bytes)
+            alts += chunk_alts
+    return stitched
+
+def _draw_window(task: tuple) -> List[Tuple[bytes, bytes]]:
+    """Mutate one chunk for every variant, returning global substitution arrays.
+
+    The chunk context carries one base past the chunk; substitutions drawn
+    there are dropped, as that base belongs to the next chunk.
+    """
+    context, start, length, rate, engine, count, seed, model = task
+    draw = _make_sampler(context, rate, engine, model)
+    results = []
+    for variant in draw(count, seed):
+        cut = bisect_left(variant.positions, length)
+        positions = array('q', (pos + start for pos in variant.positions[:cut]))
+        results.append((positions.tobytes(), variant.alts[:cut]))
+    return results
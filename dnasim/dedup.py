@@ -0,0 +1,42 @@
+"""Bounded-memory index of variant fingerprints."""
+from array import array
+from bisect import bisect_left
+from heapq import merge
+
+
+class FingerprintIndex:
+    """Set of 64-bit fingerprints kept in a sorted compact array.
+
+    New fingerprints collect in a small pending set that is merged into the
+    sorted ``array('Q')`` once it reaches an eighth of the indexed size, so
+    the index costs roughly 16 bytes per entry instead of a full variant
+    string.
+    """
+
+    def __init__(self, min_pending: int = 4096):
+        self._sorted = array('Q')
+        self._pending = set()
+        self._min_pending = min_pending
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        if fingerprint in self._pending:
+            return True
+        i = bisect_left(self._sorted, fingerprint)
+        return i < len(self._sorted) and self._sorted[i] == fingerprint
+
+    def add(self, fingerprint: int) -> bool:
+        """Add a fingerprint; return False if it was already present."""
+        if fingerprint in self:
+            return False
+        self._pending.add(fingerprint)
+        if len(self._pending) >= max(self._min_pending, len(self._sorted) >> 3):
+            self._merge()
+        return True
+
+    def _merge(self):
+        # Stream both sorted runs into the new array, without a list of every entry
+        self._sorted = array('Q', merge(self._sorted, sorted(self._pending)))
+        self._pending = set()
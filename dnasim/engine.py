@@ -0,0 +1,173 @@
+"""Vectorized NumPy mutation engine.
+
+Sequences are encoded as uint8 codes (A=0, C=1, G=2, T=3) so that site
+rates, mutation sites and replacement bases for a whole batch of variants
+can be drawn with a handful of array operations instead of a per-base loop.
+"""
+from typing import List, Optional, Tuple
+import numpy as np
+from .mutation_models import CPG_MUTATION_RATE, get_mutation_probability
+
+BASES = 'ACGT'
+A, C, G, T = range(4)
+
+_ENCODE = np.full(256, 255, dtype=np.uint8)
+for _code, _base in enumerate(BASES):
+    _ENCODE[ord(_base)] = _code
+    _ENCODE[ord(_base.lower())] = _code
+_DECODE = np.frombuffer(BASES.encode('ascii'), dtype=np.uint8)
+
+# Upper bound on the number of uniform draws held in memory at once
+BLOCK_SIZE = 1 << 22
+
+
+def encode_sequence(sequence: str) -> np.ndarray:
+    """Encode a DNA string as an array of uint8 base codes."""
+    codes = _ENCODE[np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)]
+    if codes.size and codes.max() == 255:
+        raise ValueError("Sequence must only contain A, T, G, C nucleotides")
+    return codes
+
+
+def decode_sequence(codes: np.ndarray) -> str:
+    """Decode an array of base codes back into a DNA string."""
+    return _DECODE[codes].tobytes().decode('ascii')
+
+
+def substitution_matrix() -> np.ndarray:
+    """Return the 4x4 row-normalized substitution matrix.
+
+    Row ``i`` holds the probability of each replacement base given that
+    base ``i`` mutates; the diagonal is zero.
+    """
+    matrix = np.zeros((4, 4))
+    for i, base in enumerate(BASES):
+        for j, to_base in enumerate(BASES):
+            if i != j:
+                matrix[i, j] = get_mutation_probability(base, to_base)
+    return matrix / matrix.sum(axis=1, keepdims=True)
+
+
+def substitution_cdf(matrix: np.ndarray = None) -> np.ndarray:
+    """Return the per-row cumulative distribution of a substitution matrix."""
+    if matrix is None:
+        matrix = substitution_matrix()
+    cdf = np.cumsum(matrix, axis=-1)
+    cdf[..., -1] = 1.0
+    return cdf
+
+
+def site_rates(codes: np.ndarray, rate: float) -> np.ndarray:
+    """Per-position mutation rates, including the CpG boost.
+
+    Matches ``get_contextual_mutation_rate``: the rate at the C of every
+    CpG dinucleotide is scaled by ``CPG_MUTATION_RATE``. Rates are clipped
+    to 1.
+    """
+    rates = np.full(codes.shape, float(rate))
+    cpg = np.zeros(codes.shape, dtype=bool)
+    cpg[:-1] = (codes[:-1] == C) & (codes[1:] == G)
+    rates[cpg] *= CPG_MUTATION_RATE
+    return np.minimum(rates, 1.0)
+
+
+def draw_mutations(codes: np.ndarray, rates: np.ndarray, cdf: np.ndarray,
+                   n_variants: int, rng: np.random.Generator,
+                   matrix_index: Optional[np.ndarray] = None
+                   ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Draw mutation sites and replacement bases for a batch of variants.
+
+    With ``matrix_index``, ``cdf`` is a stack of ``(k, 4, 4)`` substitution
+    CDFs and each position draws from ``cdf[matrix_index[position]]``.
+
+    Returns:
+        Tuple of ``(rows, positions, alts)`` arrays, sorted by variant row
+        and then position, where ``alts`` holds the replacement base codes.
+    """
+    length = len(codes)
+    step = max(1, BLOCK_SIZE // max(n_variants, 1))
+    rows, positions = [], []
+    for start in range(0, length, step):
+        stop = min(start + step, length)
+        hits = rng.random((n_variants, stop - start)) < rates[start:stop]
+        block_rows, block_cols = np.nonzero(hits)
+        rows.append(block_rows)
+        positions.append(block_cols + start)
+
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.intp)
+    positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.intp)
+    if len(positions) and step < length:
+        order = np.lexsort((positions, rows))
+        rows, positions = rows[order], positions[order]
+
+    draws = rng.random(len(positions))
+    rows_cdf = cdf[codes[positions]] if matrix_index is None else cdf[matrix_index[positions], codes[positions]]
+    alts = (rows_cdf <= draws[:, None]).sum(axis=1).astype(np.uint8)
+    return rows, positions, alts
+
+
+def rate_classes(rates: np.ndarray) -> List[Tuple[float, np.ndarray]]:
+    """Group positions by their mutation rate.
+
+    Returns:
+        List of ``(rate, positions)`` for every non-zero rate, with the
+        positions of each class in increasing order
+    """
+    values, inverse = np.unique(rates, return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(len(values) + 1))
+    return [(float(rate), order[bounds[i]:bounds[i + 1]])
+            for i, rate in enumerate(values) if rate > 0]
+
+
+def draw_sparse_mutations(codes: np.ndarray, classes: List[Tuple[float, np.ndarray]],
+                          cdf: np.ndarray, n_variants: int, rng: np.random.Generator,
+                          matrix_index: Optional[np.ndarray] = None
+                          ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Draw the same output as ``draw_mutations`` without visiting every site.
+
+    Within a rate class the sites mutate independently with the same
+    probability, so the number of hits per variant is Binomial(sites, rate)
+    and, given that count, the hit sites are a uniform sample without
+    replacement. Drawing those directly reproduces the per-site model
+    exactly while costing time proportional to the number of mutations.
+
+    Args:
+        codes: Encoded sequence
+        classes: Output of ``rate_classes`` for the site rates
+        cdf: Substitution CDF, as for ``draw_mutations``
+        n_variants: Number of variants
+        rng: NumPy random generator
+        matrix_index: Per-position substitution matrix index, as for
+            ``draw_mutations``
+
+    Returns:
+        Tuple of ``(rows, positions, alts)`` arrays, sorted by variant row
+        and then position.
+    """
+    rows, positions = [], []
+    for rate, sites in classes:
+        counts = rng.binomial(len(sites), min(rate, 1.0), size=n_variants)
+        for row in np.flatnonzero(counts):
+            picks = rng.choice(len(sites), counts[row], replace=False)
+            positions.append(sites[picks])
+            rows.append(np.full(counts[row], row, dtype=np.intp))
+
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.intp)
+    positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.intp)
+    order = np.lexsort((positions, rows))
+    rows, positions = rows[order], positions[order]
+
+    draws = rng.random(len(positions))
+    rows_cdf = cdf[codes[positions]] if matrix_index is None else cdf[matrix_index[positions], codes[positions]]
+    alts = (rows_cdf <= draws[:, None]).sum(axis=1).astype(np.uint8)
+    return rows, positions, alts
+
+
+def mutate_batch(codes: np.ndarray, rates: np.ndarray, cdf: np.ndarray,
+                 n_variants: int, rng: np.random.Generator) -> np.ndarray:
+    """Return an ``(n_variants, len(codes))`` matrix of mutated base codes."""
+    rows, positions, alts = draw_mutations(codes, rates, cdf, n_variants, rng)
+    batch = np.tile(codes, (n_variants, 1))
+    batch[rows, positions] = alts
+    return batch
@@ -1,32 +1,308 @@
-import json
-from typing import List, Dict
-import csv
+import gzip
+import io
+import struct
+import zlib
 from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from .variant import Variant, iter_substitutions
+from .profiling import instrument
 
-def export_fasta(sequences: List[str], filename: str):
-    """Export sequences in FASTA format."""
-    with open(filename, 'w') as f:
-        for i, seq in enumerate(sequences):
-            f.write(f'>sequence_{i+1}\n{seq}\n')
+# Number of formatted records joined into one write call
+WRITE_BATCH = 4096
+# Size of the buffer between the writers and the (compressed) file
+BUFFER_SIZE = 1 << 20
+COMPRESSIONS = (None, 'gzip', 'bgzip')
 
-def export_mutations(original: str, variants: List[str], filename: str):
-    """Export mutation analysis in CSV format."""
-    mutations = []
-    for i, variant in enumerate(variants, 1):
-        for pos, (orig, mut) in enumerate(zip(original, variant)):
-            if orig != mut:
-                mutations.append({
-                    'variant': i,
-                    'position': pos,
-                    'original': orig,
-                    'mutated': mut
-                })
-    
-    if filename.endswith('.json'):
-        with open(filename, 'w') as f:
-            json.dump(mutations, f, indent=2)
+# Largest uncompressed payload per BGZF block, as used by samtools/htslib
+BGZF_BLOCK_SIZE = 0xff00
+BGZF_EOF = bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+
+
+class BgzfWriter(io.RawIOBase):
+    """Binary writer producing BGZF (blocked gzip) output.
+
+    BGZF files are valid gzip files made of independently compressed
+    blocks, which lets indexers such as tabix seek into them. ``tell()``
+    returns the BGZF virtual offset of the next byte written.
+    """
+
+    def __init__(self, filename: str, level: int = 6):
+        self._file = open(filename, 'wb')
+        self._level = level
+        self._buffer = bytearray()
+        self._address = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= BGZF_BLOCK_SIZE:
+            self._write_block(bytes(self._buffer[:BGZF_BLOCK_SIZE]))
+            del self._buffer[:BGZF_BLOCK_SIZE]
+        return len(data)
+
+    def tell(self) -> int:
+        return (self._address << 16) | len(self._buffer)
+
+    def flush_block(self):
+        """Compress any buffered data into a block of its own."""
+        if self._buffer:
+            self._write_block(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _write_block(self, data: bytes):
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+        block_size = 18 + len(payload) + 8
+        header = struct.pack('<4BI2BH2BHH', 0x1f, 0x8b, 8, 4, 0, 0, 0xff, 6,
+                             ord('B'), ord('C'), 2, block_size - 1)
+        trailer = struct.pack('<II', zlib.crc32(data), len(data))
+        self._file.write(header + payload + trailer)
+        self._address += block_size
+
+    def close(self):
+        if not self.closed:
+            self.flush_block()
+            self._file.write(BGZF_EOF)
+            self._file.close()
+        super().close()
+
+
+def open_output(filename: str, compress: Optional[str] = None, binary: bool = False):
+    """Open a buffered output file, optionally gzip or BGZF compressed.
+
+    Args:
+        filename: Output path; a ``.gz`` suffix implies gzip compression
+        compress: None, 'gzip' or 'bgzip' (default: from the file suffix)
+        binary: Return a binary stream instead of a text stream
+    """
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compress}'. Choose from: gzip, bgzip")
+    if compress is None and filename.endswith('.gz'):
+        compress = 'gzip'
+    if compress == 'bgzip':
+        raw = BgzfWriter(filename)
+    elif compress == 'gzip':
+        raw = gzip.open(filename, 'wb', compresslevel=6)
     else:
-        with open(filename, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=['variant', 'position', 'original', 'mutated'])
-            writer.writeheader()
-            writer.writerows(mutations)
\ No newline at end of file
+        raw = open(filename, 'wb', buffering=0)
+    stream = io.BufferedWriter(raw, buffer_size=BUFFER_SIZE)
+    if binary:
+        return stream
+    return io.TextIOWrapper(stream, encoding='ascii', newline='')
+
+
+def _batched_write(f, parts: Iterable[str]):
+    """Write formatted records in large joined batches."""
+    batch = []
+    for part in parts:
+        batch.append(part)
+        if len(batch) >= WRITE_BATCH:
+            f.write(''.join(batch))
+            batch.clear()
+    if batch:
+        f.write(''.join(batch))
+
+
+def _fasta_records(sequences: Iterable[Union[str, Variant]], line_width: Optional[int]) -> Iterator[str]:
+    for i, seq in enumerate(sequences, 1):
+        seq = str(seq)
+        if line_width and len(seq) > line_width:
+            seq = '\n'.join([seq[j:j + line_width] for j in range(0, len(seq), line_width)])
+        yield f'>sequence_{i}\n{seq}\n'
+
+
+@instrument('export.fasta')
+def export_fasta(sequences: Iterable[Union[str, Variant]], filename: str,
+                 line_width: Optional[int] = None, compress: Optional[str] = None):
+    """Export sequences in FASTA format.
+
+    Sequences are written as they are consumed, so ``iter_mutations``
+    output can be exported without holding every variant in memory.
+
+    Args:
+        sequences: Sequences or ``Variant`` objects
+        filename: Output path (``.gz`` implies gzip)
+        line_width: Wrap sequence lines, e.g. at 60 or 80 columns (default: no wrapping)
+        compress: None, 'gzip' or 'bgzip' (default: from the file suffix)
+    """
+    if line_width is not None and line_width < 1:
+        raise ValueError("Line width must be positive")
+    with open_output(filename, compress) as f:
+        _batched_write(f, _fasta_records(sequences, line_width))
+
+def _mutation_rows(original: str, variants: Iterable[Union[str, Variant]]) -> Iterator[Tuple[int, int, str, str]]:
+    """Yield ``(variant, position, original, mutated)`` per substitution, variant by variant."""
+    for i, variant in enumerate(variants, 1):
+        for pos, orig, mut in iter_substitutions(original, variant):
+            yield i, pos, orig, mut
+
+# Row templates matching csv.DictWriter, json.dumps and json.dump(indent=2) output
+_CSV_ROW = '{},{},{},{}\r\n'
+_JSONL_ROW = '{{"variant": {}, "position": {}, "original": "{}", "mutated": "{}"}}\n'
+_JSON_ROW = ('  {{\n    "variant": {},\n    "position": {},\n'
+             '    "original": "{}",\n    "mutated": "{}"\n  }}')
+
+def _json_array(rows: Iterator[Tuple[int, int, str, str]]) -> Iterator[str]:
+    first = next(rows, None)
+    if first is None:
+        yield '[]'
+        return
+    yield '[\n' + _JSON_ROW.format(*first)
+    for row in rows:
+        yield ',\n' + _JSON_ROW.format(*row)
+    yield '\n]'
+
+@instrument('export.mutations')
+def export_mutations(original: str, variants: Iterable[Union[str, Variant]], filename: str,
+                     compress: Optional[str] = None):
+    """Export mutation analysis as CSV, JSON (``.json``) or JSON Lines (``.jsonl``).
+
+    Rows are streamed to disk in large batches as variants are consumed.
+    A ``.gz`` suffix (e.g. ``mutations.csv.gz``) compresses the output.
+
+    Args:
+        original: Original DNA sequence
+        variants: Variant sequences or ``Variant`` objects
+        filename: Output path; the format follows its extension
+        compress: None, 'gzip' or 'bgzip' (default: from the file suffix)
+    """
+    rows = _mutation_rows(original, variants)
+    name = filename[:-3] if filename.endswith('.gz') else filename
+    with open_output(filename, compress) as f:
+        if name.endswith('.json'):
+            _batched_write(f, _json_array(rows))
+        elif name.endswith('.jsonl'):
+            _batched_write(f, (_JSONL_ROW.format(*row) for row in rows))
+        else:
+            f.write('variant,position,original,mutated\r\n')
+            _batched_write(f, (_CSV_ROW.format(*row) for row in rows))
+
+# Tabix binning scheme: 16 kb linear windows, 5 levels of 8x coarser bins
+_TBI_MIN_SHIFT = 14
+_TBI_VCF_FORMAT = 2
+
+def _reg2bin(beg: int, end: int) -> int:
+    """Smallest tabix bin containing the 0-based half-open region [beg, end)."""
+    end -= 1
+    for level_shift, offset in ((14, 4681), (17, 585), (20, 73), (23, 9), (26, 1)):
+        if beg >> level_shift == end >> level_shift:
+            return offset + (beg >> level_shift)
+    return 0
+
+class _TabixIndex:
+    """Collects BGZF virtual offsets of VCF records and writes a .tbi index."""
+
+    def __init__(self):
+        self.bins = {}
+        self.linear = []
+        self._last_bin = None
+
+    def add(self, beg: int, end: int, start_offset: int, end_offset: int):
+        bin_id = _reg2bin(beg, end)
+        chunks = self.bins.setdefault(bin_id, [])
+        if bin_id == self._last_bin and chunks and chunks[-1][1] == start_offset:
+            chunks[-1][1] = end_offset
+        else:
+            chunks.append([start_offset, end_offset])
+        self._last_bin = bin_id
+        for window in range(beg >> _TBI_MIN_SHIFT, ((end - 1) >> _TBI_MIN_SHIFT) + 1):
+            if window >= len(self.linear):
+                self.linear.extend([None] * (window + 1 - len(self.linear)))
+            if self.linear[window] is None:
+                self.linear[window] = start_offset
+
+    def write(self, filename: str, chrom: str):
+        names = chrom.encode('ascii') + b'\0'
+        out = bytearray(b'TBI\1')
+        out += struct.pack('<8i', 1, _TBI_VCF_FORMAT, 1, 2, 0, ord('#'), 0, len(names))
+        out += names
+        out += struct.pack('<i', len(self.bins))
+        for bin_id in sorted(self.bins):
+            chunks = self.bins[bin_id]
+            out += struct.pack('<Ii', bin_id, len(chunks))
+            for start, end in chunks:
+                out += struct.pack('<QQ', start, end)
+        # Empty windows reuse the offset of the preceding window
+        linear, previous = [], 0
+        for offset in self.linear:
+            previous = offset if offset is not None else previous
+            linear.append(previous)
+        out += struct.pack(f'<i{len(linear)}Q', len(linear), *linear)
+        writer = BgzfWriter(filename)
+        writer.write(bytes(out))
+        writer.close()
+
+def _vcf_header(chrom: str, length: int, samples: List[str]) -> str:
+    lines = [
+        '##fileformat=VCFv4.2',
+        f'##fileDate={datetime.now():%Y%m%d}',
+        '##source=dnasim',
+        f'##contig=<ID={chrom},length={length}>',
+        '##INFO=<ID=AC,Number=A,Type=Integer,Description="Allele count in genotypes, for each ALT allele">',
+        '##INFO=<ID=AN,Number=1,Type=Integer,Description="Total number of alleles in called genotypes">',
+        '##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">',
+        '\t'.join(['#CHROM', 'POS', 'ID', 'REF', 'ALT', 'QUAL', 'FILTER', 'INFO', 'FORMAT'] + samples),
+    ]
+    return '\n'.join(lines) + '\n'
+
+@instrument('export.vcf')
+def export_vcf(original: str, variants: Iterable[Union[str, Variant]], filename: str,
+               chrom: str = 'sequence', sample_names: Optional[List[str]] = None,
+               compress: Optional[str] = None, index: bool = False):
+    """Export simulated variants as a multi-sample VCF.
+
+    Substitutions from all variants are aggregated into one record per
+    site, in position order, with one haploid ``GT`` column per variant.
+    Only the substitutions are held in memory while aggregating.
+
+    Args:
+        original: Reference DNA sequence
+        variants: Variant sequences or ``Variant`` objects, one per sample
+        filename: Output path; ``.gz`` implies BGZF compression
+        chrom: Contig name written to the CHROM column (default: 'sequence')
+        sample_names: Sample column names (default: variant_1, variant_2, ...)
+        compress: None, 'gzip' or 'bgzip' (default: 'bgzip' for ``.gz`` files)
+        index: Also write a tabix ``.tbi`` index; requires BGZF output
+    """
+    if compress is None and filename.endswith('.gz'):
+        compress = 'bgzip'
+    if index and compress != 'bgzip':
+        raise ValueError("A tabix index requires bgzip compression")
+
+    sites = {}
+    n_samples = 0
+    for sample, variant in enumerate(variants):
+        n_samples += 1
+        for pos, _, mut in iter_substitutions(original, variant):
+            sites.setdefault(pos, {}).setdefault(mut, []).append(sample)
+
+    if sample_names is None:
+        sample_names = [f'variant_{i}' for i in range(1, n_samples + 1)]
+    elif len(sample_names) != n_samples:
+        raise ValueError(f"Expected {n_samples} sample names, got {len(sample_names)}")
+
+    tabix = _TabixIndex() if index else None
+    f = BgzfWriter(filename) if compress == 'bgzip' else open_output(filename, compress, binary=True)
+    with f:
+        f.write(_vcf_header(chrom, len(original), sample_names).encode('ascii'))
+        if tabix is not None:
+            f.flush_block()
+        for pos in sorted(sites):
+            alleles = sites[pos]
+            genotypes = ['0'] * n_samples
+            counts = []
+            for allele, (alt, samples) in enumerate(alleles.items(), 1):
+                for sample in samples:
+                    genotypes[sample] = str(allele)
+                counts.append(str(len(samples)))
+            line = (f'{chrom}\t{pos + 1}\t.\t{original[pos]}\t{",".join(alleles)}\t.\tPASS\t'
+                    f'AC={",".join(counts)};AN={n_samples}\tGT\t' + '\t'.join(genotypes) + '\n')
+            start = f.tell() if tabix is not None else 0
+            f.write(line.encode('ascii'))
+            if tabix is not None:
+                tabix.add(pos, pos + 1, start, f.tell())
+
+    if tabix is not None:
+        tabix.write(filename + '.tbi', chrom)
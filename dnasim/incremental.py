@@ -0,0 +1,215 @@
+"""Incremental quality checks of variants against a reference.
+
+``ReferenceQuality`` runs the full checks on the reference once and keeps
+the state they need: GC count, motif hits, CpG count, reading-frame codons
+and palindrome mismatches. A variant is then evaluated from its
+substitutions alone, rescanning only the windows around changed positions,
+so per-variant cost grows with the number of mutations rather than the
+sequence length.
+"""
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from .variant import Variant, iter_substitutions
+from .validator import DEFAULT_MOTIFS, find_motifs
+
+Substitutions = Iterable[Tuple[int, str]]
+STOP_CODONS = ('TAA', 'TAG', 'TGA')
+
+
+class ReferenceQuality:
+    """Precomputed quality state of a reference sequence.
+
+    Args:
+        reference: Reference DNA sequence (string or ``SequenceView``)
+        motifs: Mapping of name to (IUPAC) motif (default: ``DEFAULT_MOTIFS``)
+        both_strands: Also match motif reverse complements (default: False)
+    """
+
+    def __init__(self, reference: str, motifs: Optional[Dict[str, str]] = None,
+                 both_strands: bool = False):
+        from .motifs import get_scanner
+        self.reference = str(reference).upper()
+        self.catalog = dict(DEFAULT_MOTIFS if motifs is None else motifs)
+        self.both_strands = both_strands
+        self._scanner = get_scanner(self.catalog, both_strands)
+        self._motif_lengths = {name: len(motif) for name, motif in self.catalog.items()}
+        self._window = max(self._motif_lengths.values(), default=1)
+
+        sequence = self.reference
+        self.gc_count = sequence.count('G') + sequence.count('C')
+        self.cpg_count = sequence.count('CG')
+        self.motifs = find_motifs(sequence, self.catalog, both_strands=both_strands)
+        self.palindrome_mismatches = sum(1 for i in range(len(sequence) // 2)
+                                         if sequence[i] != sequence[-1 - i])
+
+    def quality(self) -> Dict:
+        """Quality metrics of the reference itself."""
+        return self.evaluate(())
+
+    def evaluate(self, variant: Union[str, Variant, Substitutions]) -> Dict:
+        """Quality metrics of a variant of the reference.
+
+        Args:
+            variant: ``Variant`` of the reference, ``(position, base)``
+                pairs, or a full variant string (diffed against the
+                reference first, which costs O(length))
+
+        Returns:
+            Dict with the ``check_sequence_quality`` keys except
+            ``repetitive_regions`` (a global property; use
+            ``find_repetitive_regions`` when needed), plus ``cpg_sites``
+            and ``motif_changes`` (motif hits ``gained`` and ``lost``).
+            ``motifs`` is a ``MotifHits`` mapping that builds position
+            lists on access; lists the variant leaves unchanged are shared
+            with the reference state and must not be modified.
+        """
+        reference = self.reference
+        length = len(reference)
+        changes = self._substitutions(variant)
+
+        def base(i: int) -> str:
+            return changes.get(i, reference[i])
+
+        gc = self.gc_count
+        for pos, alt in changes.items():
+            gc += (alt in 'GC') - (reference[pos] in 'GC')
+
+        cpg = self.cpg_count
+        for start in {i for pos in changes for i in (pos - 1, pos) if 0 <= i < length - 1}:
+            cpg += (base(start) + base(start + 1) == 'CG') - (reference[start:start + 2] == 'CG')
+
+        mismatches = self.palindrome_mismatches
+        for i in {min(pos, length - 1 - pos) for pos in changes}:
+            j = length - 1 - i
+            if i != j:
+                mismatches += (base(i) != base(j)) - (reference[i] != reference[j])
+
+        # Substitutions keep the length, so only the first and last codons can change
+        valid_frame = (length >= 3 and length % 3 == 0
+                       and base(0) + base(1) + base(2) == 'ATG'
+                       and base(length - 3) + base(length - 2) + base(length - 1) in STOP_CODONS)
+
+        motifs, gained, lost = self._update_motifs(changes, base)
+        return {
+            'length': length,
+            'gc_content': gc / length * 100 if length else 0,
+            'valid_reading_frame': valid_frame,
+            'motifs': motifs,
+            'is_palindromic': mismatches == 0,
+            'cpg_sites': cpg,
+            'motif_changes': {'gained': gained, 'lost': lost},
+        }
+
+    def _substitutions(self, variant) -> Dict[int, str]:
+        """Map of position to replacement base, dropping no-op substitutions."""
+        if isinstance(variant, str):
+            pairs = ((pos, mut) for pos, _, mut in iter_substitutions(self.reference, variant.upper()))
+        elif isinstance(variant, Variant):
+            if not (variant.reference is self.reference or variant.reference == self.reference):
+                return self._substitutions(str(variant))
+            pairs = ((pos, mut) for pos, _, mut in variant.mutations())
+        else:
+            pairs = variant
+        changes = {}
+        length = len(self.reference)
+        for pos, alt in pairs:
+            if not 0 <= pos < length:
+                raise ValueError(f"Substitution position {pos} is outside the reference")
+            alt = alt.upper()
+            if alt != self.reference[pos]:
+                changes[pos] = alt
+        return changes
+
+    def _windows(self, changes: Dict[int, str]) -> List[Tuple[int, int]]:
+        """Merged ``[lo, hi)`` windows holding every motif hit that covers a change."""
+        span = self._window
+        windows = []
+        for pos in sorted(changes):
+            lo, hi = max(0, pos - span + 1), min(len(self.reference), pos + span)
+            if windows and lo <= windows[-1][1]:
+                windows[-1][1] = hi
+            else:
+                windows.append([lo, hi])
+        return [tuple(window) for window in windows]
+
+    def _update_motifs(self, changes, base):
+        """Rescan the windows around changes and record how the reference hits change."""
+        splices = {}
+        gained, lost = {}, {}
+        for lo, hi in self._windows(changes):
+            window = ''.join(base(i) for i in range(lo, hi))
+            found = self._scanner.scan(window)
+            for name, length in self._motif_lengths.items():
+                old = self.motifs.get(name, ())
+                first, last = bisect_left(old, lo), bisect_left(old, hi - length + 1)
+                before = old[first:last]
+                after = [lo + pos for pos in found.get(name, ())]
+                if before == after:
+                    continue
+                splices.setdefault(name, []).append((first, last, after))
+                removed, added = set(before) - set(after), set(after) - set(before)
+                if removed:
+                    lost.setdefault(name, []).extend(sorted(removed))
+                if added:
+                    gained.setdefault(name, []).extend(sorted(added))
+        return MotifHits(self.motifs, splices), gained, lost
+
+
+class MotifHits(Mapping):
+    """Motif name to hit positions of a variant, as splices into the reference hits.
+
+    Position lists are built on first access, so evaluating a variant does
+    not copy the (possibly long) hit lists of the reference. Lists of
+    motifs the variant does not touch are the reference's own lists.
+    """
+
+    def __init__(self, reference_hits: Dict[str, List[int]],
+                 splices: Dict[str, List[Tuple[int, int, List[int]]]]):
+        self._reference = reference_hits
+        self._splices = splices
+        self._built = {}
+        self._counts = {name: self._count(name) for name in set(reference_hits) | set(splices)}
+        self._names = [name for name, count in self._counts.items() if count]
+
+    def _count(self, name: str) -> int:
+        count = len(self._reference.get(name, ()))
+        for first, last, after in self._splices.get(name, ()):
+            count += len(after) - (last - first)
+        return count
+
+    def count(self, name: str) -> int:
+        """Number of hits of a motif, without building its position list."""
+        return self._counts.get(name, 0)
+
+    def __getitem__(self, name: str) -> List[int]:
+        if not self._counts.get(name):
+            raise KeyError(name)
+        if name not in self._splices:
+            return self._reference[name]
+        if name not in self._built:
+            old = self._reference.get(name, [])
+            hits, previous = [], 0
+            for first, last, after in self._splices[name]:
+                hits.extend(old[previous:first])
+                hits.extend(after)
+                previous = last
+            hits.extend(old[previous:])
+            self._built[name] = hits
+        return self._built[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"MotifHits({dict(self)!r})"
+
+
+def variant_quality(reference: str, variants: Iterable[Union[str, Variant]],
+                    motifs: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """Quality metrics of each variant, computed incrementally from ``reference``."""
+    state = ReferenceQuality(reference, motifs)
+    return [state.evaluate(variant) for variant in variants]
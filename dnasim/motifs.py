@@ -0,0 +1,127 @@
+"""Multi-pattern motif scanning with an Aho-Corasick automaton."""
+from collections import deque
+from functools import lru_cache
+from itertools import product
+from typing import Dict, List, Tuple
+
+# IUPAC nucleotide codes and the bases each one matches
+IUPAC_CODES = {
+    'A': 'A', 'C': 'C', 'G': 'G', 'T': 'T',
+    'R': 'AG', 'Y': 'CT', 'S': 'CG', 'W': 'AT', 'K': 'GT', 'M': 'AC',
+    'B': 'CGT', 'D': 'AGT', 'H': 'ACT', 'V': 'ACG', 'N': 'ACGT'
+}
+
+IUPAC_COMPLEMENT = str.maketrans('ACGTRYSWKMBDHVN', 'TGCAYRSWMKVHDBN')
+
+_ALPHABET = 'ACGT'
+# Maps ACGT (either case) to 0-3 and every other byte to 4 (resets the scan)
+_CODES = bytes(_ALPHABET.index(chr(b).upper()) if chr(b).upper() in _ALPHABET else 4
+               for b in range(256))
+
+
+def reverse_complement(motif: str) -> str:
+    """Reverse complement of a (possibly degenerate) motif."""
+    return motif.upper().translate(IUPAC_COMPLEMENT)[::-1]
+
+
+def expand_motif(motif: str) -> List[str]:
+    """Expand IUPAC degenerate codes into every concrete ACGT pattern."""
+    try:
+        choices = [IUPAC_CODES[base] for base in motif.upper()]
+    except KeyError as e:
+        raise ValueError(f"Invalid IUPAC code in motif '{motif}': {e.args[0]}") from None
+    return [''.join(bases) for bases in product(*choices)]
+
+
+class MotifScanner:
+    """Aho-Corasick automaton matching a whole motif catalog in one pass.
+
+    The automaton is compiled into a full transition table over A, C, G
+    and T, so scanning costs one table lookup per base however many motifs
+    the catalog holds. Bases other than ACGT (e.g. N) reset the scan.
+
+    Args:
+        motifs: Mapping of motif name to (IUPAC) motif sequence
+        both_strands: Also match reverse complements, reported at their
+            start position on the forward strand
+    """
+
+    def __init__(self, motifs: Dict[str, str], both_strands: bool = False):
+        self.names = list(motifs)
+        goto = [[-1] * 4]
+        outputs = [set()]
+        for index, (name, motif) in enumerate(motifs.items()):
+            if not motif:
+                raise ValueError(f"Motif '{name}' is empty")
+            patterns = set(expand_motif(motif))
+            if both_strands:
+                patterns.update(expand_motif(reverse_complement(motif)))
+            for pattern in patterns:
+                state = 0
+                for base in pattern:
+                    code = _ALPHABET.index(base)
+                    if goto[state][code] < 0:
+                        goto[state][code] = len(goto)
+                        goto.append([-1] * 4)
+                        outputs.append(set())
+                    state = goto[state][code]
+                outputs[state].add((index, len(pattern)))
+
+        # Breadth-first pass turning the trie into a complete automaton
+        fail = [0] * len(goto)
+        queue = deque()
+        for code in range(4):
+            child = goto[0][code]
+            if child < 0:
+                goto[0][code] = 0
+            else:
+                queue.append(child)
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            for code in range(4):
+                child = goto[state][code]
+                if child < 0:
+                    goto[state][code] = goto[fail[state]][code]
+                else:
+                    fail[child] = goto[fail[state]][code]
+                    queue.append(child)
+
+        self._delta = [tuple(row) for row in goto]
+        self._outputs = [tuple(out) if out else None for out in outputs]
+
+    def scan(self, sequence: str) -> Dict[str, List[int]]:
+        """Find every motif occurrence.
+
+        Returns:
+            Dict of motif name to sorted start positions, for motifs found
+        """
+        delta, outputs = self._delta, self._outputs
+        hits = [[] for _ in self.names]
+        state = 0
+        for end, code in enumerate(sequence.encode('ascii').translate(_CODES)):
+            if code == 4:
+                state = 0
+                continue
+            state = delta[state][code]
+            matched = outputs[state]
+            if matched:
+                for index, length in matched:
+                    hits[index].append(end - length + 1)
+        return {name: sorted(positions) for name, positions in zip(self.names, hits) if positions}
+
+
+@lru_cache(maxsize=32)
+def _cached_scanner(motifs: Tuple[Tuple[str, str], ...], both_strands: bool) -> MotifScanner:
+    return MotifScanner(dict(motifs), both_strands)
+
+
+def get_scanner(motifs: Dict[str, str], both_strands: bool = False) -> MotifScanner:
+    """Return a compiled scanner for ``motifs``, reusing cached automata."""
+    return _cached_scanner(tuple(motifs.items()), both_strands)
+
+
+def motif_catalog() -> Dict[str, str]:
+    """Regulatory elements and TF binding sites from ``dnasim.sequences``."""
+    from .sequences import REGULATORY_ELEMENTS, TF_BINDING_SITES
+    return {**REGULATORY_ELEMENTS, **TF_BINDING_SITES}
@@ -29,6 +29,9 @@ UV_MUTATION_PATTERNS = {
     'TC': 'TT'   # TC to TT mutation
 }
 
+# Rate multiplier for bases in UV-exposed dipyrimidines
+UV_MUTATION_RATE = 10.0
+
 def get_mutation_probability(base: str, to_base: str) -> float:
     """Get empirically observed mutation probability."""
     if to_base in MUTATION_PROBABILITIES['transitions'][base]:
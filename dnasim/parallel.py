@@ -0,0 +1,120 @@
+"""Process-pool helpers for parallel variant generation."""
+import mmap
+import os
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from .variant import Variant
+
+_worker_draw = None
+_worker_buffer = None
+
+
+def _init_worker(sequence: str, rate: float, engine: str, model=None):
+    """Compile the sampler once per worker process."""
+    global _worker_draw
+    from .core import _make_sampler
+    _worker_draw = _make_sampler(sequence, rate, engine, model)
+
+
+def _draw_chunk(task: Tuple[int, int]) -> List[Tuple[bytes, bytes]]:
+    """Draw one chunk in a worker, returning only the substitution arrays."""
+    seed, count = task
+    return [(variant.positions.tobytes(), variant.alts) for variant in _worker_draw(count, seed)]
+
+
+def ordered_map(func: Callable, tasks: Iterable, workers: int, initializer: Callable = None,
+                initargs: tuple = (), window: int = None) -> Iterator:
+    """Run ``func`` over ``tasks`` in a process pool, yielding results in task order.
+
+    At most ``window`` tasks (default ``2 * workers``) are in flight, so
+    tasks may be an unbounded generator and results are produced lazily.
+    """
+    window = window or 2 * workers
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        pending = deque(pool.submit(func, task) for task in islice(tasks, window))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for task in islice(tasks, 1):
+                    pending.append(pool.submit(func, task))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def parallel_chunks(sequence: str, rate: float, engine: str, tasks: Iterable[Tuple[int, int]],
+                    workers: int, model=None) -> Iterator[List[Variant]]:
+    """Draw ``(seed, count)`` chunks across ``workers`` processes, in task order."""
+    results = ordered_map(_draw_chunk, tasks, workers, initializer=_init_worker,
+                          initargs=(sequence, rate, engine, model))
+    try:
+        for chunk in results:
+            variants = []
+            for position_bytes, alts in chunk:
+                positions = array('q')
+                positions.frombytes(position_bytes)
+                variants.append(Variant(sequence, positions, alts))
+            yield variants
+    finally:
+        results.close()
+
+
+def _init_mapped(path: str):
+    """Map the packed sequence file read-only, once per worker process."""
+    global _worker_buffer
+    with open(path, 'rb') as f:
+        _worker_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _mapped_task(task: Tuple[Callable, List[Tuple[int, int]]]) -> List:
+    """Apply a function to each ``(start, stop)`` span of the mapped buffer."""
+    func, spans = task
+    return [func(_worker_buffer[start:stop].decode('ascii')) for start, stop in spans]
+
+
+def mapped_map(func: Callable[[str], object], sequences: List[str], workers: int,
+               chunksize: Optional[int] = None) -> List:
+    """Apply ``func`` to every sequence across a process pool, in input order.
+
+    Sequences are packed once into a temporary file that each worker maps
+    read-only, so tasks only carry ``(start, stop)`` offsets instead of
+    pickled sequences. ``func`` must be a module-level function.
+
+    Args:
+        func: Function taking a sequence string
+        sequences: Input sequences (strings or reference ``SequenceView`` objects)
+        workers: Number of worker processes
+        chunksize: Sequences per task (default: about 4 tasks per worker)
+    """
+    if not sequences:
+        return []
+    chunksize = chunksize or max(1, -(-len(sequences) // (workers * 4)))
+    spans = []
+    offset = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sequences')
+        with open(path, 'wb') as f:
+            for sequence in sequences:
+                # Reference views are copied chunk by chunk, never decoded whole
+                parts = [sequence] if isinstance(sequence, str) else sequence.iter_chunks()
+                start = offset
+                for part in parts:
+                    data = part.encode('ascii')
+                    f.write(data)
+                    offset += len(data)
+                spans.append((start, offset))
+            # mmap cannot map an empty file
+            f.write(b'\0')
+
+        tasks = [(func, spans[i:i + chunksize]) for i in range(0, len(spans), chunksize)]
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_mapped, initargs=(path,)) as pool:
+            for part in pool.map(_mapped_task, tasks):
+                results.extend(part)
+    return results
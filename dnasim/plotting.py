@@ -0,0 +1,74 @@
+"""Figure helpers shared by the plotting functions.
+
+Figures saved to a file are drawn on a non-interactive Agg canvas without
+going through pyplot, so batch jobs never need a display and never leak
+pyplot state. Long per-position series are binned to the pixel width of
+their axes, keeping the number of artists (and the render time) constant
+however long the sequence is.
+"""
+import os
+import sys
+import warnings
+from typing import Optional, Tuple
+
+_NON_INTERACTIVE = ('agg', 'pdf', 'ps', 'svg', 'cairo', 'template', 'pgf')
+
+
+def is_headless() -> bool:
+    """True when figures cannot be shown (no display, or a file-only backend)."""
+    import matplotlib
+    backend = matplotlib.get_backend().lower()
+    if backend in _NON_INTERACTIVE:
+        return True
+    if 'inline' in backend:  # notebooks display figures without a window
+        return False
+    if sys.platform.startswith('linux'):
+        return not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+    return False
+
+
+def new_figure(figsize: Tuple[float, float], interactive: bool = False):
+    """Create a figure, on an Agg canvas unless it is meant to be shown."""
+    if interactive:
+        import matplotlib.pyplot as plt
+        return plt.figure(figsize=figsize)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def finish(fig, output_file: Optional[str], interactive: bool):
+    """Save ``fig`` to ``output_file``, or show it when interactive."""
+    fig.tight_layout()
+    if output_file:
+        fig.savefig(output_file)
+    if interactive:
+        import matplotlib.pyplot as plt
+        if not output_file:
+            plt.show()
+        plt.close(fig)
+    elif not output_file:
+        warnings.warn("No display available; pass output_file to save the figure", stacklevel=3)
+
+
+def pixel_width(ax) -> int:
+    """Width of ``ax`` in pixels at the figure's resolution."""
+    return max(1, int(ax.get_position().width * ax.figure.get_figwidth() * ax.figure.dpi))
+
+
+def bin_series(values, bins: int, reduce: str = 'sum'):
+    """Aggregate a per-position series into at most ``bins`` contiguous bins.
+
+    Returns:
+        Tuple of ``(edges, binned)``: ``len(binned) + 1`` bin edges in
+        position units and the sum (or mean) of each bin
+    """
+    import numpy as np
+    values = np.asarray(values)
+    edges = np.unique(np.linspace(0, len(values), min(bins, len(values)) + 1).astype(np.int64))
+    binned = np.add.reduceat(values, edges[:-1]) if len(values) else values[:0]
+    if reduce == 'mean':
+        binned = binned / np.diff(edges)
+    return edges, binned
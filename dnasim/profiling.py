@@ -0,0 +1,126 @@
+"""Optional per-stage timers and counters for the dnasim pipeline.
+
+Instrumentation is off unless a ``profile()`` block is active. Instrumented
+functions then check a single module global per call and never add work
+per base or per variant, so disabled profiling costs nothing measurable.
+
+Example:
+    >>> from dnasim import mutate, profiling
+    >>> with profiling.profile() as prof:
+    ...     variants = mutate("ATGCGT" * 100, rate=0.01, n_variants=50)
+    >>> print(prof.report())
+
+Stages are timed inclusively, so nested stages (e.g. ``mutate.draw`` inside
+``mutate``) overlap their parent. Work done in worker processes is seen
+as the time the parent spends waiting for it.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+_current = None
+
+
+class Profile:
+    """Accumulated calls, seconds and counters per pipeline stage.
+
+    Args:
+        callback: Called as ``callback(stage, seconds, counters)`` each time
+            a stage records a measurement
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, float, Dict[str, int]], None]] = None):
+        self.stages = {}
+        self.callback = callback
+
+    def record(self, stage: str, seconds: float = 0.0, calls: int = 1, **counters: int):
+        """Add one measurement of ``stage`` (time, calls and named counters)."""
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = {'calls': 0, 'seconds': 0.0}
+        entry['calls'] += calls
+        entry['seconds'] += seconds
+        for name, value in counters.items():
+            entry[name] = entry.get(name, 0) + value
+        if self.callback is not None:
+            self.callback(stage, seconds, counters)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {stage: dict(entry) for stage, entry in self.stages.items()}
+
+    def dump(self, path: str):
+        """Write the per-stage breakdown as JSON."""
+        import json
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self) -> str:
+        """Per-stage breakdown as a text table, slowest stage first."""
+        lines = [f"{'stage':<24}{'calls':>8}{'seconds':>12}  counters"]
+        for stage, entry in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']):
+            counters = ', '.join(f'{name}={value}' for name, value in entry.items()
+                                 if name not in ('calls', 'seconds'))
+            lines.append(f"{stage:<24}{entry['calls']:>8}{entry['seconds']:>12.4f}  {counters}")
+        return '\n'.join(lines)
+
+
+def active() -> Optional[Profile]:
+    """Return the profile collecting measurements, or None when disabled."""
+    return _current
+
+
+@contextmanager
+def profile(callback: Optional[Callable[[str, float, Dict[str, int]], None]] = None) -> Iterator[Profile]:
+    """Collect measurements from instrumented functions within the block.
+
+    Blocks may be nested; the innermost one receives the measurements.
+    """
+    global _current
+    previous, _current = _current, Profile(callback)
+    try:
+        yield _current
+    finally:
+        _current = previous
+
+
+def instrument(stage: str, sized: bool = False) -> Callable:
+    """Decorator timing every call of a function as ``stage``.
+
+    Args:
+        stage: Stage name
+        sized: Also count ``len()`` of the first argument as bases processed
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            prof = _current
+            if prof is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if sized and args:
+                    prof.record(stage, time.perf_counter() - start, bases=len(args[0]))
+                else:
+                    prof.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def timed(iterator: Iterator, stage: str, prof: Profile) -> Iterator:
+    """Yield from ``iterator``, recording the time spent producing items."""
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            prof.record(stage, time.perf_counter() - start)
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
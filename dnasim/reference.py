@@ -0,0 +1,443 @@
+"""Memory-mapped FASTA and 2-bit reference loaders.
+
+Records are exposed as ``SequenceView`` objects that decode bases only for
+the regions actually requested, so opening a genome costs one pass over its
+line breaks (or reading its ``.fai`` index) and memory use stays
+proportional to the regions touched. Compressed FASTA must be bgzipped and
+indexed (``samtools faidx``); its blocks are decompressed as regions are
+read.
+"""
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+TWOBIT_SIGNATURE = 0x1A412743
+_TWOBIT_BASES = 'TCAG'
+# Each packed byte holds four bases, most significant bits first
+_TWOBIT_DECODE = [''.join(_TWOBIT_BASES[(byte >> shift) & 3] for shift in (6, 4, 2, 0))
+                  for byte in range(256)]
+_TWOBIT_ENCODE = {base: code for code, base in enumerate(_TWOBIT_BASES)}
+
+
+class SequenceView:
+    """Read-only view of a reference record.
+
+    Slicing returns a ``str`` decoded from the underlying mapping; slicing
+    with a step of 1 returns only the bases requested. ``str(view)``
+    materializes the whole record.
+
+    Args:
+        name: Record name
+        length: Number of bases
+        fetch: Function returning the bases in ``[start, stop)``
+        offset: Start of this view within the record
+    """
+    __slots__ = ('name', '_length', '_fetch', '_offset')
+
+    def __init__(self, name: str, length: int, fetch: Callable[[int, int], str], offset: int = 0):
+        self.name = name
+        self._length = length
+        self._fetch = fetch
+        self._offset = offset
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def start(self) -> int:
+        """Position of the view's first base within its record (0-based)."""
+        return self._offset
+
+    def __getitem__(self, key: Union[int, slice]) -> str:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return self[start:stop][::step] if start < stop else ''
+            if start >= stop:
+                return ''
+            return self._fetch(self._offset + start, self._offset + stop)
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("SequenceView index out of range")
+        return self._fetch(self._offset + key, self._offset + key + 1)
+
+    def region(self, start: int, stop: int) -> 'SequenceView':
+        """Return a view of ``[start, stop)`` without decoding any bases."""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        return SequenceView(self.name, max(0, stop - start), self._fetch, self._offset + start)
+
+    def iter_chunks(self, size: int = 1 << 20) -> Iterator[str]:
+        """Yield the record as consecutive strings of at most ``size`` bases."""
+        for start in range(0, self._length, size):
+            yield self[start:start + size]
+
+    def upper(self) -> str:
+        return str(self).upper()
+
+    def __str__(self) -> str:
+        return self[0:self._length]
+
+    def __repr__(self) -> str:
+        return f"SequenceView(name={self.name!r}, length={self._length})"
+
+
+class Reference:
+    """Collection of named records backed by a mapped or in-memory buffer."""
+
+    def __init__(self, records: Dict[str, SequenceView], handle=None):
+        self._records = records
+        self._handle = handle
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._records)
+
+    def __getitem__(self, name: str) -> SequenceView:
+        try:
+            return self._records[name]
+        except KeyError:
+            raise KeyError(f"Unknown reference record '{name}'") from None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._records
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def fetch(self, region: str) -> SequenceView:
+        """Return a view for ``'name'`` or ``'name:start-end'`` (1-based, inclusive)."""
+        name, start, stop = parse_region(region)
+        view = self[name]
+        return view.region(start, len(view) if stop is None else stop)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> 'Reference':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_region(region: str) -> Tuple[str, int, Optional[int]]:
+    """Parse ``'name[:start-end]'`` into a 0-based half-open interval."""
+    name, _, span = region.partition(':')
+    if not span:
+        return name, 0, None
+    try:
+        start, _, end = span.replace(',', '').partition('-')
+        start, end = int(start), int(end) if end else None
+    except ValueError:
+        raise ValueError(f"Invalid region '{region}', expected name:start-end") from None
+    if start < 1 or (end is not None and end < start):
+        raise ValueError(f"Invalid region '{region}': coordinates are 1-based with start <= end")
+    return name, start - 1, end
+
+
+def open_reference(path: str) -> Reference:
+    """Open a FASTA (optionally bgzipped) or 2-bit reference file.
+
+    Plain FASTA and 2-bit files are memory mapped. A samtools ``.fai``
+    index next to a plain FASTA file is used when present; bgzipped FASTA
+    (``.gz``) needs one, and its ``.gzi`` block index is used when present.
+    Plain gzip cannot be read without decompressing the whole file, so it
+    is rejected with ``ValueError``.
+    """
+    if path.endswith('.2bit'):
+        return _open_twobit(path)
+    if path.endswith('.gz'):
+        return _open_bgzf_fasta(path)
+    f = open(path, 'rb')
+    if os.fstat(f.fileno()).st_size == 0:
+        f.close()
+        return Reference({})
+    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    f.close()
+    fai = path + '.fai'
+    records = _read_fai(buffer, fai) if os.path.exists(fai) else _index_fasta(buffer)
+    return Reference(records, buffer)
+
+
+def _fasta_fetcher(buffer, offset: int, line_bases: int, line_bytes: int) -> Callable[[int, int], str]:
+    """Fetch bases of a regularly wrapped FASTA record straight from the buffer."""
+    def fetch(start: int, stop: int) -> str:
+        first = offset + (start // line_bases) * line_bytes + start % line_bases
+        last = offset + ((stop - 1) // line_bases) * line_bytes + (stop - 1) % line_bases + 1
+        data = buffer[first:last]
+        if line_bytes != line_bases:
+            data = data.replace(b'\r', b'').replace(b'\n', b'')
+        return data.decode('ascii')
+    return fetch
+
+
+def _index_fasta(buffer) -> Dict[str, SequenceView]:
+    """Locate records by their header lines and check their line wrapping."""
+    records = {}
+    size = len(buffer)
+    header = buffer.find(b'>')
+    while header >= 0:
+        header_end = buffer.find(b'\n', header)
+        if header_end < 0:
+            header_end = size
+        name = buffer[header + 1:header_end].decode('ascii').split()[0]
+        start = header_end + 1
+        end = buffer.find(b'\n>', header_end)
+        end = size if end < 0 else end + 1
+
+        line_end = buffer.find(b'\n', start, end)
+        if line_end < 0:
+            line_end = end
+        line_bases = line_end - start - (1 if buffer[line_end - 1:line_end] == b'\r' else 0)
+        line_bytes = line_end + 1 - start
+        length = _record_length(buffer, start, end, line_bases, line_bytes, name)
+        if line_bases > 0:
+            records[name] = SequenceView(name, length, _fasta_fetcher(buffer, start, line_bases, line_bytes))
+        else:
+            records[name] = SequenceView(name, 0, lambda a, b: '')
+        header = buffer.find(b'>', end) if end < size else -1
+    return records
+
+
+def _record_length(buffer, start: int, end: int, line_bases: int, line_bytes: int, name: str = '') -> int:
+    """Number of bases in ``buffer[start:end]``.
+
+    Like samtools faidx, requires every line but the last to hold exactly
+    ``line_bases`` bases, and raises ``ValueError`` otherwise: every line
+    break must sit at a multiple of ``line_bytes`` and there must be no
+    other line breaks.
+    """
+    # Ignore trailing newlines (including blank lines) at the end of the record
+    while end > start and buffer[end - 1:end] in (b'\n', b'\r'):
+        end -= 1
+    if line_bases <= 0 or end <= start:
+        return 0
+    full_lines, remainder = divmod(end - start, line_bytes)
+    breaks = buffer[start + line_bytes - 1:end:line_bytes]
+    if (remainder > line_bases or breaks.count(b'\n') != len(breaks)
+            or _count_newlines(buffer, start, end) != len(breaks)):
+        raise ValueError(f"FASTA record '{name}' has lines of different lengths; "
+                         f"all lines but the last must hold {line_bases} bases")
+    return full_lines * line_bases + remainder
+
+
+def _count_newlines(buffer, start: int, end: int, block: int = 1 << 24) -> int:
+    """Count line breaks in ``buffer[start:end]`` a block at a time."""
+    return sum(buffer[i:min(i + block, end)].count(b'\n') for i in range(start, end, block))
+
+
+def _read_fai(buffer, path: str) -> Dict[str, SequenceView]:
+    """Load record offsets from a samtools faidx index."""
+    records = {}
+    with open(path) as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 5:
+                continue
+            name, length, offset, line_bases, line_bytes = fields[0], *map(int, fields[1:5])
+            records[name] = SequenceView(name, length, _fasta_fetcher(buffer, offset, line_bases, line_bytes))
+    return records
+
+
+class _BgzfBuffer:
+    """Uncompressed bytes of a mapped BGZF file, sliced a block at a time.
+
+    Only the blocks overlapping a slice are decompressed; the few most
+    recently used ones are kept.
+
+    Args:
+        data: Mapped compressed file
+        blocks: ``(compressed offset, uncompressed offset)`` of every block
+        size: Uncompressed size
+    """
+    CACHED_BLOCKS = 4
+
+    def __init__(self, data, blocks: List[Tuple[int, int]], size: int):
+        self._data = data
+        self._compressed = array('Q', (c for c, _ in blocks))
+        self._offsets = array('Q', (u for _, u in blocks))
+        self._size = size
+        self._cache = OrderedDict()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: slice) -> bytes:
+        start, stop, _ = key.indices(self._size)
+        parts = []
+        i = bisect_right(self._offsets, start) - 1
+        while start < stop:
+            block = self._block(i)
+            part = block[start - self._offsets[i]:stop - self._offsets[i]]
+            parts.append(part)
+            start += len(part)
+            i += 1
+        return b''.join(parts)
+
+    def _block(self, i: int) -> bytes:
+        block = self._cache.pop(i, None)
+        if block is None:
+            offset = self._compressed[i]
+            header, size, _ = _bgzf_block(self._data, offset)
+            block = zlib.decompress(self._data[offset + header:offset + size - 8], -15)
+        self._cache[i] = block
+        while len(self._cache) > self.CACHED_BLOCKS:
+            self._cache.popitem(last=False)
+        return block
+
+    def close(self):
+        self._data.close()
+
+
+def _bgzf_block(data, offset: int) -> Tuple[int, int, int]:
+    """``(header size, block size, uncompressed size)`` of the BGZF block at ``offset``.
+
+    Raises ``ValueError`` when there is no BGZF block header there.
+    """
+    if data[offset:offset + 4] != b'\x1f\x8b\x08\x04':
+        raise ValueError("Not a BGZF block")
+    (extra_size,) = struct.unpack_from('<H', data, offset + 10)
+    pos, end = offset + 12, offset + 12 + extra_size
+    while pos + 4 <= end:
+        tag, field_size = data[pos:pos + 2], struct.unpack_from('<H', data, pos + 2)[0]
+        if tag == b'BC' and field_size == 2:
+            size = struct.unpack_from('<H', data, pos + 4)[0] + 1
+            return end - offset, size, struct.unpack_from('<I', data, offset + size - 4)[0]
+        pos += 4 + field_size
+    raise ValueError("Not a BGZF block")
+
+
+def _bgzf_blocks(data, gzi: str) -> Tuple[List[Tuple[int, int]], int]:
+    """Block offsets of a BGZF file (from its ``.gzi`` index when present) and its size."""
+    if os.path.exists(gzi):
+        with open(gzi, 'rb') as f:
+            index = f.read()
+        (count,) = struct.unpack_from('<Q', index, 0)
+        pairs = struct.unpack_from(f'<{2 * count}Q', index, 8)
+        blocks = [(0, 0)] + list(zip(pairs[::2], pairs[1::2]))
+        _, _, last_size = _bgzf_block(data, blocks[-1][0])
+        return blocks, blocks[-1][1] + last_size
+    blocks = []
+    offset = size = 0
+    while offset < len(data):
+        _, block_size, block_data = _bgzf_block(data, offset)
+        blocks.append((offset, size))
+        offset += block_size
+        size += block_data
+    return blocks, size
+
+
+def _open_bgzf_fasta(path: str) -> Reference:
+    """Open a bgzipped FASTA file through its ``.fai`` index."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return Reference({})
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        try:
+            _bgzf_block(data, 0)
+        except (ValueError, struct.error):
+            raise ValueError(f"{path} is gzip- but not bgzip-compressed, so regions cannot be "
+                             "read without decompressing all of it; recompress it with "
+                             f"'bgzip' and index it with 'samtools faidx', or decompress it") from None
+        fai = path + '.fai'
+        if not os.path.exists(fai):
+            raise ValueError(f"{path} has no .fai index; create one with 'samtools faidx {path}'")
+        buffer = _BgzfBuffer(data, *_bgzf_blocks(data, path + '.gzi'))
+    except BaseException:
+        data.close()
+        raise
+    return Reference(_read_fai(buffer, fai), buffer)
+
+
+def _open_twobit(path: str) -> Reference:
+    """Index a UCSC 2-bit file and expose its records as lazy views."""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    for order in ('<', '>'):
+        signature, version, count, _ = struct.unpack_from(order + 'IIII', buffer, 0)
+        if signature == TWOBIT_SIGNATURE:
+            break
+    else:
+        buffer.close()
+        raise ValueError(f"{path} is not a 2-bit file")
+    offset_format = order + ('Q' if version == 1 else 'I')
+    offset_size = struct.calcsize(offset_format)
+
+    records = {}
+    pos = 16
+    for _ in range(count):
+        name_size = buffer[pos]
+        name = buffer[pos + 1:pos + 1 + name_size].decode('ascii')
+        (record_offset,) = struct.unpack_from(offset_format, buffer, pos + 1 + name_size)
+        pos += 1 + name_size + offset_size
+        records[name] = _twobit_record(buffer, order, name, record_offset)
+    return Reference(records, buffer)
+
+
+def _twobit_record(buffer, order: str, name: str, offset: int) -> SequenceView:
+    length, n_count = struct.unpack_from(order + 'II', buffer, offset)
+    offset += 8
+    n_starts = struct.unpack_from(f'{order}{n_count}I', buffer, offset)
+    n_sizes = struct.unpack_from(f'{order}{n_count}I', buffer, offset + 4 * n_count)
+    offset += 8 * n_count
+    (mask_count,) = struct.unpack_from(order + 'I', buffer, offset)
+    # Skip soft-mask blocks and the reserved word; bases are returned uppercase
+    packed = offset + 4 + 8 * mask_count + 4
+    n_blocks = list(zip(n_starts, n_sizes))
+
+    def fetch(start: int, stop: int) -> str:
+        data = buffer[packed + start // 4:packed + (stop + 3) // 4]
+        bases = ''.join([_TWOBIT_DECODE[byte] for byte in data])[start % 4:start % 4 + stop - start]
+        for block_start, block_size in n_blocks:
+            lo, hi = max(block_start, start), min(block_start + block_size, stop)
+            if lo < hi:
+                bases = bases[:lo - start] + 'N' * (hi - lo) + bases[hi - start:]
+        return bases
+
+    return SequenceView(name, length, fetch)
+
+
+def write_twobit(path: str, records: Dict[str, str]):
+    """Write sequences to a UCSC 2-bit file (N runs are stored as N blocks)."""
+    header = struct.pack('<IIII', TWOBIT_SIGNATURE, 0, len(records), 0)
+    index_size = sum(1 + len(name.encode('ascii')) + 4 for name in records)
+    offset = len(header) + index_size
+    index, bodies = [], []
+    for name, sequence in records.items():
+        sequence = str(sequence).upper()
+        n_blocks = []
+        i = sequence.find('N')
+        while i >= 0:
+            j = i
+            while j < len(sequence) and sequence[j] == 'N':
+                j += 1
+            n_blocks.append((i, j - i))
+            i = sequence.find('N', j)
+        body = bytearray(struct.pack('<II', len(sequence), len(n_blocks)))
+        body += struct.pack(f'<{len(n_blocks)}I', *(s for s, _ in n_blocks))
+        body += struct.pack(f'<{len(n_blocks)}I', *(n for _, n in n_blocks))
+        body += struct.pack('<II', 0, 0)
+        codes = [_TWOBIT_ENCODE.get(base, 0) for base in sequence]
+        codes += [0] * (-len(codes) % 4)
+        body += bytes((codes[i] << 6) | (codes[i + 1] << 4) | (codes[i + 2] << 2) | codes[i + 3]
+                      for i in range(0, len(codes), 4))
+        encoded = name.encode('ascii')
+        index.append(bytes([len(encoded)]) + encoded + struct.pack('<I', offset))
+        bodies.append(bytes(body))
+        offset += len(body)
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.writelines(index)
+        f.writelines(bodies)
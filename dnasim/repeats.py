@@ -0,0 +1,114 @@
+"""Suffix-array index for finding maximal repeats in near-linear time."""
+import heapq
+from typing import List, Optional, Tuple
+import numpy as np
+
+_NONE = -1   # no preceding character seen yet
+_MIXED = -2  # preceding characters differ (or the suffix starts the sequence)
+
+
+def suffix_array(sequence: str) -> np.ndarray:
+    """Build the suffix array of ``sequence`` by prefix doubling.
+
+    Each round sorts suffixes by their first ``2k`` characters with one
+    vectorized lexsort, so construction takes O(n log n) per round and
+    O(log r) rounds for a longest repeat of length ``r``.
+    """
+    n = len(sequence)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    rank = np.frombuffer(sequence.encode('ascii'), dtype=np.uint8).astype(np.int64)
+    k = 1
+    while True:
+        second = np.full(n, -1, dtype=np.int64)
+        if k < n:
+            second[:n - k] = rank[k:]
+        sa = np.lexsort((second, rank))
+        first_keys, second_keys = rank[sa], second[sa]
+        changed = (first_keys[1:] != first_keys[:-1]) | (second_keys[1:] != second_keys[:-1])
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = np.concatenate(([0], np.cumsum(changed)))
+        if rank[sa[-1]] == n - 1 or k >= n:
+            return sa
+        k *= 2
+
+
+def lcp_array(sequence: str, sa: np.ndarray) -> List[int]:
+    """Longest common prefix of each suffix with its predecessor (Kasai)."""
+    n = len(sequence)
+    sa = sa.tolist()
+    rank = [0] * n
+    for r, pos in enumerate(sa):
+        rank[pos] = r
+    lcp = [0] * n
+    h = 0
+    for i in range(n):
+        r = rank[i]
+        if r == 0:
+            h = 0
+            continue
+        j = sa[r - 1]
+        while i + h < n and j + h < n and sequence[i + h] == sequence[j + h]:
+            h += 1
+        lcp[r] = h
+        if h:
+            h -= 1
+    return lcp
+
+
+def maximal_repeats(sequence: str, min_length: int = 4,
+                    max_results: Optional[int] = None) -> List[Tuple[str, int, int]]:
+    """Find maximal repeats: repeated substrings that cannot be extended
+    left or right without losing an occurrence.
+
+    Walks the lcp-intervals of the suffix array bottom-up; each interval
+    is a right-maximal repeat and is reported when its occurrences are not
+    all preceded by the same base.
+
+    With ``max_results``, only the longest repeats (earliest first among
+    equal lengths) are kept while walking, so memory stays bounded however
+    repetitive the sequence is.
+
+    Returns:
+        List of ``(repeat, first_position, occurrences)`` tuples
+    """
+    n = len(sequence)
+    if n < 2:
+        return []
+    sa = suffix_array(sequence)
+    lcp = lcp_array(sequence, sa)
+    sa = sa.tolist()
+    left = [ord(sequence[pos - 1]) if pos else _MIXED for pos in sa]
+
+    def combine(a: int, b: int) -> int:
+        if a == _NONE:
+            return b
+        return a if a == b else _MIXED
+
+    repeats = []
+    # Stack entries: [lcp, left bound, preceding character, first position]
+    stack = [[0, 0, _NONE, n]]
+    for i in range(1, n + 1):
+        h = lcp[i] if i < n else -1
+        carry, first = left[i - 1], sa[i - 1]
+        lb = i - 1
+        while stack and h < stack[-1][0]:
+            length, lb, chars, start = stack.pop()
+            chars, start = combine(chars, carry), min(start, first)
+            if length >= min_length and chars == _MIXED:
+                if max_results is None:
+                    repeats.append((length, -start, i - lb))
+                elif len(repeats) < max_results:
+                    heapq.heappush(repeats, (length, -start, i - lb))
+                elif max_results:
+                    heapq.heappushpop(repeats, (length, -start, i - lb))
+            carry, first = chars, start
+        if not stack or h > stack[-1][0]:
+            stack.append([h, lb, carry, first])
+        else:
+            stack[-1][2] = combine(stack[-1][2], carry)
+            stack[-1][3] = min(stack[-1][3], first)
+    if max_results is not None:
+        repeats.sort(key=lambda r: (-r[0], -r[1]))
+    return [(sequence[-start:-start + length], -start, occurrences)
+            for length, start, occurrences in repeats]
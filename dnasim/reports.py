@@ -1,27 +1,55 @@
 """Generate comprehensive DNA sequence quality reports."""
-import matplotlib.pyplot as plt
-from typing import List, Dict
-from .validator import check_sequence_quality
-
-def plot_gc_distribution(sequence: str, window_size: int = 50) -> None:
-    """Plot GC content distribution along sequence."""
-    gc_contents = []
-    for i in range(0, len(sequence) - window_size + 1):
-        window = sequence[i:i+window_size]
-        gc = sum(1 for base in window.upper() if base in 'GC')
-        gc_contents.append((gc / window_size) * 100)
-    
-    plt.figure(figsize=(10, 5))
-    plt.plot(gc_contents)
-    plt.title('GC Content Distribution')
-    plt.xlabel('Sequence Position (Window Size: {})'.format(window_size))
-    plt.ylabel('GC Content (%)')
-    plt.grid(True)
-    plt.savefig('gc_distribution.png')
-    plt.close()
+import os
+from typing import List, Dict, Optional
+from . import cache
+from .cache import cached
+from .validator import check_sequence_quality, gc_profile
+from .profiling import instrument
 
-def generate_quality_report(sequence: str, output_file: str = 'quality_report.txt') -> None:
-    """Generate comprehensive sequence quality report."""
+@instrument('plot')
+def plot_gc_distribution(sequence: str, window_size: int = 50, step: int = 1,
+                         output_file: str = 'gc_distribution.png') -> None:
+    """Plot GC content distribution along sequence.
+
+    Profiles with more windows than the axes has pixels are averaged down
+    to the pixel width before drawing. The figure is rendered on the Agg
+    backend; while a cache is active the rendered file is cached too.
+    """
+    store = cache.active()
+    if store is not None and output_file:
+        key = store.key('plot_gc_distribution', sequence, window_size, step,
+                        os.path.splitext(output_file)[1].lower())
+        image = store.get(key)
+        if image is not None:
+            with open(output_file, 'wb') as f:
+                f.write(image)
+            return
+    _draw_gc_distribution(sequence, window_size, step, output_file)
+    if store is not None and output_file:
+        with open(output_file, 'rb') as f:
+            store.put(key, f.read())
+
+def _draw_gc_distribution(sequence: str, window_size: int, step: int, output_file: str):
+    from .plotting import bin_series, finish, new_figure, pixel_width
+    gc_contents = gc_profile(sequence, window_size, step)
+
+    fig = new_figure((10, 5))
+    ax = fig.subplots()
+    width = pixel_width(ax)
+    if len(gc_contents) > width:
+        edges, binned = bin_series(gc_contents, width, reduce='mean')
+        ax.plot(edges[:-1] * step, binned)
+    else:
+        ax.plot([i * step for i in range(len(gc_contents))], gc_contents)
+    ax.set_title('GC Content Distribution')
+    ax.set_xlabel('Sequence Position (Window Size: {})'.format(window_size))
+    ax.set_ylabel('GC Content (%)')
+    ax.grid(True)
+    finish(fig, output_file, interactive=False)
+
+@cached('format_quality_report')
+def format_quality_report(sequence: str) -> str:
+    """Text of the quality report for ``sequence``."""
     quality = check_sequence_quality(sequence)
     
     report = [
@@ -39,16 +67,43 @@ def generate_quality_report(sequence: str, output_file: str = 'quality_report.tx
     report.append("\nRepetitive Regions:")
     for repeat, pos in quality['repetitive_regions']:
         report.append(f"- '{repeat}' at position {pos}")
-    
+    return '\n'.join(report)
+
+@instrument('report', sized=True)
+def generate_quality_report(sequence: str, output_file: str = 'quality_report.txt') -> None:
+    """Generate comprehensive sequence quality report.
+
+    While a ``cache.caching()`` block is active, the report text and the
+    GC plot of a sequence seen before come from the cache.
+    """
+    report = format_quality_report(sequence)
     with open(output_file, 'w') as f:
-        f.write('\n'.join(report))
+        f.write(report)
     
     # Generate GC distribution plot
     plot_gc_distribution(sequence)
 
-def batch_quality_analysis(sequences: Dict[str, str]) -> Dict[str, Dict]:
-    """Analyze multiple sequences and compare their quality metrics."""
-    results = {}
-    for name, seq in sequences.items():
-        results[name] = check_sequence_quality(seq)
-    return results
\ No newline at end of file
+def batch_quality_analysis(sequences: Dict[str, str], workers: int = 1,
+                           chunksize: Optional[int] = None) -> Dict[str, Dict]:
+    """Analyze multiple sequences and compare their quality metrics.
+
+    Args:
+        sequences: Mapping of name to DNA sequence
+        workers: Number of worker processes; sequences are shared with the
+            workers through a memory-mapped file (default: 1)
+        chunksize: Sequences per worker task (default: automatic)
+
+    Returns:
+        Dict of name to quality metrics, in input order
+    """
+    if workers < 1:
+        raise ValueError("Number of workers must be positive")
+    if workers == 1 or len(sequences) < 2:
+        results = {}
+        for name, seq in sequences.items():
+            results[name] = check_sequence_quality(seq)
+        return results
+
+    from .parallel import mapped_map
+    qualities = mapped_map(check_sequence_quality, list(sequences.values()), workers, chunksize)
+    return dict(zip(sequences, qualities))
\ No newline at end of file
@@ -0,0 +1,635 @@
+"""Local asyncio HTTP service for generation, QC and export jobs.
+
+``dnasim serve`` keeps worker processes (and their compiled samplers)
+alive between calls, so small clients stop paying interpreter startup and
+per-call setup. Endpoints (JSON request bodies):
+
+- ``POST /mutate``: ``{"sequence", "rate", "n_variants", "engine", "seed",
+  "format"}``; ``format`` is 'fasta' (default), 'jsonl' (one variant
+  string per line) or 'sparse' (positions and alts per line)
+- ``POST /qc``: ``{"sequence"}``, returns ``check_sequence_quality``
+- ``POST /export``: ``{"sequence", "format"}`` plus either ``"variants"``
+  (strings) or the ``/mutate`` generation fields; ``format`` is 'fasta',
+  'vcf', 'csv', 'json' or 'jsonl'
+- ``GET /metrics``: queue depth, batching and latency counters
+- ``GET /health``
+
+``sequence`` may also be a source as in sweep specs, e.g.
+``{"gene": "P53"}``. ``{"reference": path, "region": ...}`` sources are
+only accepted for files within the server's ``reference_dir``
+(``--reference-dir``); relative paths are taken from there.
+
+Concurrent small ``/mutate`` requests for the same sequence, rate and
+engine are collected for ``batch_window`` seconds and run as one worker
+task that resolves the sequence and compiles its sampler once. The
+requests share that setup, not a random draw: each one still draws from
+its own seed and gets exactly ``mutate(..., seed=seed)``. QC requests are
+batched the same way. Resolving and validating sequences, generating and
+rendering variants and writing exports all happen in the workers. JSON
+bodies (at most ``MAX_BODY`` bytes) are parsed and result files read in
+the loop's default executor, so the event loop itself only moves bytes;
+results go back with chunked transfer encoding.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .core import ENGINES, _check_feasible, _iter_unique, _make_sampler, _validate
+from .rng import resolve_seed
+from .utils import validate_rate
+from .variant import Variant
+
+DEFAULT_PORT = 8765
+STREAM_CHUNK = 1 << 16
+MAX_BODY = 1 << 20  # JSON parameters; results are streamed, not uploaded
+EXPORT_FORMATS = ('fasta', 'vcf', 'csv', 'json', 'jsonl')
+MUTATE_FORMATS = ('fasta', 'jsonl', 'sparse')
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+_CONTENT_TYPES = {'fasta': 'text/x-fasta', 'vcf': 'text/x-vcf', 'csv': 'text/csv',
+                  'json': 'application/json', 'jsonl': 'application/x-ndjson',
+                  'sparse': 'application/x-ndjson'}
+
+# A literal sequence, or the sorted items of a source object such as {"gene": "P53"}
+Source = Union[str, Tuple[Tuple[str, str], ...]]
+
+_worker_cache = OrderedDict()
+WORKER_CACHE = 8
+
+
+def _init_server_worker(cache_dir: Optional[str]):
+    """Set up a worker process; Ctrl-C is left to the server to handle."""
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if cache_dir:
+        from . import cache
+        cache.enable(directory=cache_dir)
+
+
+def _worker_cached(key: tuple, make):
+    """Return ``make()``, kept in the worker's LRU of recent sequences and samplers."""
+    value = _worker_cache.pop(key, None)
+    if value is None:
+        value = make()
+    _worker_cache[key] = value
+    while len(_worker_cache) > WORKER_CACHE:
+        _worker_cache.popitem(last=False)
+    return value
+
+
+def _resolve(source: Source) -> str:
+    """Resolve and validate a sequence source as returned by ``_source``."""
+    def load():
+        from .sweep import resolve_sequence
+        try:
+            sequence = resolve_sequence(source if isinstance(source, str) else dict(source))
+        except (KeyError, OSError) as e:
+            raise ValueError(f"Cannot resolve sequence source: {e}")
+        return _validate(sequence, 0.0, 1, 'python', 1)
+    return _worker_cached(('sequence', source), load)
+
+
+def _generate(source: Source, rate: float, engine: str, n_variants: int, seed: int) -> Iterator[Variant]:
+    sequence = _resolve(source)
+    draw = _worker_cached(('sampler', source, rate, engine), lambda: _make_sampler(sequence, rate, engine))
+    _check_feasible(sequence, rate, n_variants, n_variants * 100, engine)
+    return _iter_unique(lambda tasks: (draw(count, s) for s, count in tasks),
+                        len(sequence), n_variants, 1000, True, seed)
+
+
+def _mutate_batch(source: Source, rate: float, engine: str,
+                  jobs: List[Tuple[int, int, str]]) -> List[Tuple[Optional[str], bytes]]:
+    """Generate and render the variants of several ``(n_variants, seed, format)`` jobs.
+
+    The jobs share the resolved sequence and its compiled sampler, but
+    each one draws from its own seed, exactly like
+    ``mutate(..., seed=seed)``; there is no shared random draw.
+
+    Returns:
+        Per job, ``(error, rendered records)``
+    """
+    results = []
+    for n_variants, seed, fmt in jobs:
+        try:
+            variants = _generate(source, rate, engine, n_variants, seed)
+            results.append((None, ''.join(_mutate_records(variants, fmt)).encode()))
+        except ValueError as e:
+            results.append((str(e), b''))
+    return results
+
+
+def _mutate_file(source: Source, rate: float, engine: str, n_variants: int, seed: int,
+                 fmt: str) -> str:
+    """Write the records of one large ``/mutate`` job to a temporary file and return its path."""
+    def write(path):
+        with open(path, 'w') as f:
+            f.writelines(_mutate_records(_generate(source, rate, engine, n_variants, seed), fmt))
+    return _temp_file(fmt, write)
+
+
+def _quality_batch(sources: List[Source]) -> List[Tuple[Optional[str], Dict]]:
+    """Run ``check_sequence_quality`` on each source (identical ones once)."""
+    from .validator import check_sequence_quality
+    done = {}
+    results = []
+    for source in sources:
+        if source not in done:
+            try:
+                done[source] = (None, check_sequence_quality(_resolve(source)))
+            except ValueError as e:
+                done[source] = (str(e), {})
+        results.append(done[source])
+    return results
+
+
+def _export_job(source: Source, variants: List[str], fmt: str, chrom: str) -> str:
+    """Validate given variants and export them; returns the temporary file's path."""
+    sequence = _resolve(source)
+    variants = [str(variant).upper() for variant in variants]
+    if any(len(variant) != len(sequence) for variant in variants):
+        raise ValueError("Variants must have the same length as the sequence")
+    return _export_file(sequence, variants, fmt, chrom)
+
+
+def _generate_and_export(source: Source, rate: float, engine: str, n_variants: int, seed: int,
+                         fmt: str, chrom: str) -> str:
+    variants = list(_generate(source, rate, engine, n_variants, seed))
+    return _export_file(_resolve(source), variants, fmt, chrom)
+
+
+def _export_file(sequence: str, variants: list, fmt: str, chrom: str) -> str:
+    from . import export
+
+    def write(path):
+        if fmt == 'fasta':
+            export.export_fasta(variants, path)
+        elif fmt == 'vcf':
+            export.export_vcf(sequence, variants, path, chrom=chrom)
+        else:
+            export.export_mutations(sequence, variants, path)
+    return _temp_file(fmt, write)
+
+
+def _temp_file(suffix: str, write) -> str:
+    """Create a temporary file, fill it with ``write(path)`` and return its path."""
+    fd, path = tempfile.mkstemp(suffix='.' + suffix, prefix='dnasim-')
+    os.close(fd)
+    try:
+        write(path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+class HTTPError(Exception):
+    """Request error reported to the client with an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _Batcher:
+    """Collects jobs per key and runs each group as one worker task.
+
+    ``run(*key, jobs)`` is called in the pool and returns one
+    ``(error, result)`` per job.
+    """
+
+    def __init__(self, server: 'MutationServer', run, window: float, max_jobs: int):
+        self.server = server
+        self.run = run
+        self.window = window
+        self.max_jobs = max_jobs
+        self.pending = {}
+        self.tasks = set()
+
+    def submit(self, key: tuple, job) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = self.pending.get(key)
+        if group is None:
+            group = self.pending[key] = []
+            loop.call_later(self.window, self._flush, key, group)
+        group.append((job, future))
+        self.server.queued += 1
+        if len(group) >= self.max_jobs:
+            self._flush(key, group)
+        return future
+
+    def _flush(self, key: tuple, group: list):
+        if self.pending.get(key) is not group:
+            return  # already flushed when it filled up
+        del self.pending[key]
+        task = asyncio.ensure_future(self._run(key, group))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, key: tuple, group: list):
+        server = self.server
+        server.batches += 1
+        server.batched_jobs += len(group)
+        try:
+            results = await server.in_pool(self.run, *key, [job for job, _ in group])
+        except Exception as e:  # a crashed worker fails the whole batch
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            server.queued -= len(group)
+        for (_, future), (error, result) in zip(group, results):
+            if future.done():
+                continue
+            if error:
+                future.set_exception(HTTPError(400, error))
+            else:
+                future.set_result(result)
+
+
+class MutationServer:
+    """Asyncio HTTP server running dnasim jobs in a process pool.
+
+    Args:
+        workers: Number of worker processes (default: 1)
+        batch_window: Seconds to collect concurrent small requests before
+            running them as one batch (default: 0.005)
+        max_batch: Jobs per batch at most (default: 64)
+        small_request: Requests with up to this many bases to generate
+            (``n_variants * len(sequence)``) are batched; larger ones run
+            on their own (default: 1_000_000)
+        cache_dir: Directory of a result cache shared by the workers
+            (default: no cache)
+        reference_dir: Directory whose FASTA and 2-bit files requests may
+            name as ``{"reference": path}`` sources (default: none, such
+            sources are refused)
+    """
+
+    def __init__(self, workers: int = 1, batch_window: float = 0.005, max_batch: int = 64,
+                 small_request: int = 1_000_000, cache_dir: Optional[str] = None,
+                 reference_dir: Optional[str] = None):
+        if workers < 1:
+            raise ValueError("Number of workers must be positive")
+        if batch_window < 0 or max_batch < 1:
+            raise ValueError("Batch window must not be negative and batches must hold a job")
+        self.workers = workers
+        self.small_request = small_request
+        self.reference_dir = os.path.realpath(reference_dir) if reference_dir else None
+        # Forked workers would inherit client sockets and hold connections open
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                        initializer=_init_server_worker, initargs=(cache_dir,))
+        self.mutations = _Batcher(self, _mutate_batch, batch_window, max_batch)
+        self.qualities = _Batcher(self, _quality_batch, batch_window, max_batch)
+        self.servers = []
+        self.queued = self.running = 0
+        self.batches = self.batched_jobs = 0
+        self.requests = {}
+        self.errors = 0
+        self.latencies = {}
+
+    async def start(self, host: Optional[str] = '127.0.0.1', port: int = DEFAULT_PORT,
+                    unix_path: Optional[str] = None) -> List[asyncio.AbstractServer]:
+        """Listen on ``host:port`` (unless ``host`` is None) and/or ``unix_path``."""
+        if host is not None:
+            self.servers.append(await asyncio.start_server(self._handle, host, port))
+        if unix_path:
+            self.servers.append(await asyncio.start_unix_server(self._handle, unix_path))
+        if not self.servers:
+            raise ValueError("Give a host or a Unix socket path to listen on")
+        return self.servers
+
+    @property
+    def port(self) -> Optional[int]:
+        """TCP port listened on (useful with ``port=0``)."""
+        for server in self.servers:
+            for sock in server.sockets:
+                address = sock.getsockname()
+                if isinstance(address, tuple):
+                    return address[1]
+        return None
+
+    async def serve_forever(self):
+        await asyncio.gather(*(server.serve_forever() for server in self.servers))
+
+    async def close(self):
+        """Stop listening and shut the worker pool down."""
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers = []
+        if sys.version_info >= (3, 9):
+            self.pool.shutdown(cancel_futures=True)
+        else:  # cancel_futures is new in Python 3.9
+            self.pool.shutdown()
+
+    async def in_pool(self, func, *args):
+        """Run ``func(*args)`` in the worker pool without blocking the loop."""
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        finally:
+            self.running -= 1
+
+    async def _unbatched(self, func, *args):
+        """Run a job that is not batched, counting it in the queue depth."""
+        self.queued += 1
+        try:
+            return await self.in_pool(func, *args)
+        finally:
+            self.queued -= 1
+
+    def metrics(self) -> Dict:
+        """Queue depth, batching counters and per-endpoint latencies (ms)."""
+        latency = {}
+        for endpoint, samples in self.latencies.items():
+            ordered = sorted(samples)
+            latency[endpoint] = {
+                'count': len(ordered),
+                'mean_ms': sum(ordered) / len(ordered) * 1000,
+                'p50_ms': ordered[len(ordered) // 2] * 1000,
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                'max_ms': ordered[-1] * 1000,
+            }
+        return {
+            'queue_depth': self.queued, 'running_tasks': self.running, 'workers': self.workers,
+            'requests': dict(self.requests), 'errors': self.errors,
+            'batches': self.batches, 'batched_jobs': self.batched_jobs, 'latency': latency,
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve the requests of one (keep-alive) connection."""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as e:
+                    await _send_json(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._dispatch(writer, method, path, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer, method: str, path: str, body: bytes, keep_alive: bool):
+        routes = {'/mutate': ('POST', self._mutate), '/qc': ('POST', self._qc),
+                  '/export': ('POST', self._export), '/metrics': ('GET', self._metrics),
+                  '/health': ('GET', self._health)}
+        path = path.split('?', 1)[0]
+        start = time.perf_counter()
+        self.requests[path] = self.requests.get(path, 0) + 1
+        try:
+            if path not in routes:
+                raise HTTPError(404, f"Unknown endpoint {path}")
+            expected, handler = routes[path]
+            if method != expected:
+                raise HTTPError(405, f"{path} expects {expected}")
+            try:
+                params = await asyncio.get_running_loop().run_in_executor(None, json.loads, body or b'{}')
+            except ValueError:
+                raise HTTPError(400, "Request body must be JSON")
+            if not isinstance(params, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+            await handler(writer, params, keep_alive)
+        except (HTTPError, ValueError, KeyError, TypeError) as e:
+            self.errors += 1
+            status = e.status if isinstance(e, HTTPError) else 400
+            message = str(e) if not isinstance(e, KeyError) else f"Unknown or missing {e}"
+            await _send_json(writer, status, {'error': message}, keep_alive)
+        except ConnectionAbortedError:
+            self.errors += 1  # failed while streaming; the connection was dropped
+            raise
+        except ConnectionError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            await _send_json(writer, 500, {'error': f'{type(e).__name__}: {e}'}, keep_alive)
+        finally:
+            samples = self.latencies.setdefault(path if path in routes else 'other', deque(maxlen=1024))
+            samples.append(time.perf_counter() - start)
+
+    async def _mutate(self, writer, params: Dict, keep_alive: bool):
+        source, rate, engine, n_variants, seed = _generation_params(params, self.reference_dir)
+        fmt = params.get('format', 'fasta')
+        if fmt not in MUTATE_FORMATS:
+            raise HTTPError(400, f"Unknown format '{fmt}'. Choose from: {', '.join(MUTATE_FORMATS)}")
+        headers = {'X-Dnasim-Seed': str(seed)}
+        length = _source_length(params['sequence'])
+        if length is not None and n_variants * length <= self.small_request:
+            data = await self.mutations.submit((source, rate, engine), (n_variants, seed, fmt))
+            await _send_stream(writer, _CONTENT_TYPES[fmt], _slices(data), keep_alive, headers)
+        else:
+            path = await self._unbatched(_mutate_file, source, rate, engine, n_variants, seed, fmt)
+            await _send_file(writer, _CONTENT_TYPES[fmt], path, keep_alive, headers)
+
+    async def _qc(self, writer, params: Dict, keep_alive: bool):
+        quality = await self.qualities.submit((), _source(params, self.reference_dir))
+        await _send_json(writer, 200, quality, keep_alive)
+
+    async def _export(self, writer, params: Dict, keep_alive: bool):
+        fmt = params.get('format', 'fasta')
+        if fmt not in EXPORT_FORMATS:
+            raise HTTPError(400, f"Unknown format '{fmt}'. Choose from: {', '.join(EXPORT_FORMATS)}")
+        chrom = params.get('chrom', 'sequence')
+        headers = {}
+        if 'variants' in params:
+            if not isinstance(params['variants'], list):
+                raise HTTPError(400, "Variants must be a list of sequences")
+            path = await self._unbatched(_export_job, _source(params, self.reference_dir),
+                                         params['variants'], fmt, chrom)
+        else:
+            source, rate, engine, n_variants, seed = _generation_params(params, self.reference_dir)
+            headers['X-Dnasim-Seed'] = str(seed)
+            path = await self._unbatched(_generate_and_export, source, rate, engine,
+                                         n_variants, seed, fmt, chrom)
+        await _send_file(writer, _CONTENT_TYPES[fmt], path, keep_alive, headers)
+
+    async def _metrics(self, writer, params: Dict, keep_alive: bool):
+        await _send_json(writer, 200, self.metrics(), keep_alive)
+
+    async def _health(self, writer, params: Dict, keep_alive: bool):
+        await _send_json(writer, 200, {'status': 'ok'}, keep_alive)
+
+
+def _source(params: Dict, reference_dir: Optional[str]) -> Source:
+    """The request's sequence source, checked but left for the workers to resolve.
+
+    ``{"reference": path}`` sources must name a file within
+    ``reference_dir``; relative paths are taken from it.
+    """
+    if 'sequence' not in params:
+        raise HTTPError(400, "Request needs a sequence")
+    source = params['sequence']
+    if isinstance(source, str):
+        return source
+    if not isinstance(source, dict) or not all(isinstance(v, str) for v in source.values()):
+        raise HTTPError(400, "Sequence must be a string or a source such as {\"gene\": \"P53\"}")
+    if 'reference' in source:
+        if reference_dir is None:
+            raise HTTPError(403, "Reference sources are disabled; start the server with --reference-dir")
+        path = os.path.realpath(os.path.join(reference_dir, source['reference']))
+        if os.path.commonpath([reference_dir, path]) != reference_dir:
+            raise HTTPError(403, "Reference files must be within the server's reference directory")
+        source = {**source, 'reference': path}
+    return tuple(sorted(source.items()))
+
+
+def _source_length(source) -> Optional[int]:
+    """Length of a literal or built-in sequence source; None for reference regions."""
+    from .sequences import CODING_SEQUENCES, PROMOTER_SEQUENCES
+    if isinstance(source, str):
+        return len(source)
+    if 'gene' in source:
+        return len(CODING_SEQUENCES.get(source['gene'], ''))
+    if 'promoter' in source:
+        return len(PROMOTER_SEQUENCES.get(source['promoter'], ''))
+    return None
+
+
+def _generation_params(params: Dict, reference_dir: Optional[str]) -> Tuple[Source, float, str, int, int]:
+    """Checked ``(source, rate, engine, n_variants, seed)`` of a request."""
+    source = _source(params, reference_dir)
+    rate = params.get('rate', 0.01)
+    engine = params.get('engine', 'python')
+    n_variants = params.get('n_variants', 1)
+    if not validate_rate(rate):
+        raise HTTPError(400, "Mutation rate must be between 0 and 1")
+    if not isinstance(n_variants, int) or n_variants < 1:
+        raise HTTPError(400, "Number of variants must be a positive integer")
+    if engine not in ENGINES:
+        raise HTTPError(400, f"Unknown engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+    return source, rate, engine, n_variants, resolve_seed(params.get('seed'))
+
+
+def _mutate_records(variants: Iterable[Variant], fmt: str) -> Iterator[str]:
+    for i, variant in enumerate(variants, 1):
+        if fmt == 'fasta':
+            yield f'>variant_{i}\n{variant}\n'
+        elif fmt == 'jsonl':
+            yield json.dumps({'variant': i, 'sequence': str(variant)}) + '\n'
+        else:
+            yield json.dumps({'variant': i, 'positions': variant.positions.tolist(),
+                              'alts': variant.alts.decode('ascii')}) + '\n'
+
+
+async def _slices(data: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), STREAM_CHUNK):
+        yield data[start:start + STREAM_CHUNK]
+
+
+async def _file_chunks(path: str) -> AsyncIterator[bytes]:
+    """Read a file ``STREAM_CHUNK`` bytes at a time in the default executor."""
+    loop = asyncio.get_running_loop()
+    f = await loop.run_in_executor(None, open, path, 'rb')
+    try:
+        while True:
+            data = await loop.run_in_executor(None, f.read, STREAM_CHUNK)
+            if not data:
+                return
+            yield data
+    finally:
+        f.close()
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """Read one HTTP/1.1 request; None at end of stream."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = headers.get('content-length') or '0'
+    if not (length.isascii() and length.isdigit()):
+        raise HTTPError(400, "Content-Length must be a non-negative integer")
+    length = int(length)
+    if length > MAX_BODY:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+
+def _head(status: int, content_type: str, keep_alive: bool, headers: Dict[str, str]) -> bytes:
+    lines = [f'HTTP/1.1 {status} {_REASONS.get(status, "")}', f'Content-Type: {content_type}',
+             f'Connection: {"keep-alive" if keep_alive else "close"}']
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+    body = json.dumps(payload).encode()
+    writer.write(_head(status, 'application/json', keep_alive, {'Content-Length': str(len(body))}) + body)
+    await writer.drain()
+
+
+async def _send_stream(writer: asyncio.StreamWriter, content_type: str, parts: AsyncIterator[bytes],
+                       keep_alive: bool, headers: Optional[Dict[str, str]] = None):
+    """Send ``parts`` with chunked encoding, one chunk per part.
+
+    Waiting for the socket to drain between chunks bounds the memory held
+    for slow clients and lets other requests run meanwhile. Once the
+    headers are out an error can no longer be reported with a status, so
+    the connection is aborted and ``ConnectionAbortedError`` raised.
+    """
+    writer.write(_head(200, content_type, keep_alive, {**(headers or {}), 'Transfer-Encoding': 'chunked'}))
+    try:
+        async for data in parts:
+            if data:
+                writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+                await writer.drain()
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+    except Exception as e:
+        writer.transport.abort()
+        raise ConnectionAbortedError(f"Response aborted after its headers were sent: {e}") from e
+
+
+async def _send_file(writer: asyncio.StreamWriter, content_type: str, path: str,
+                     keep_alive: bool, headers: Dict[str, str]):
+    """Stream a temporary result file to the client, then remove it."""
+    try:
+        await _send_stream(writer, content_type, _file_chunks(path), keep_alive, headers)
+    finally:
+        os.remove(path)
+
+
+def serve(host: Optional[str] = '127.0.0.1', port: int = DEFAULT_PORT, unix_path: Optional[str] = None,
+          **options):
+    """Run a ``MutationServer`` until interrupted; ``options`` go to its constructor."""
+    async def main():
+        server = MutationServer(**options)
+        try:
+            await server.start(host, port, unix_path)
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,256 @@
+"""Parameter sweeps over sequences x rates x replicates.
+
+A sweep is described by a JSON spec, e.g.::
+
+    {
+        "sequences": {"P53": {"gene": "P53"}, "TP53_promoter": {"promoter": "TP53"},
+                      "custom": "ATGCGT...",
+                      "BRCA1": {"reference": "hg38.2bit", "region": "chr17:43044295-43125483"}},
+        "rates": [0.001, 0.01, 0.05],
+        "replicates": 3,
+        "n_variants": 100,
+        "engine": "numpy",
+        "seed": 42,
+        "context": {"signatures": {"TCW": 5.0}, "uv": false},
+        "format": "fasta"
+    }
+
+Every sequence is validated and its context model compiled once; workers
+receive the compiled models when they start and reuse each rate's sampler
+across replicates. Each finished cell appends one JSON line to
+``summary.jsonl`` in the output directory, which doubles as the
+checkpoint: a resumed sweep skips the cells already recorded there.
+"""
+import json
+import os
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from .core import ENGINES, _check_feasible, _iter_unique, _make_sampler, _validate
+from .rng import derive_seed, resolve_seed
+from .utils import validate_rate
+
+FORMATS = ('fasta', 'csv', 'jsonl', 'vcf', None)
+SPEC_FILE = 'sweep.json'
+SUMMARY_FILE = 'summary.jsonl'
+
+_worker_sequences = {}
+_worker_samplers = {}
+_worker_spec = None
+_worker_out_dir = None
+
+
+class Cell(NamedTuple):
+    """One sweep cell; ``index`` is its position in the grid."""
+    index: int
+    sequence: str
+    rate: float
+    replicate: int
+    seed: int
+
+
+def load_spec(spec) -> Dict:
+    """Read a sweep spec (path or dict) and fill in defaults."""
+    if isinstance(spec, str):
+        with open(spec) as f:
+            spec = json.load(f)
+    spec = {'replicates': 1, 'n_variants': 1, 'engine': 'numpy', 'seed': 0,
+            'context': {}, 'format': 'fasta', 'chunk_size': 1000, **spec}
+    if not spec.get('sequences'):
+        raise ValueError("Sweep spec needs at least one sequence")
+    if not spec.get('rates'):
+        raise ValueError("Sweep spec needs at least one rate")
+    if not all(validate_rate(rate) for rate in spec['rates']):
+        raise ValueError("Mutation rate must be between 0 and 1")
+    if spec['chunk_size'] < 1:
+        raise ValueError("Chunk size must be positive")
+    if spec['replicates'] < 1:
+        raise ValueError("Number of replicates must be positive")
+    if spec['engine'] not in ENGINES:
+        raise ValueError(f"Unknown engine '{spec['engine']}'. Choose from: {', '.join(ENGINES)}")
+    if spec['format'] not in FORMATS:
+        raise ValueError(f"Unknown output format '{spec['format']}'")
+    return spec
+
+
+def resolve_sequence(source) -> str:
+    """Return the sequence for a spec entry (literal, gene, promoter or reference region)."""
+    if isinstance(source, str):
+        return source
+    from .sequences import CODING_SEQUENCES, PROMOTER_SEQUENCES
+    if 'gene' in source:
+        return CODING_SEQUENCES[source['gene']]
+    if 'promoter' in source:
+        return PROMOTER_SEQUENCES[source['promoter']]
+    if 'reference' in source:
+        from .reference import open_reference
+        with open_reference(source['reference']) as reference:
+            region = source.get('region') or reference.names[0]
+            return str(reference.fetch(region))
+    raise ValueError(f"Unknown sequence source {source!r}")
+
+
+def grid(spec: Dict) -> List[Cell]:
+    """List the cells of a spec in sequence, rate, replicate order."""
+    seed = resolve_seed(spec['seed'])
+    cells = []
+    for name in spec['sequences']:
+        for rate in spec['rates']:
+            for replicate in range(spec['replicates']):
+                index = len(cells)
+                cells.append(Cell(index, name, rate, replicate, derive_seed(seed, index)))
+    return cells
+
+
+def compile_sequences(spec: Dict) -> Dict[str, tuple]:
+    """Validate every sequence once and compile its context model.
+
+    Returns:
+        Dict of name to ``(sequence, model)``
+    """
+    from .context import compile_context_model
+    compiled = {}
+    for name, source in spec['sequences'].items():
+        sequence = _validate(resolve_sequence(source), spec['rates'][0], spec['n_variants'],
+                             spec['engine'], 1)
+        compiled[name] = (sequence, compile_context_model(sequence, **spec['context']))
+    return compiled
+
+
+def completed_cells(out_dir: str) -> Dict[int, Dict]:
+    """Summaries already recorded in ``out_dir``, by cell index.
+
+    A truncated last line (from an interrupted write) is dropped.
+    """
+    path = os.path.join(out_dir, SUMMARY_FILE)
+    if not os.path.exists(path):
+        return {}
+    done = {}
+    with open(path) as f:
+        lines = f.readlines()
+    valid = []
+    for line in lines:
+        try:
+            summary = json.loads(line)
+        except ValueError:
+            continue
+        done[summary['cell']] = summary
+        valid.append(line if line.endswith('\n') else line + '\n')
+    if len(valid) != len(lines) or (lines and not lines[-1].endswith('\n')):
+        with open(path, 'w') as f:
+            f.writelines(valid)
+    return done
+
+
+def run_sweep(spec, out_dir: str, workers: int = 1, resume: bool = False) -> Iterator[Dict]:
+    """Run a sweep, yielding each cell's summary as it completes.
+
+    Args:
+        spec: Spec dict or path to a JSON spec
+        out_dir: Directory for ``sweep.json``, ``summary.jsonl`` and the
+            per-cell outputs under ``cells/``
+        workers: Number of worker processes (default: 1)
+        resume: Continue an interrupted sweep in ``out_dir``, skipping the
+            cells recorded in its summary (default: False)
+
+    Returns:
+        Iterator over per-cell summary dicts, in grid order
+    """
+    spec = load_spec(spec)
+    if workers < 1:
+        raise ValueError("Number of workers must be positive")
+    os.makedirs(os.path.join(out_dir, 'cells'), exist_ok=True)
+    spec_path = os.path.join(out_dir, SPEC_FILE)
+    if os.path.exists(spec_path):
+        with open(spec_path) as f:
+            previous = json.load(f)
+        if not resume:
+            raise ValueError(f"{out_dir} already holds a sweep; resume it or choose another directory")
+        if spec['seed'] is None:
+            spec['seed'] = previous['seed']
+        if previous != spec:
+            raise ValueError(f"Sweep spec differs from the one recorded in {spec_path}")
+    else:
+        # Record a concrete seed so an unseeded sweep can still be resumed
+        spec['seed'] = resolve_seed(spec['seed'])
+        with open(spec_path, 'w') as f:
+            json.dump(spec, f, indent=2)
+
+    done = completed_cells(out_dir)
+    cells = [cell for cell in grid(spec) if cell.index not in done]
+    compiled = compile_sequences(spec) if cells else {}
+    return _run_cells(spec, compiled, cells, out_dir, workers)
+
+
+def _run_cells(spec: Dict, compiled: Dict[str, tuple], cells: List[Cell], out_dir: str,
+               workers: int) -> Iterator[Dict]:
+    """Run cells in grid order, appending each summary to the checkpoint."""
+    if not cells:
+        return
+    initargs = (compiled, spec, out_dir)
+    if workers > 1:
+        from .parallel import ordered_map
+        results = ordered_map(_run_cell, cells, workers, initializer=_init_sweep, initargs=initargs)
+    else:
+        _init_sweep(*initargs)
+        results = map(_run_cell, cells)
+    with open(os.path.join(out_dir, SUMMARY_FILE), 'a') as summary_file:
+        for summary in results:
+            summary_file.write(json.dumps(summary) + '\n')
+            summary_file.flush()
+            yield summary
+
+
+def _init_sweep(compiled: Dict[str, tuple], spec: Dict, out_dir: str):
+    """Receive the compiled sequences once per worker process."""
+    global _worker_sequences, _worker_spec, _worker_out_dir
+    _worker_sequences, _worker_spec, _worker_out_dir = compiled, spec, out_dir
+    _worker_samplers.clear()
+
+
+def _sampler(name: str, rate: float):
+    """Sampler for a sequence and rate, kept while consecutive cells share them."""
+    key = (name, rate)
+    if key not in _worker_samplers:
+        _worker_samplers.clear()
+        sequence, model = _worker_sequences[name]
+        _check_feasible(sequence, rate, _worker_spec['n_variants'], _worker_spec['n_variants'] * 100,
+                        _worker_spec['engine'], model)
+        _worker_samplers[key] = _make_sampler(sequence, rate, _worker_spec['engine'], model)
+    return _worker_samplers[key]
+
+
+def _run_cell(cell: Cell) -> Dict:
+    """Generate, summarize and write out one cell."""
+    from .analysis import mutation_spectrum
+    spec = _worker_spec
+    sequence, _ = _worker_sequences[cell.sequence]
+    start = time.perf_counter()
+    draw = _sampler(cell.sequence, cell.rate)
+    variants = list(_iter_unique(lambda tasks: (draw(count, seed) for seed, count in tasks),
+                                 len(sequence), spec['n_variants'], spec['chunk_size'], True, cell.seed))
+    spectrum = mutation_spectrum(sequence, variants)
+    output = _write_cell(cell, sequence, variants, spec['format'])
+    return {
+        'cell': cell.index, 'sequence': cell.sequence, 'rate': cell.rate,
+        'replicate': cell.replicate, 'seed': cell.seed, 'n_variants': len(variants),
+        'mean_mutations': float(spectrum.mutation_counts.mean()),
+        'transitions': spectrum.transitions, 'transversions': spectrum.transversions,
+        'substitutions': spectrum.substitutions.tolist(),
+        'seconds': time.perf_counter() - start, 'output': output,
+    }
+
+
+def _write_cell(cell: Cell, sequence: str, variants: list, fmt: Optional[str]) -> Optional[str]:
+    if fmt is None:
+        return None
+    from . import export
+    name = f'{cell.sequence}_{cell.rate}_{cell.replicate}.{fmt}'
+    path = os.path.join(_worker_out_dir, 'cells', name)
+    if fmt == 'fasta':
+        export.export_fasta(variants, path)
+    elif fmt == 'vcf':
+        export.export_vcf(sequence, variants, path, chrom=cell.sequence)
+    else:
+        export.export_mutations(sequence, variants, path)
+    return os.path.join('cells', name)
@@ -1,5 +1,6 @@
 """Utility functions for DNA sequence manipulation."""
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+from .variant import Variant, iter_substitutions
 
 def validate_sequence(sequence: str) -> bool:
     """
@@ -14,11 +15,31 @@ def validate_sequence(sequence: str) -> bool:
     Raises:
         ValueError: If sequence contains invalid characters
     """
+    if not isinstance(sequence, str):
+        return _validate_view(sequence)
     invalid_chars = set(sequence.upper()) - set('ATGC')
     if invalid_chars:
         raise ValueError(f"Invalid nucleotides found: {invalid_chars}")
     return True
 
+_NON_ACGT = str.maketrans('', '', 'ACGTacgt')
+
+def _validate_view(view) -> bool:
+    """Validate a reference ``SequenceView`` chunk by chunk, naming the first bad base."""
+    checked = 0
+    for chunk in view.iter_chunks():
+        invalid = chunk.translate(_NON_ACGT)
+        if invalid:
+            position = view.start + checked + min(chunk.find(char) for char in set(invalid)) + 1
+            if set(invalid.upper()) == {'N'}:
+                raise ValueError(f"Region {view.name}:{view.start + 1}-{view.start + len(view)} contains "
+                                 f"unknown (N) bases, first at {view.name}:{position}; "
+                                 "choose a region without assembly gaps")
+            raise ValueError(f"Invalid nucleotides found: {set(invalid.upper())} "
+                             f"at {view.name}:{position}")
+        checked += len(chunk)
+    return True
+
 def validate_rate(rate: float) -> bool:
     """
     Validate mutation rate is between 0 and 1.
@@ -38,24 +59,23 @@ def validate_rate(rate: float) -> bool:
         raise ValueError("Mutation rate must be between 0 and 1")
     return True
 
-def analyze_mutations(original: str, mutated: str) -> List[Dict[str, str]]:
+def analyze_mutations(original: str, mutated: Union[str, Variant]) -> List[Dict[str, str]]:
     """
     Analyze differences between original and mutated sequences.
     
     Args:
         original: Original DNA sequence
-        mutated: Mutated DNA sequence
+        mutated: Mutated DNA sequence or ``Variant``
         
     Returns:
         List of mutation details
     """
     mutations = []
-    for i, (orig, mut) in enumerate(zip(original, mutated)):
-        if orig != mut:
-            mutations.append({
-                'position': i,
-                'original': orig,
-                'mutated': mut,
-                'type': 'substitution'
-            })
+    for i, orig, mut in iter_substitutions(original, mutated):
+        mutations.append({
+            'position': i,
+            'original': orig,
+            'mutated': mut,
+            'type': 'substitution'
+        })
     return mutations
\ No newline at end of file
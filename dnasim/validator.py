@@ -1,11 +1,53 @@
 """DNA sequence validation and quality checks."""
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from .cache import cached
+from .profiling import instrument
 
 def check_gc_content(sequence: str) -> float:
     """Calculate GC content percentage."""
     gc_count = sum(1 for base in sequence.upper() if base in 'GC')
     return (gc_count / len(sequence)) * 100 if sequence else 0
 
+@cached('gc_profile')
+@instrument('validate.gc', sized=True)
+def gc_profile(sequence: str, window_size: int = 50, step: int = 1):
+    """GC content (%) of each sliding window along the sequence.
+
+    Uses running prefix sums over blocks of the sequence, so the cost is
+    O(n) regardless of ``window_size`` and memory stays bounded on
+    chromosome-sized input.
+
+    Args:
+        sequence: DNA sequence
+        window_size: Window length in bases (default: 50)
+        step: Distance between consecutive window starts (default: 1)
+
+    Returns:
+        numpy.ndarray: GC percentage of the windows starting at
+        ``0, step, 2 * step, ...``
+    """
+    import numpy as np
+
+    if not isinstance(sequence, str):
+        sequence = str(sequence)
+    if window_size < 1 or step < 1:
+        raise ValueError("Window size and step must be positive")
+    data = np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)
+    n_windows = max(0, (len(data) - window_size) // step + 1)
+    profile = np.empty(n_windows)
+    is_gc = np.zeros(256, dtype=np.uint8)
+    is_gc[list(b'GCgc')] = 1
+
+    block = max(1, (1 << 20) // step)
+    for first in range(0, n_windows, block):
+        starts = np.arange(first, min(first + block, n_windows)) * step
+        lo, hi = starts[0], starts[-1] + window_size
+        counts = np.zeros(hi - lo + 1, dtype=np.int64)
+        np.cumsum(is_gc[data[lo:hi]], out=counts[1:])
+        offsets = starts - lo
+        profile[first:first + len(starts)] = counts[offsets + window_size] - counts[offsets]
+    return profile * (100.0 / window_size)
+
 def validate_reading_frame(sequence: str) -> bool:
     """Check if sequence length is multiple of 3 and has valid start/stop codons."""
     if len(sequence) < 3:
@@ -18,43 +60,82 @@ def validate_reading_frame(sequence: str) -> bool:
     
     return has_start and has_stop and correct_length
 
-def find_motifs(sequence: str) -> Dict[str, List[int]]:
-    """Find common DNA motifs and their positions."""
-    motifs = {
-        'TATA_box': 'TATAAA',
-        'CpG': 'CG',
-        'Kozak': 'GCCACC',
-        'PolyA': 'AAAAAA'
-    }
-    
-    results = {}
-    for name, motif in motifs.items():
-        positions = []
-        for i in range(len(sequence) - len(motif) + 1):
-            if sequence[i:i+len(motif)] == motif:
-                positions.append(i)
-        if positions:
-            results[name] = positions
-            
-    return results
+# Repetitive regions listed by check_sequence_quality (longest first)
+MAX_REPORTED_REPEATS = 100
+
+DEFAULT_MOTIFS = {
+    'TATA_box': 'TATAAA',
+    'CpG': 'CG',
+    'Kozak': 'GCCACC',
+    'PolyA': 'AAAAAA'
+}
 
+@cached('find_motifs')
+@instrument('validate.motifs', sized=True)
+def find_motifs(sequence: str, motifs: Optional[Dict[str, str]] = None,
+                include_catalog: bool = False, both_strands: bool = False) -> Dict[str, List[int]]:
+    """Find DNA motifs and their positions in a single pass.
+
+    Args:
+        sequence: DNA sequence
+        motifs: Mapping of name to motif, IUPAC codes allowed
+            (default: ``DEFAULT_MOTIFS``)
+        include_catalog: Also scan for every entry of ``REGULATORY_ELEMENTS``
+            and ``TF_BINDING_SITES`` (default: False)
+        both_strands: Also match reverse complements (default: False)
+
+    Returns:
+        Dict of motif name to start positions, for motifs found
+    """
+    from .motifs import get_scanner, motif_catalog
+
+    if not isinstance(sequence, str):
+        sequence = str(sequence)
+    catalog = dict(DEFAULT_MOTIFS if motifs is None else motifs)
+    if include_catalog:
+        catalog = {**motif_catalog(), **catalog}
+    return get_scanner(catalog, both_strands).scan(sequence)
+
+@cached('check_sequence_quality')
+@instrument('validate', sized=True)
 def check_sequence_quality(sequence: str) -> Dict[str, any]:
-    """Comprehensive sequence quality check."""
+    """Comprehensive sequence quality check.
+
+    Accepts a string or a reference ``SequenceView``. Only the
+    ``MAX_REPORTED_REPEATS`` longest repetitive regions are reported, so
+    the result (and the report built from it) stays bounded on megabase
+    input.
+    """
+    if not isinstance(sequence, str):
+        sequence = str(sequence)
     return {
         'length': len(sequence),
         'gc_content': check_gc_content(sequence),
         'valid_reading_frame': validate_reading_frame(sequence),
         'motifs': find_motifs(sequence),
         'is_palindromic': sequence == sequence[::-1],
-        'repetitive_regions': find_repetitive_regions(sequence)
+        'repetitive_regions': find_repetitive_regions(sequence, max_results=MAX_REPORTED_REPEATS)
     }
 
-def find_repetitive_regions(sequence: str, min_length: int = 4) -> List[Tuple[str, int]]:
-    """Find repetitive regions in sequence."""
-    repeats = []
-    for i in range(len(sequence) - min_length + 1):
-        for j in range(i + min_length, len(sequence) + 1):
-            substr = sequence[i:j]
-            if sequence.count(substr) > 1:
-                repeats.append((substr, i))
-    return repeats
\ No newline at end of file
+@instrument('validate.repeats', sized=True)
+def find_repetitive_regions(sequence: str, min_length: int = 4,
+                            max_results: Optional[int] = None) -> List[Tuple[str, int]]:
+    """Find maximal repeats in sequence using a suffix-array index.
+
+    A maximal repeat occurs at least twice and cannot be extended to the
+    left or right without losing an occurrence. Runs in near-linear time.
+
+    Args:
+        sequence: DNA sequence
+        min_length: Minimum repeat length (default: 4)
+        max_results: Keep only the longest ``max_results`` repeats (default: all)
+
+    Returns:
+        List of ``(repeat, first_position)`` tuples ordered by position
+    """
+    from .repeats import maximal_repeats
+
+    if min_length < 1:
+        raise ValueError("Minimum repeat length must be positive")
+    repeats = maximal_repeats(sequence.upper(), min_length, max_results)
+    return sorted(((repeat, pos) for repeat, pos, _ in repeats), key=lambda r: (r[1], len(r[0])))
@@ -0,0 +1,93 @@
+"""Sparse variant representation against a shared reference sequence."""
+import hashlib
+from array import array
+from typing import Iterable, Iterator, Tuple, Union
+
+
+class Variant:
+    """A mutated sequence stored as its substitutions against a reference.
+
+    Only the substituted positions and replacement bases are kept; the
+    reference string is shared between all variants generated from it and
+    the full sequence is rendered lazily by ``str(variant)``.
+
+    Args:
+        reference: Reference DNA sequence (uppercase)
+        positions: Substituted positions, in increasing order
+        alts: Replacement bases, one per position
+    """
+    __slots__ = ('reference', 'positions', 'alts')
+
+    def __init__(self, reference: str, positions: Iterable[int] = (), alts: Union[bytes, str] = b''):
+        self.reference = reference
+        self.positions = positions if isinstance(positions, array) else array('q', positions)
+        self.alts = alts.encode('ascii') if isinstance(alts, str) else bytes(alts)
+        if len(self.positions) != len(self.alts):
+            raise ValueError("Positions and replacement bases must have the same length")
+
+    @classmethod
+    def from_sequence(cls, reference: str, sequence: str) -> 'Variant':
+        """Build a variant by diffing a full sequence against the reference."""
+        positions = array('q')
+        alts = bytearray()
+        for pos, (orig, mut) in enumerate(zip(reference, sequence)):
+            if orig != mut:
+                positions.append(pos)
+                alts.append(ord(mut))
+        return cls(reference, positions, bytes(alts))
+
+    @property
+    def n_mutations(self) -> int:
+        """Number of substituted positions."""
+        return len(self.positions)
+
+    def fingerprint(self) -> int:
+        """64-bit hash of the substitution set, used for uniqueness checks."""
+        digest = hashlib.blake2b(self.positions.tobytes(), digest_size=8)
+        digest.update(self.alts)
+        return int.from_bytes(digest.digest(), 'little')
+
+    def mutations(self) -> Iterator[Tuple[int, str, str]]:
+        """Yield ``(position, original, mutated)`` for every substitution."""
+        reference = self.reference
+        for pos, alt in zip(self.positions, self.alts.decode('ascii')):
+            yield pos, reference[pos], alt
+
+    def __str__(self) -> str:
+        if not self.positions:
+            return self.reference
+        chars = bytearray(self.reference.encode('ascii'))
+        for pos, alt in zip(self.positions, self.alts):
+            chars[pos] = alt
+        return chars.decode('ascii')
+
+    def __len__(self) -> int:
+        return len(self.reference)
+
+    def __repr__(self) -> str:
+        return f"Variant(length={len(self.reference)}, mutations={len(self.positions)})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Variant):
+            return NotImplemented
+        return (self.positions == other.positions and self.alts == other.alts
+                and (self.reference is other.reference or self.reference == other.reference))
+
+    def __hash__(self) -> int:
+        return hash((self.positions.tobytes(), self.alts))
+
+
+def iter_substitutions(original: str, variant: Union[str, Variant]) -> Iterator[Tuple[int, str, str]]:
+    """Yield ``(position, original, mutated)`` for each substituted base.
+
+    ``Variant`` objects built on ``original`` report their recorded
+    substitutions directly; plain strings are diffed base by base.
+    """
+    if isinstance(variant, Variant):
+        if variant.reference is original or variant.reference == original:
+            yield from variant.mutations()
+            return
+        variant = str(variant)
+    for pos, (orig, mut) in enumerate(zip(original, variant)):
+        if orig != mut:
+            yield pos, orig, mut
@@ -0,0 +1,62 @@
+import math
+import numpy as np
+import pytest
+from dnasim import mutate, Variant
+from dnasim.analysis import analyze_mutations, mutation_spectrum
+from dnasim.engine import encode_sequence
+
+SEQ = "ATGCGTACGTTAGCCATG" * 5
+
+def test_spectrum_matches_analyze_mutations():
+    variants = mutate(SEQ, 0.05, 30, engine='numpy', seed=4, sparse=True)
+    expected = analyze_mutations(SEQ, variants)
+    mixed = variants[:10] + [str(v) for v in variants[10:20]] + variants[20:]
+    for inputs in (variants, [str(v) for v in variants], mixed):
+        assert mutation_spectrum(SEQ, inputs).to_stats() == expected
+
+def test_spectrum_from_code_matrix():
+    variants = ["ACGT", "GCGT", "ACAC"]
+    matrix = np.stack([encode_sequence(v) for v in variants])
+    spectrum = mutation_spectrum("ACGT", matrix)
+    assert spectrum.mutation_counts.tolist() == [0, 1, 2]
+    assert spectrum.position_counts.tolist() == [1, 0, 1, 1]
+    # A->G and G->A are transitions, T->C is a transition too
+    assert spectrum.substitutions[0, 2] == 1 and spectrum.substitutions[2, 0] == 1
+    assert spectrum.substitutions[3, 1] == 1
+    assert spectrum.transitions == 3 and spectrum.transversions == 0
+    assert spectrum.ts_tv_ratio == math.inf
+
+def test_spectrum_ts_tv_ratio():
+    spectrum = mutation_spectrum("AAAA", [Variant("AAAA", [0, 1, 2], "GCT")])
+    assert spectrum.transitions == 1 and spectrum.transversions == 2
+    assert spectrum.ts_tv_ratio == 0.5
+    assert math.isnan(mutation_spectrum("AAAA", ["AAAA"]).ts_tv_ratio)
+
+def test_spectrum_rejects_length_mismatch():
+    with pytest.raises(ValueError):
+        mutation_spectrum("ACGT", ["ACG"])
+    with pytest.raises(ValueError):
+        mutation_spectrum("ACGT", np.zeros((2, 3), dtype=np.uint8))
+
+def test_plot_bins_long_sequences(tmp_path, monkeypatch):
+    from dnasim import plotting
+    from dnasim.analysis import plot_mutation_patterns
+    figures = []
+    finish = plotting.finish
+    monkeypatch.setattr(plotting, 'finish', lambda fig, *args: (figures.append(fig), finish(fig, *args)))
+    sequence = "ACGT" * 50_000
+    variants = mutate(sequence, 1e-3, 5, engine='skip', seed=1, sparse=True)
+    plot_mutation_patterns(sequence, variants, str(tmp_path / "long.png"))
+    assert (tmp_path / "long.png").exists()
+    positions_ax = figures[0].axes[1]
+    assert len(positions_ax.patches) + len(positions_ax.collections) <= 2
+    assert 'bp bins' in positions_ax.get_title()
+
+def test_plot_never_shows_when_headless(monkeypatch):
+    import matplotlib.pyplot as plt
+    from dnasim import plotting
+    from dnasim.analysis import plot_mutation_patterns
+    monkeypatch.setattr(plotting, 'is_headless', lambda: True)
+    monkeypatch.setattr(plt, 'show', lambda *a, **k: pytest.fail("plt.show() called"))
+    with pytest.warns(UserWarning):
+        plot_mutation_patterns("ACGT", ["ACGA"])
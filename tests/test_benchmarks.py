@@ -0,0 +1,29 @@
+from benchmarks.bench import Case, build_suite, case_key, compare, make_sequence, run_case
+
+def test_make_sequence_sources():
+    for source in ('coding', 'promoter', 'synthetic'):
+        sequence = make_sequence(1234, source)
+        assert len(sequence) == 1234
+        assert set(sequence) <= set('ACGT')
+    assert make_sequence(500) == make_sequence(500)
+
+def test_run_case_records_throughput_and_memory():
+    case = Case('join', {'length': 1000}, lambda: ['A'] * 1000, ''.join, 1000, 10)
+    result = run_case(case, repeat=1)
+    assert result['name'] == 'join'
+    assert result['bases_per_s'] > 0 and result['variants_per_s'] > 0
+    assert result['peak_mb'] >= 0
+
+def test_compare_flags_regressions():
+    baseline = [{'name': 'a', 'params': {'n': 1}, 'seconds': 1.0},
+                {'name': 'b', 'params': {'n': 1}, 'seconds': 1.0}]
+    results = [{'name': 'a', 'params': {'n': 1}, 'seconds': 1.1},
+               {'name': 'b', 'params': {'n': 1}, 'seconds': 2.0},
+               {'name': 'c', 'params': {}, 'seconds': 1.0}]
+    rows = {row['case']: row for row in compare(results, baseline, threshold=0.25)}
+    assert set(rows) == {'a[n=1]', 'b[n=1]'}
+    assert not rows['a[n=1]']['regression'] and rows['b[n=1]']['regression']
+
+def test_suite_cases_are_unique():
+    keys = [case_key({'name': case.name, 'params': case.params}) for case in build_suite('full')]
+    assert len(keys) == len(set(keys))
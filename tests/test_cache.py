@@ -0,0 +1,78 @@
+import os
+import pytest
+from dnasim import cache, profiling
+from dnasim.generator import generate_gene
+from dnasim.reports import generate_quality_report
+from dnasim.validator import check_sequence_quality, find_motifs, gc_profile
+
+SEQ = "ATGCGTACGTTAGCTATAAAGCCACC" * 20
+
+def test_disabled_by_default():
+    assert cache.active() is None
+    assert check_sequence_quality(SEQ) == check_sequence_quality(SEQ)
+
+def test_results_cached_by_content():
+    expected = check_sequence_quality(SEQ)
+    with cache.caching() as store:
+        first = check_sequence_quality(SEQ)
+        first['motifs'].clear()  # callers get copies, not the cached value
+        assert check_sequence_quality(''.join(list(SEQ))) == expected
+        assert store.hits == 1
+    assert cache.active() is None
+
+def test_parameters_are_part_of_the_key():
+    with cache.caching() as store:
+        assert find_motifs(SEQ) != find_motifs(SEQ, both_strands=True, include_catalog=True)
+        find_motifs(SEQ, None, False, False)
+        assert store.hits == 1
+        assert list(gc_profile(SEQ, 10)) != list(gc_profile(SEQ, 20))
+        assert store.hits == 1
+
+def test_size_based_eviction():
+    with cache.caching(max_bytes=3000) as store:
+        for i in range(20):
+            gc_profile(SEQ * (i + 1), window_size=50, step=10)
+        assert store.size <= 3000 and 0 < len(store) < 20
+        gc_profile(SEQ, window_size=50, step=10)
+        assert store.hits == 0
+
+def test_directory_tier_shared(tmp_path):
+    directory = str(tmp_path / "cache")
+    with cache.caching(directory=directory):
+        expected = check_sequence_quality(SEQ)
+    assert any(name.endswith('.pickle') for name in os.listdir(directory))
+    with cache.caching(directory=directory) as store:
+        assert check_sequence_quality(SEQ) == expected
+        assert store.hits == 1
+        store.clear()
+        assert not os.listdir(directory)
+
+def test_schema_change_invalidates_directory(tmp_path, monkeypatch):
+    directory = str(tmp_path / "cache")
+    with cache.caching(directory=directory):
+        check_sequence_quality(SEQ)
+    monkeypatch.setattr(cache, 'CACHE_SCHEMA', cache.CACHE_SCHEMA + 1)
+    with cache.caching(directory=directory) as store:
+        check_sequence_quality(SEQ)
+        assert store.hits == 0
+
+def test_errors_not_cached():
+    with cache.caching() as store:
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                gc_profile(SEQ, window_size=0)
+        assert len(store) == 0
+
+def test_cached_quality_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    gene = generate_gene('P53')
+    with profiling.profile() as prof, cache.caching() as store:
+        generate_quality_report(gene, "first.txt")
+        plot = (tmp_path / "gc_distribution.png").read_bytes()
+        (tmp_path / "gc_distribution.png").unlink()
+        generate_quality_report(gene, "second.txt")
+    assert (tmp_path / "first.txt").read_text() == (tmp_path / "second.txt").read_text()
+    assert (tmp_path / "gc_distribution.png").read_bytes() == plot
+    assert prof.stages['plot']['calls'] == 2
+    assert prof.stages['validate']['calls'] == 1
+    assert prof.stages['cache']['hits'] >= 1
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from dnasim import mutate, mutate_chunked
+from dnasim.context import compile_context_model, UV_MATRIX
+from dnasim.engine import site_rates, encode_sequence
+
+SEQ = "ATGCGTTCCATCGA" * 20
+
+def test_default_model_matches_cpg_rates():
+    model = compile_context_model(SEQ)
+    assert np.array_equal(model.rates(0.02), site_rates(encode_sequence(SEQ), 0.02))
+
+def test_default_model_keeps_numpy_output():
+    # The numpy engine now compiles the default model; output is unchanged
+    model = compile_context_model(SEQ)
+    assert mutate(SEQ, 0.05, 5, engine='numpy', seed=3) == mutate(SEQ, 0.05, 5, engine='numpy', seed=3, model=model)
+
+def test_signature_multipliers():
+    model = compile_context_model("ATCAGTCTA", signatures={'TCW': 4.0, 'NCA': 2.0}, cpg=False)
+    assert model.multipliers.tolist() == [1, 1, 8, 1, 1, 1, 4, 1, 1]
+
+def test_invalid_signature():
+    with pytest.raises(ValueError):
+        compile_context_model(SEQ, signatures={'TC': 2.0})
+
+def test_uv_doublets_mutate_to_t():
+    sequence = "AACCAAGGTCAA"
+    model = compile_context_model(sequence, cpg=False, uv=True)
+    assert np.flatnonzero(model.matrix_index == UV_MATRIX).tolist() == [2, 3, 9]
+    for engine in ('python', 'numpy'):
+        for variant in mutate(sequence, 0.1, 10, engine=engine, seed=1, sparse=True, model=model):
+            for pos, orig, alt in variant.mutations():
+                if pos in (2, 3, 9):
+                    assert alt == 'T'
+
+def test_zero_rate_signature_is_never_mutated():
+    model = compile_context_model(SEQ, signatures={'NTN': 0.0})
+    for engine in ('python', 'numpy'):
+        for variant in mutate(SEQ, 0.2, 5, engine=engine, seed=2, sparse=True, model=model):
+            assert all(orig != 'T' for _, orig, _ in variant.mutations())
+
+def test_chunked_uses_model_slices():
+    model = compile_context_model(SEQ, signatures={'NTN': 0.0})
+    variants = mutate_chunked(SEQ, 0.2, 4, chunk_size=7, seed=5, sparse=True, model=model)
+    assert all(orig != 'T' for variant in variants for _, orig, _ in variant.mutations())
+
+def test_model_length_mismatch():
+    with pytest.raises(ValueError):
+        mutate(SEQ, 0.1, 1, model=compile_context_model(SEQ[:-1]))
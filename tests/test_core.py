@@ -47,4 +47,128 @@ def test_case_insensitive():
     seq = "atgc"
     result = mutate(seq)
     assert len(result) == 1
-    assert all(base in 'ATGC' for base in result[0])
\ No newline at end of file
+    assert all(base in 'ATGC' for base in result[0])
+
+def test_numpy_engine_return_type():
+    seq = "ATGCGATCGATCG"
+    result = mutate(seq, rate=0.2, n_variants=3, engine='numpy')
+    assert len(result) == 3
+    assert len(set(result)) == 3
+    assert all(isinstance(x, str) and len(x) == len(seq) for x in result)
+
+def test_numpy_engine_full_rate():
+    seq = "ATGC"
+    result = mutate(seq, rate=1.0, engine='numpy')[0]
+    assert all(a != b for a, b in zip(seq, result))
+
+def test_numpy_engine_substitution_distribution():
+    # Every base mutates at rate 1; A->G should dominate as in MUTATION_PROBABILITIES
+    result = mutate("A" * 5000, rate=1.0, engine='numpy')[0]
+    assert 0.89 < result.count('G') / len(result) < 0.95
+
+def test_numpy_engine_cpg_rates():
+    from dnasim.engine import encode_sequence, site_rates
+    rates = site_rates(encode_sequence("ACGTCG"), 0.01)
+    assert list(rates) == pytest.approx([0.01, 0.001, 0.01, 0.01, 0.001, 0.01])
+
+def test_invalid_engine():
+    with pytest.raises(ValueError):
+        mutate("ATGC", engine='gpu')
+
+def test_impossible_variant_count_fails_fast():
+    # A single base has only 4 possible outcomes
+    with pytest.raises(ValueError, match="at most 4 distinct"):
+        mutate("A", rate=0.5, n_variants=5)
+
+def test_low_rate_variant_count_fails_fast():
+    with pytest.raises(ValueError, match="mutated draws"):
+        mutate("ATGC" * 10, rate=1e-9, n_variants=1000)
+
+def test_iter_mutations_is_lazy():
+    from dnasim import iter_mutations
+    stream = iter_mutations("ATGCGATCGATCG" * 4, rate=0.2, n_variants=50, chunk_size=8)
+    assert not isinstance(stream, list)
+    variants = list(stream)
+    assert len(variants) == 50
+    assert len(set(variants)) == 50
+
+def test_iter_mutations_validates_eagerly():
+    from dnasim import iter_mutations
+    with pytest.raises(ValueError):
+        iter_mutations("ATGX")
+    with pytest.raises(ValueError):
+        iter_mutations("ATGC", chunk_size=0)
+
+def test_seed_is_reproducible():
+    seq = "ATGCGATCGATCG" * 4
+    for engine in ('python', 'numpy'):
+        first = mutate(seq, rate=0.1, n_variants=20, engine=engine, seed=42)
+        assert mutate(seq, rate=0.1, n_variants=20, engine=engine, seed=42) == first
+        assert mutate(seq, rate=0.1, n_variants=20, engine=engine, seed=43) != first
+
+def test_parallel_matches_serial():
+    seq = "ATGCGATCGATCG" * 4
+    serial = mutate(seq, rate=0.1, n_variants=30, engine='numpy', seed=7)
+    parallel = mutate(seq, rate=0.1, n_variants=30, engine='numpy', seed=7, workers=3)
+    assert parallel == serial
+    assert len(set(parallel)) == 30
+
+def test_invalid_workers():
+    with pytest.raises(ValueError):
+        mutate("ATGC", workers=0)
+
+def test_seed_generator_objects():
+    import random
+    import numpy as np
+    seq = "ATGCGATCGATCG" * 4
+    assert mutate(seq, rate=0.1, n_variants=5, seed=random.Random(3)) == \
+        mutate(seq, rate=0.1, n_variants=5, seed=random.Random(3))
+    assert mutate(seq, rate=0.1, n_variants=5, engine='numpy', seed=np.random.default_rng(3)) == \
+        mutate(seq, rate=0.1, n_variants=5, engine='numpy', seed=np.random.default_rng(3))
+    with pytest.raises(ValueError):
+        mutate(seq, seed="abc")
+
+def test_process_batch_seeded():
+    from dnasim.cli import process_batch
+    seq = "ATGCGATCGATCG" * 20
+    assert process_batch(seq, 0.05, 2, seed=11) == process_batch(seq, 0.05, 2, seed=11)
+
+def test_mutate_chunked_full_length():
+    from dnasim import mutate_chunked
+    seq = "ATGCGATCGATCG" * 20
+    variants = mutate_chunked(seq, rate=0.05, n_variants=5, chunk_size=37, seed=3)
+    assert len(variants) == 5
+    assert len(set(variants)) == 5
+    assert all(len(v) == len(seq) for v in variants)
+    assert mutate_chunked(seq, rate=0.05, n_variants=5, chunk_size=37, seed=3, workers=2) == variants
+
+def test_mutate_chunked_keeps_cpg_context_at_boundaries():
+    from dnasim import mutate_chunked
+    seq = "ACGT" * 5
+    # Chunks of 2 split every CpG; its C keeps the CpG rate (0.1x) instead of 1.0
+    variants = mutate_chunked(seq, rate=1.0, n_variants=20, chunk_size=2, seed=1)
+    assert all(v[i] != seq[i] for v in variants for i in range(len(seq)) if i % 4 != 1)
+    assert any(v[i] == 'C' for v in variants for i in range(1, len(seq), 4))
+
+def test_skip_engine_matches_site_rates():
+    import numpy as np
+    from dnasim.engine import encode_sequence, site_rates, substitution_cdf, rate_classes, draw_sparse_mutations
+    sequence = "ACGTTACGGATC" * 20
+    codes = encode_sequence(sequence)
+    rates = site_rates(codes, 0.2)
+    n = 4000
+    rows, positions, alts = draw_sparse_mutations(codes, rate_classes(rates), substitution_cdf(), n,
+                                                  np.random.default_rng(0))
+    assert np.all(alts != codes[positions])
+    assert not np.any((np.diff(rows) == 0) & (np.diff(positions) <= 0))
+    hits = np.bincount(positions, minlength=len(sequence)) / n
+    for rate in np.unique(rates):
+        observed = hits[rates == rate].mean()
+        assert abs(observed - rate) < 5 * np.sqrt(rate * (1 - rate) / (n * np.sum(rates == rate)))
+
+def test_skip_engine_long_sequence():
+    sequence = "ACGT" * 250_000
+    variants = mutate(sequence, 1e-6, 50, engine='skip', seed=1, sparse=True)
+    assert len(variants) == 50
+    assert all(len(v) == len(sequence) for v in variants)
+    assert mutate(sequence, 1e-6, 50, engine='skip', seed=1, sparse=True) == variants
@@ -0,0 +1,72 @@
+import gzip
+import struct
+import pytest
+from dnasim import Variant, iter_mutations
+from dnasim.export import export_fasta, export_mutations, export_vcf
+
+SEQ = "ATGCATGCATGC"
+VARIANTS = [Variant(SEQ, [0, 5], "GC"), Variant(SEQ, [5], "A"), Variant(SEQ, [5, 11], "CT")]
+
+def test_export_vcf_aggregates_sites(tmp_path):
+    out = tmp_path / "sim.vcf"
+    export_vcf(SEQ, VARIANTS, str(out), chrom='chr1', sample_names=['a', 'b', 'c'])
+    lines = out.read_text().splitlines()
+    assert lines[0] == '##fileformat=VCFv4.2'
+    assert lines[-4] == '#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\ta\tb\tc'
+    assert lines[-3:] == [
+        'chr1\t1\t.\tA\tG\t.\tPASS\tAC=1;AN=3\tGT\t1\t0\t0',
+        'chr1\t6\t.\tT\tC,A\t.\tPASS\tAC=2,1;AN=3\tGT\t1\t2\t1',
+        'chr1\t12\t.\tC\tT\t.\tPASS\tAC=1;AN=3\tGT\t0\t0\t1',
+    ]
+
+def test_export_vcf_bgzip_index(tmp_path):
+    out = tmp_path / "sim.vcf.gz"
+    export_vcf(SEQ, VARIANTS, str(out), index=True)
+    with gzip.open(out, 'rt') as f:
+        assert f.read().splitlines()[-1].startswith('sequence\t12\t')
+    with gzip.open(str(out) + '.tbi', 'rb') as f:
+        index = f.read()
+    assert index[:4] == b'TBI\1'
+    assert struct.unpack_from('<i', index, 4)[0] == 1
+
+def test_export_vcf_index_requires_bgzip(tmp_path):
+    with pytest.raises(ValueError):
+        export_vcf(SEQ, VARIANTS, str(tmp_path / "sim.vcf"), index=True)
+
+def test_export_formats_match_stdlib(tmp_path):
+    import csv
+    import json
+    seq = "ATGCATGCATGC"
+    variants = [Variant(seq, [0, 5], "GC"), Variant(seq, [], ""), Variant(seq, [11], "A")]
+    rows = [{'variant': 1, 'position': 0, 'original': 'A', 'mutated': 'G'},
+            {'variant': 1, 'position': 5, 'original': 'T', 'mutated': 'C'},
+            {'variant': 3, 'position': 11, 'original': 'C', 'mutated': 'A'}]
+
+    export_mutations(seq, variants, str(tmp_path / "m.json"))
+    assert (tmp_path / "m.json").read_text() == json.dumps(rows, indent=2)
+
+    export_mutations(seq, variants, str(tmp_path / "m.jsonl.gz"))
+    with gzip.open(tmp_path / "m.jsonl.gz", 'rt') as f:
+        assert [json.loads(line) for line in f] == rows
+
+    export_mutations(seq, variants, str(tmp_path / "m.csv"), compress='bgzip')
+    with gzip.open(tmp_path / "m.csv", 'rt', newline='') as f:
+        assert [{k: (int(v) if v.isdigit() else v) for k, v in r.items()} for r in csv.DictReader(f)] == rows
+
+def test_export_fasta_wrapping(tmp_path):
+    out = tmp_path / "v.fa.gz"
+    export_fasta(["A" * 130, Variant("ACGT", [0], "T")], str(out), line_width=60)
+    with gzip.open(out, 'rt') as f:
+        assert f.read() == ">sequence_1\n" + "A" * 60 + "\n" + "A" * 60 + "\n" + "A" * 10 + "\n>sequence_2\nTCGT\n"
+
+def test_export_consumes_stream(tmp_path):
+    import json
+    seq = "ATGCGATCGATCG" * 4
+    fasta = tmp_path / "variants.fasta"
+    export_fasta(iter_mutations(seq, rate=0.2, n_variants=10, chunk_size=3), str(fasta))
+    assert fasta.read_text().count('>') == 10
+    out = tmp_path / "mutations.json"
+    export_mutations(seq, iter_mutations(seq, rate=0.2, n_variants=10, sparse=True), str(out))
+    rows = json.loads(out.read_text())
+    assert {row['variant'] for row in rows} <= set(range(1, 11))
+    assert out.read_text() == json.dumps(rows, indent=2)
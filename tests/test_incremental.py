@@ -0,0 +1,51 @@
+import random
+import pytest
+from dnasim import mutate
+from dnasim.incremental import ReferenceQuality, variant_quality
+from dnasim.motifs import motif_catalog
+from dnasim.sequences import CODING_SEQUENCES
+from dnasim.validator import check_sequence_quality, find_motifs
+
+def _expected(variant):
+    quality = check_sequence_quality(variant)
+    del quality['repetitive_regions']
+    return quality
+
+@pytest.mark.parametrize("motifs,both_strands", [(None, False), (motif_catalog(), True)])
+def test_incremental_matches_full_checks(motifs, both_strands):
+    rng = random.Random(3)
+    for _ in range(100):
+        reference = ''.join(rng.choice('ACGT') for _ in range(rng.randint(1, 60)))
+        state = ReferenceQuality(reference, motifs, both_strands)
+        changes = {rng.randrange(len(reference)): rng.choice('ACGT') for _ in range(rng.randint(0, 4))}
+        variant = ''.join(changes.get(i, base) for i, base in enumerate(reference))
+        quality = state.evaluate(list(changes.items()))
+        expected = find_motifs(variant, state.catalog, both_strands=both_strands)
+        assert quality['motifs'] == expected
+        assert quality['cpg_sites'] == variant.count('CG')
+        if motifs is None:
+            for key, value in _expected(variant).items():
+                assert quality[key] == value, key
+
+def test_incremental_accepts_variant_objects_and_strings():
+    sequence = CODING_SEQUENCES['P53']
+    variants = mutate(sequence, 0.02, 5, seed=4, sparse=True)
+    state = ReferenceQuality(sequence)
+    for variant in variants:
+        expected = _expected(str(variant))
+        assert state.evaluate(variant) == dict(state.evaluate(str(variant)))
+        for key, value in expected.items():
+            assert state.evaluate(variant)[key] == value
+    assert [q['cpg_sites'] for q in variant_quality(sequence, variants)] == \
+        [str(v).count('CG') for v in variants]
+
+def test_incremental_motif_changes():
+    state = ReferenceQuality("ATGCGTTAA")
+    quality = state.evaluate([(3, 'A'), (6, 'A')])
+    assert quality['motif_changes'] == {'gained': {}, 'lost': {'CpG': [3]}}
+    assert quality['motifs'].count('CpG') == 0
+    assert state.quality()['motif_changes'] == {'gained': {}, 'lost': {}}
+
+def test_incremental_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        ReferenceQuality("ACGT").evaluate([(4, 'A')])
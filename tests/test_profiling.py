@@ -0,0 +1,57 @@
+import json
+from dnasim import mutate, mutate_chunked, profiling
+from dnasim.analysis import analyze_mutations
+from dnasim.export import export_fasta
+from dnasim.validator import check_sequence_quality
+from dnasim.cli import main
+
+SEQ = "ATGCGTACGTTAGC" * 10
+
+def test_disabled_by_default():
+    assert profiling.active() is None
+    mutate(SEQ, 0.05, 3, seed=1)
+    assert profiling.active() is None
+
+def test_profile_stages_and_counters(tmp_path):
+    with profiling.profile() as prof:
+        variants = mutate(SEQ, 0.05, 20, seed=1, sparse=True)
+        analyze_mutations(SEQ, variants)
+        check_sequence_quality(SEQ)
+        export_fasta(variants, str(tmp_path / "out.fa"))
+    stages = prof.to_dict()
+    assert stages['mutate']['calls'] == 1
+    dedup = stages['mutate.dedup']
+    assert dedup['attempts'] == 20 + dedup['duplicates']
+    assert dedup['bases'] == dedup['attempts'] * len(SEQ)
+    assert stages['analysis']['variants'] == 20
+    assert stages['validate']['bases'] == len(SEQ)
+    assert 'validate.repeats' in stages and 'export.fasta' in stages
+    assert profiling.active() is None
+
+def test_duplicates_counted():
+    with profiling.profile() as prof:
+        mutate("ACGT", 0.5, 20, seed=2)
+    assert prof.stages['mutate.dedup']['duplicates'] > 0
+
+def test_chunked_counters():
+    with profiling.profile() as prof:
+        mutate_chunked(SEQ, 0.05, 5, chunk_size=30, seed=3)
+    assert prof.stages['mutate.dedup']['attempts'] >= 5
+    assert prof.stages['mutate.draw']['calls'] >= 1
+
+def test_callback_and_nesting():
+    events = []
+    with profiling.profile(callback=lambda stage, seconds, counters: events.append(stage)) as outer:
+        with profiling.profile() as inner:
+            check_sequence_quality(SEQ)
+        check_sequence_quality(SEQ)
+    assert inner.stages['validate']['calls'] == 1
+    assert outer.stages['validate']['calls'] == 1
+    assert 'validate' in events
+
+def test_cli_profile(tmp_path, capsys):
+    path = tmp_path / "profile.json"
+    main([SEQ, '-n', '2', '-s', '1', '--profile', str(path)])
+    assert json.loads(path.read_text())['mutate']['calls'] == 1
+    main([SEQ, '-n', '2', '-s', '1', '--profile'])
+    assert 'mutate.dedup' in capsys.readouterr().err
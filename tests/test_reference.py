@@ -0,0 +1,120 @@
+import gzip
+import pytest
+from dnasim import mutate
+from dnasim.reference import open_reference, parse_region, write_twobit
+from dnasim.validator import check_sequence_quality, gc_profile, find_motifs
+
+CHR1 = "ACGTACGTAC" * 7 + "TATAAA"
+CHR2 = "GGGCCCAAATTT"
+
+def write_fasta(path, width):
+    with open(path, 'w') as f:
+        for name, seq in (('chr1', CHR1), ('chr2', CHR2)):
+            f.write(f'>{name} description\n')
+            for i in range(0, len(seq), width):
+                f.write(seq[i:i + width] + '\n')
+
+def test_fasta_views(tmp_path):
+    path = tmp_path / "ref.fa"
+    write_fasta(path, 60)
+    with open_reference(str(path)) as ref:
+        assert ref.names == ['chr1', 'chr2']
+        assert len(ref['chr1']) == len(CHR1)
+        assert str(ref['chr1']) == CHR1
+        assert ref['chr1'][55:70] == CHR1[55:70]
+        assert ref['chr2'][-3:] == CHR2[-3:]
+        assert str(ref.fetch('chr1:3-12')) == CHR1[2:12]
+
+def write_bgzf_fasta(path, width):
+    """Write a bgzipped FASTA file (one block per line) and its .fai index."""
+    from dnasim.export import BgzfWriter
+    offset = 0
+    with BgzfWriter(str(path)) as f, open(f'{path}.fai', 'w') as fai:
+        for name, seq in (('chr1', CHR1), ('chr2', CHR2)):
+            header = f'>{name} description\n'
+            f.write(header.encode())
+            offset += len(header)
+            fai.write(f'{name}\t{len(seq)}\t{offset}\t{width}\t{width + 1}\n')
+            for i in range(0, len(seq), width):
+                f.write((seq[i:i + width] + '\n').encode())
+                f.flush_block()
+            offset += len(seq) + -(-len(seq) // width)
+
+def test_bgzipped_fasta(tmp_path):
+    import mmap
+    import struct
+    from dnasim.reference import _bgzf_blocks
+    gz = tmp_path / "ref.fa.gz"
+    write_bgzf_fasta(gz, 7)
+    for _ in range(2):  # by scanning the blocks, then from a .gzi index
+        with open_reference(str(gz)) as ref:
+            assert str(ref['chr1']) == CHR1
+            assert ref['chr1'][5:40] == CHR1[5:40]
+            assert str(ref.fetch('chr2:3-9')) == CHR2[2:9]
+        with open(gz, 'rb') as f:
+            blocks, _ = _bgzf_blocks(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), '')
+        pairs = [value for block in blocks[1:] for value in block]
+        (tmp_path / "ref.fa.gz.gzi").write_bytes(struct.pack(f'<Q{len(pairs)}Q', len(blocks) - 1, *pairs))
+
+def test_gzip_fasta_rejected(tmp_path):
+    path = tmp_path / "ref.fa"
+    write_fasta(path, 7)
+    gz = tmp_path / "ref.fa.gz"
+    gz.write_bytes(gzip.compress(path.read_bytes()))
+    with pytest.raises(ValueError, match="bgzip"):
+        open_reference(str(gz))
+    write_bgzf_fasta(gz, 7)
+    (tmp_path / "ref.fa.gz.fai").unlink()
+    with pytest.raises(ValueError, match="samtools faidx"):
+        open_reference(str(gz))
+
+def test_twobit_roundtrip(tmp_path):
+    path = tmp_path / "ref.2bit"
+    write_twobit(str(path), {'chr1': CHR1, 'gap': 'ACNNNGT'})
+    ref = open_reference(str(path))
+    assert str(ref['chr1']) == CHR1
+    assert ref['chr1'][5:23] == CHR1[5:23]
+    assert str(ref['gap']) == 'ACNNNGT'
+
+def test_views_feed_analysis(tmp_path):
+    path = tmp_path / "ref.fa"
+    write_fasta(path, 60)
+    view = open_reference(str(path))['chr1']
+    assert check_sequence_quality(view) == check_sequence_quality(CHR1)
+    assert list(gc_profile(view, 10)) == list(gc_profile(CHR1, 10))
+    assert find_motifs(view) == find_motifs(CHR1)
+    assert mutate(view, rate=0.1, n_variants=2, seed=1) == mutate(CHR1, rate=0.1, n_variants=2, seed=1)
+
+def test_parse_region():
+    assert parse_region('chr1') == ('chr1', 0, None)
+    assert parse_region('chr1:1,001-2,000') == ('chr1', 1000, 2000)
+    with pytest.raises(ValueError):
+        parse_region('chr1:a-b')
+
+def test_irregular_wrapping_rejected(tmp_path):
+    path = tmp_path / "irregular.fa"
+    path.write_text(">chr1\nACGTACGTAC\nACG\nTTTTTTTTTT\nGG\n")
+    with pytest.raises(ValueError, match="chr1"):
+        open_reference(str(path))
+    path.write_text(">chr1\nACGTACGTAC\nACGTTTTTTT\nTTTGG\n")
+    view = open_reference(str(path))['chr1']
+    assert len(view) == 25 and view[10:20] == 'ACGTTTTTTT'
+
+def test_parse_region_bounds():
+    for region in ('chr1:0-10', 'chr1:-5-10', 'chr1:20-10'):
+        with pytest.raises(ValueError):
+            parse_region(region)
+    assert parse_region('chr1:5-5') == ('chr1', 4, 5)
+
+def test_gap_regions_rejected_by_name(tmp_path, capsys):
+    from dnasim.cli import main
+    path = tmp_path / "ref.2bit"
+    write_twobit(str(path), {'chr1': CHR1 + 'NNNN' + CHR2})
+    view = open_reference(str(path)).fetch('chr1:60-80')
+    with pytest.raises(ValueError, match=r"chr1:60-80 .*N.*chr1:77"):
+        mutate(view, rate=0.1, n_variants=2, seed=1)
+    assert mutate(open_reference(str(path)).fetch('chr1:1-70'), rate=0.1, seed=1) == \
+        mutate(CHR1[:70], rate=0.1, seed=1)
+    with pytest.raises(SystemExit):
+        main(['--reference', str(path), '--region', 'chr1:60-80'])
+    assert 'assembly gaps' in capsys.readouterr().err
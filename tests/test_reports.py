@@ -0,0 +1,20 @@
+from dnasim.generator import generate_gene
+from dnasim.reports import batch_quality_analysis
+
+def test_batch_quality_analysis_parallel_matches_serial():
+    sequences = {name: generate_gene(name) for name in ('P53', 'Insulin', 'Hemoglobin')}
+    sequences['empty'] = ''
+    sequences['short'] = 'ATGTAA'
+    serial = batch_quality_analysis(sequences)
+    parallel = batch_quality_analysis(sequences, workers=2, chunksize=2)
+    assert list(parallel) == list(sequences)
+    assert parallel == serial
+
+def test_batch_quality_analysis_parallel_views(tmp_path):
+    from dnasim.reference import open_reference, write_twobit
+    genes = {name: generate_gene(name) for name in ('P53', 'Insulin')}
+    path = str(tmp_path / "genes.2bit")
+    write_twobit(path, genes)
+    with open_reference(path) as reference:
+        views = {name: reference[name] for name in genes}
+        assert batch_quality_analysis(views, workers=2) == batch_quality_analysis(genes)
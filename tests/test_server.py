@@ -0,0 +1,160 @@
+import asyncio
+import json
+from dnasim import mutate
+from dnasim.export import export_vcf
+from dnasim.sequences import CODING_SEQUENCES
+from dnasim.server import MutationServer
+from dnasim.validator import check_sequence_quality
+
+SEQ = CODING_SEQUENCES['P53']
+
+async def _request(method, path, payload=None, port=None, unix_path=None):
+    """Send one request and return ``(status, headers, body)``, decoding chunked bodies."""
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b'\r\n\r\n')
+    lines = head.decode().split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:])
+    if headers.get('Transfer-Encoding') == 'chunked':
+        chunks = []
+        while True:
+            size, _, data = data.partition(b'\r\n')
+            size = int(size, 16)
+            if not size:
+                break
+            chunks.append(data[:size])
+            data = data[size + 2:]
+        data = b''.join(chunks)
+    return int(lines[0].split()[1]), headers, data
+
+def _run(scenario, **options):
+    async def main():
+        server = MutationServer(**options)
+        await server.start(port=0)
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+def test_concurrent_requests_are_batched():
+    async def scenario(server):
+        requests = [_request('POST', '/mutate', {'sequence': SEQ, 'rate': 0.01, 'n_variants': 3,
+                                                 'seed': seed, 'format': 'jsonl'}, server.port)
+                    for seed in range(6)]
+        return await asyncio.gather(*requests), server.metrics()
+    responses, metrics = _run(scenario, batch_window=0.2)
+    for seed, (status, headers, body) in enumerate(responses):
+        assert status == 200 and headers['X-Dnasim-Seed'] == str(seed)
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        assert [r['sequence'] for r in records] == mutate(SEQ, 0.01, 3, seed=seed)
+    assert metrics['batches'] == 1 and metrics['batched_jobs'] == 6
+    assert metrics['queue_depth'] == 0
+    assert metrics['latency']['/mutate']['count'] == 6
+
+def test_large_results_streamed_in_chunks():
+    sequence = 'ACGT' * 25_000
+    async def scenario(server):
+        return await _request('POST', '/mutate', {'sequence': sequence, 'rate': 0.001, 'n_variants': 2,
+                                                  'engine': 'numpy', 'seed': 4}, server.port)
+    status, headers, body = _run(scenario, small_request=1000)
+    assert status == 200 and headers['Transfer-Encoding'] == 'chunked'
+    assert body.decode().split('\n')[1::2][:2] == mutate(sequence, 0.001, 2, engine='numpy', seed=4)
+
+def test_qc_and_gene_source():
+    async def scenario(server):
+        return await asyncio.gather(_request('POST', '/qc', {'sequence': {'gene': 'P53'}}, server.port),
+                                    _request('POST', '/qc', {'sequence': 'ATGCGTTAA'}, server.port))
+    (status, _, body), (_, _, short) = _run(scenario)
+    assert status == 200
+    assert json.loads(body) == json.loads(json.dumps(check_sequence_quality(SEQ)))
+    assert json.loads(short)['valid_reading_frame'] is True
+
+def test_export_vcf_over_unix_socket(tmp_path):
+    path = str(tmp_path / "dnasim.sock")
+    variants = mutate(SEQ, 0.02, 3, seed=9)
+    async def scenario(server):
+        await server.start(host=None, unix_path=path)
+        return await _request('POST', '/export', {'sequence': SEQ, 'variants': variants, 'format': 'vcf'},
+                              unix_path=path)
+    status, headers, body = _run(scenario)
+    export_vcf(SEQ, variants, str(tmp_path / "expected.vcf"))
+    assert status == 200 and headers['Content-Type'] == 'text/x-vcf'
+    assert body == (tmp_path / "expected.vcf").read_bytes()
+
+def test_errors_and_metrics():
+    async def scenario(server):
+        return await asyncio.gather(
+            _request('POST', '/mutate', {'sequence': 'ACGX'}, server.port),
+            _request('POST', '/mutate', {'sequence': 'ACGT', 'n_variants': 500, 'rate': 0.01}, server.port),
+            _request('GET', '/nowhere', port=server.port),
+            _request('GET', '/mutate', port=server.port),
+            _request('GET', '/metrics', port=server.port))
+    bad, infeasible, missing, method, (status, _, metrics) = _run(scenario)
+    assert bad[0] == 400 and 'error' in json.loads(bad[2])
+    assert infeasible[0] == 400 and 'unique variants' in json.loads(infeasible[2])['error']
+    assert missing[0] == 404 and method[0] == 405
+    assert status == 200 and {'queue_depth', 'batches', 'latency'} <= set(json.loads(metrics))
+
+def test_serve_args():
+    from dnasim.cli import parse_serve_args
+    args = parse_serve_args(['--unix', 'dnasim.sock', '--no-tcp', '-w', '2', '--batch-window', '10',
+                             '--reference-dir', 'refs'])
+    assert (args.unix, args.no_tcp, args.workers, args.batch_window) == ('dnasim.sock', True, 2, 10.0)
+    assert args.reference_dir == 'refs'
+
+def test_bad_content_length():
+    async def send(port, length):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'POST /qc HTTP/1.1\r\nContent-Length: {length}\r\n\r\n'.encode())
+        response = await reader.read()
+        writer.close()
+        return response
+    async def scenario(server):
+        return await asyncio.gather(*(send(server.port, length) for length in ('abc', '-5', '1_0', 2 ** 40)))
+    responses = _run(scenario)
+    assert [r.split()[1] for r in responses] == [b'400', b'400', b'400', b'413']
+
+def test_reference_sources_need_reference_dir(tmp_path):
+    refs = tmp_path / "refs"
+    refs.mkdir()
+    (refs / "ref.fa").write_text(f">chr1\n{SEQ}\n")
+    (tmp_path / "secret.fa").write_text(">chr1\nACGT\n")
+    async def scenario(server):
+        return await asyncio.gather(*(
+            _request('POST', '/qc', {'sequence': {'reference': path, 'region': 'chr1'}}, server.port)
+            for path in ('ref.fa', str(refs / "ref.fa"), '../secret.fa', str(tmp_path / "secret.fa"))))
+    assert [status for status, _, _ in _run(scenario)] == [403] * 4
+    relative, absolute, parent, outside = _run(scenario, reference_dir=str(refs))
+    assert relative[0] == absolute[0] == 200
+    assert json.loads(relative[2]) == json.loads(json.dumps(check_sequence_quality(SEQ)))
+    assert parent[0] == outside[0] == 403
+
+def test_stream_error_aborts_connection():
+    from dnasim.server import _send_stream
+    async def parts():
+        yield b'ACGT\n'
+        raise OSError("disk gone")
+    async def handle(reader, writer):
+        try:
+            await _send_stream(writer, 'text/plain', parts(), True)
+        except ConnectionAbortedError:
+            pass
+    async def main():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.sockets[0].getsockname()[1])
+        try:
+            return await reader.read()
+        finally:
+            writer.close()
+            server.close()
+    response = asyncio.run(main())
+    assert response.count(b'HTTP/1.1') == 1
+    assert response.endswith(b'5\r\nACGT\n\r\n')
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('matplotlib', 'numpy')
+
+def _loaded_after(code: str):
+    script = code + "\nimport sys\nprint(','.join(m for m in %r if m in sys.modules))" % (HEAVY,)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                         stdout=subprocess.PIPE, universal_newlines=True).stdout
+    last = out.splitlines()[-1] if out.strip() else ''
+    return [m for m in last.split(',') if m]
+
+def test_cli_import_is_light():
+    assert _loaded_after("import dnasim.cli") == []
+
+def test_core_api_import_is_light():
+    assert _loaded_after("import dnasim, dnasim.analysis, dnasim.reports, dnasim.validator") == []
+
+def test_cli_run_without_visualize_skips_matplotlib():
+    loaded = _loaded_after("from dnasim.cli import main\nmain(['ATGCGTACGT', '-n', '2', '-r', '0.2', '-s', '1'])")
+    assert 'matplotlib' not in loaded
@@ -0,0 +1,60 @@
+import json
+import pytest
+from dnasim import mutate
+from dnasim.cli import main
+from dnasim.context import compile_context_model
+from dnasim.sequences import CODING_SEQUENCES
+from dnasim.sweep import grid, load_spec, run_sweep
+
+SPEC = {"sequences": {"P53": {"gene": "P53"}, "short": "ATGCGTACGTTAGCATGCAA"},
+        "rates": [0.01, 0.05], "replicates": 2, "n_variants": 4, "seed": 11, "format": "csv"}
+
+def test_sweep_runs_grid(tmp_path):
+    summaries = list(run_sweep(SPEC, str(tmp_path)))
+    assert [s['cell'] for s in summaries] == list(range(8))
+    assert all(s['n_variants'] == 4 for s in summaries)
+    assert (tmp_path / summaries[0]['output']).exists()
+    lines = (tmp_path / "summary.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == summaries
+
+def test_sweep_cell_matches_mutate(tmp_path):
+    spec = dict(SPEC, format="fasta")
+    summary = next(iter(run_sweep(spec, str(tmp_path))))
+    cell = grid(load_spec(spec))[0]
+    sequence = CODING_SEQUENCES['P53']
+    expected = mutate(sequence, cell.rate, 4, engine='numpy', seed=cell.seed,
+                      model=compile_context_model(sequence))
+    records = (tmp_path / summary['output']).read_text().split('\n')[1::2]
+    assert records[:4] == expected
+
+def test_sweep_workers_match_serial(tmp_path):
+    serial = list(run_sweep(SPEC, str(tmp_path / "a")))
+    parallel = list(run_sweep(SPEC, str(tmp_path / "b"), workers=2))
+    strip = lambda rows: [{k: v for k, v in row.items() if k != 'seconds'} for row in rows]
+    assert strip(serial) == strip(parallel)
+
+def test_sweep_resumes_from_checkpoint(tmp_path):
+    out = str(tmp_path)
+    stream = run_sweep(SPEC, out)
+    first = [next(stream) for _ in range(3)]
+    stream.close()
+    # Simulate a write interrupted mid-line
+    with open(tmp_path / "summary.jsonl", 'a') as f:
+        f.write('{"cell": 3, "seq')
+    with pytest.raises(ValueError):
+        run_sweep(SPEC, out)
+    rest = list(run_sweep(SPEC, out, resume=True))
+    assert [s['cell'] for s in first + rest] == list(range(8))
+    lines = (tmp_path / "summary.jsonl").read_text().splitlines()
+    assert [json.loads(line)['cell'] for line in lines] == list(range(8))
+
+def test_sweep_rejects_changed_spec(tmp_path):
+    list(run_sweep(SPEC, str(tmp_path)))
+    with pytest.raises(ValueError):
+        run_sweep(dict(SPEC, rates=[0.2]), str(tmp_path), resume=True)
+
+def test_sweep_cli(tmp_path, capsys):
+    spec = tmp_path / "spec.json"
+    spec.write_text(json.dumps(SPEC))
+    main(['sweep', str(spec), '-o', str(tmp_path / "out")])
+    assert capsys.readouterr().out.count('cell ') == 8
@@ -0,0 +1,60 @@
+import pytest
+from dnasim.validator import find_repetitive_regions
+from dnasim.repeats import suffix_array, maximal_repeats
+
+def test_suffix_array_sorted():
+    seq = "GATTACAGATTACA"
+    sa = suffix_array(seq)
+    assert [seq[i:] for i in sa] == sorted(seq[i:] for i in range(len(seq)))
+
+def test_maximal_repeats():
+    assert maximal_repeats("GATTACAGATTACA", 4) == [("GATTACA", 0, 2)]
+
+def test_find_repetitive_regions():
+    seq = "ATGCCCAAAATGCCCTTTT"
+    assert find_repetitive_regions(seq) == [("ATGCCC", 0)]
+    assert find_repetitive_regions("ACGT") == []
+
+def test_find_repetitive_regions_max_results():
+    seq = "AAAACCCCGATTACAGGGG" + "AAAACCCCTGATTACATGGGG"
+    repeats = find_repetitive_regions(seq, max_results=1)
+    assert repeats == [("AAAACCCC", 0)]
+
+def test_find_repetitive_regions_invalid_length():
+    with pytest.raises(ValueError):
+        find_repetitive_regions("ACGT", min_length=0)
+
+def test_find_motifs_default():
+    from dnasim.validator import find_motifs
+    assert find_motifs("TATAAACGCCACC") == {'TATA_box': [0], 'CpG': [6], 'Kozak': [7]}
+
+def test_find_motifs_catalog_both_strands():
+    from dnasim.validator import find_motifs
+    # TGAGTCA is the reverse complement of the AP1 site TGACTCA
+    hits = find_motifs("CCTGAGTCACC", include_catalog=True, both_strands=True)
+    assert hits['AP1'] == [2]
+    assert 'AP1' not in find_motifs("CCTGAGTCACC", include_catalog=True)
+
+def test_find_motifs_iupac():
+    from dnasim.validator import find_motifs
+    assert find_motifs("CACGTGCATGTG", motifs={'E_box_like': 'CANNTG'}) == {'E_box_like': [0, 6]}
+    with pytest.raises(ValueError):
+        find_motifs("ACGT", motifs={'bad': 'AXG'})
+
+def test_gc_profile():
+    from dnasim.validator import gc_profile
+    profile = gc_profile("GGGGAAAACC", window_size=4, step=2)
+    assert list(profile) == pytest.approx([100.0, 50.0, 0.0, 50.0])
+    seq = "ATGCGC" * 50
+    naive = [sum(b in 'GC' for b in seq[i:i + 7]) / 7 * 100 for i in range(len(seq) - 6)]
+    assert list(gc_profile(seq, window_size=7)) == pytest.approx(naive)
+    assert len(gc_profile("ACG", window_size=5)) == 0
+
+def test_check_sequence_quality_caps_repeats():
+    import random
+    from dnasim.validator import MAX_REPORTED_REPEATS, check_sequence_quality
+    rng = random.Random(5)
+    seq = ''.join(rng.choice('ACGT') for _ in range(5000))
+    repeats = check_sequence_quality(seq)['repetitive_regions']
+    assert len(find_repetitive_regions(seq)) > MAX_REPORTED_REPEATS == len(repeats)
+    assert repeats == find_repetitive_regions(seq, max_results=MAX_REPORTED_REPEATS)
@@ -0,0 +1,51 @@
+from dnasim import mutate, Variant
+from dnasim.analysis import analyze_mutations
+from dnasim.export import export_mutations
+from dnasim import utils
+
+def test_variant_renders_lazily():
+    variant = Variant("ATGC", [1, 3], "CA")
+    assert str(variant) == "ACGA"
+    assert len(variant) == 4
+    assert variant.n_mutations == 2
+    assert list(variant.mutations()) == [(1, 'T', 'C'), (3, 'C', 'A')]
+
+def test_variant_from_sequence():
+    variant = Variant.from_sequence("ATGC", "GTGA")
+    assert list(variant.positions) == [0, 3]
+    assert variant.alts == b"GA"
+    assert variant == Variant("ATGC", [0, 3], "GA")
+    assert hash(variant) == hash(Variant("ATGC", [0, 3], "GA"))
+
+def test_mutate_sparse():
+    seq = "ATGCGATCGATCG"
+    for engine in ('python', 'numpy'):
+        variants = mutate(seq, rate=0.3, n_variants=4, engine=engine, sparse=True)
+        assert len(variants) == 4
+        assert all(isinstance(v, Variant) and v.reference == seq for v in variants)
+        assert all(str(v) == str(Variant.from_sequence(seq, str(v))) for v in variants)
+
+def test_analysis_accepts_variants():
+    seq = "ATGCATGCATGC"
+    variants = [Variant(seq, [0, 5], "GC"), Variant(seq, [5], "C")]
+    sparse_stats = analyze_mutations(seq, variants)
+    dense_stats = analyze_mutations(seq, [str(v) for v in variants])
+    assert sparse_stats == dense_stats
+    assert sparse_stats['mutation_counts'] == [2, 1]
+    assert utils.analyze_mutations(seq, variants[0]) == utils.analyze_mutations(seq, str(variants[0]))
+
+def test_export_mutations_accepts_variants(tmp_path):
+    seq = "ATGCATGC"
+    out = tmp_path / "mutations.csv"
+    export_mutations(seq, [Variant(seq, [2], "A")], str(out))
+    assert out.read_text().splitlines()[1] == "1,2,G,A"
+
+def test_fingerprint_index():
+    from dnasim.dedup import FingerprintIndex
+    index = FingerprintIndex(min_pending=2)
+    fingerprints = [Variant("ATGC", [i], "A").fingerprint() for i in range(1, 4)]
+    assert all(index.add(fp) for fp in fingerprints)
+    assert not any(index.add(fp) for fp in fingerprints)
+    assert len(index) == 3
+    assert all(fp in index for fp in fingerprints)
+    assert Variant("ATGC").fingerprint() not in index